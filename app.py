@@ -1,37 +1,50 @@
 from datetime import date
+from functools import wraps
+import hashlib
 
 from pathlib import Path
-from urllib.parse import urlencode, urlparse, parse_qs
+from urllib.parse import urlencode
 
 from dotenv import load_dotenv
 import json
 
 import uuid
 
-from flask import Flask, redirect, render_template, request, url_for
+from flask import Flask, make_response, redirect, request, url_for
+from flask import render_template as flask_render_template
+from markupsafe import Markup
+
+from fragment_cache import FragmentCache
+from instrumentation import SLOW_REQUEST_MS, Metrics, begin_request, end_request, instrument
+import json_codec
 
 from planner import (
     add_recipe,
     assign_meal,
     auto_generate_weekly_plan,
     clear_meal,
-    compute_shopping_list,
     extract_recipe_from_youtube,
     format_date,
     generate_weekly_plan,
     get_recipe_by_id,
+    get_shopping_list,
     get_today_meals,
     has_recipe_id,
     initialize_weekly_plan,
+    locked,
     load_recipe_source,
     load_plan_history,
-    load_recipes,
     load_shopping_state,
     load_weekly_plan,
+    recipe_page,
+    recipes_by_ids,
     save_shopping_state,
     save_weekly_plan,
+    search_recipes,
+    store_versions,
     sync_shopping_state,
     update_recipe,
+    youtube_video_id,
 )
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
@@ -78,20 +91,119 @@ def _format_instructions_lines(instructions):
     return "\n".join([line.strip() for line in instructions if line.strip()])
 
 
-def _youtube_id(url):
-    if not url:
-        return ""
-    parsed = urlparse(url)
-    query = parse_qs(parsed.query)
-    if "v" in query:
-        return query["v"][0]
-    if parsed.path.startswith("/shorts/"):
-        return parsed.path.split("/shorts/")[1].split("/")[0]
-    if parsed.netloc.endswith("youtu.be"):
-        return parsed.path.strip("/")
-    return ""
-
 app = Flask(__name__)
+APP_DIR = Path(__file__).resolve().parent
+
+
+def _build_stamp():
+    # Code and template changes alter the HTML without touching any store.
+    stamps = []
+    for path in sorted([*APP_DIR.glob("*.py"), *(APP_DIR / "templates").rglob("*.html")]):
+        stat = path.stat()
+        stamps.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha1("|".join(stamps).encode("utf-8")).hexdigest()
+
+
+BUILD_STAMP = _build_stamp()
+
+
+def conditional(*stores):
+    # ETag from the versions of the stores a page reads, so a matching
+    # If-None-Match is answered with 304 before any data is loaded.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = store_versions(*stores)
+            parts = [BUILD_STAMP, request.full_path, date.today().isoformat()]
+            parts.extend(f"{name}={versions[name]}" for name in stores)
+            etag = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:24]
+            if etag in request.if_none_match:
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+fragments = FragmentCache()
+request_metrics = Metrics()
+render_template = instrument("render_template")(flask_render_template)
+UNINSTRUMENTED_ENDPOINTS = {"metrics", "static"}
+
+
+@app.before_request
+def _begin_request_stats():
+    if request.endpoint not in UNINSTRUMENTED_ENDPOINTS:
+        begin_request()
+
+
+@app.after_request
+def _record_request_stats(response):
+    stats = end_request()
+    if stats is None:
+        return response
+    # The URL rule, not the path, so /recipes/<recipe_id> is one series.
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    request_metrics.observe(route, request.method, response.status_code, stats)
+    if stats.duration * 1000 >= SLOW_REQUEST_MS:
+        app.logger.warning(
+            "Slow request %s %s -> %s in %.1f ms: %s",
+            request.method,
+            request.full_path.rstrip("?"),
+            response.status_code,
+            stats.duration * 1000,
+            stats.breakdown(),
+        )
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    return app.response_class(
+        request_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _fragment(template, key, build_context, *args):
+    # build_context only runs on a miss, so cached fragments skip the loads
+    # their context needs.
+    html = fragments.get_or_render(
+        (template, request.script_root, key),
+        lambda: render_template(template, **build_context(*args)),
+    )
+    return Markup(html)
+
+
+def _fingerprint(value):
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _plan_day_context(day, index):
+    recipe_ids = [meal.get("recipe_id") for meal in day.get("meals", {}).values() if meal]
+    return {
+        "day": day,
+        "index": index,
+        "format_date": format_date,
+        "recipes_by_id": recipes_by_ids(recipe_ids),
+    }
+
+
+DRAWER_RECIPE_FIELDS = ("recipe_id", "name", "meal_types", "source_url")
+
+
+def _shopping_row_context(item, lang):
+    return {"item": item, "lang": lang}
+
+
+def _shopping_row(template, item, lang):
+    return _fragment(template, (lang, _fingerprint(item)), _shopping_row_context, item, lang)
 
 
 @app.route("/")
@@ -100,49 +212,57 @@ def index():
 
 
 @app.route("/plan")
+@conditional("plan", "recipes")
 def plan_view():
-    plan = load_weekly_plan()
     start_date = request.args.get("start_date")
-    if start_date:
-        plan = initialize_weekly_plan(start_date)
-    elif not plan:
-        plan = initialize_weekly_plan()
-    recipes = load_recipes()
-    recipes_by_id = {r.get("recipe_id"): r for r in recipes}
+    # Plain views read without the cross-process lock; only the branches that
+    # write a fresh plan take it (and re-read, in case another worker won).
+    plan = None if start_date else load_weekly_plan()
+    if not plan:
+        with locked("plan"):
+            plan = None if start_date else load_weekly_plan()
+            if not plan:
+                plan = initialize_weekly_plan(start_date)
+    # A day card is keyed on its meals (which carry the recipe ids) and the
+    # recipes version, which also moves when recipe files change on disk.
+    # After a lock toggle or a single assignment only that card re-renders,
+    # and a cached card needs no recipe lookups at all.
+    recipes_version = store_versions("recipes")["recipes"]
+    day_cards = [
+        _fragment(
+            "partials/plan_day.html",
+            (index, recipes_version, _fingerprint(day)),
+            _plan_day_context,
+            day,
+            index,
+        )
+        for index, day in enumerate(plan.get("days", []), start=1)
+    ]
     return render_template(
         "plan.html",
         plan=plan,
-        format_date=format_date,
-        recipes=recipes,
-        recipes_by_id=recipes_by_id,
+        day_cards=day_cards,
         today=date.today().isoformat(),
     )
 
 
 @app.route("/generate", methods=["POST"])
 def generate():
-    plan = load_weekly_plan()
     start_date = request.form.get("start_date")
-    if start_date and plan and plan.get("start_date") != start_date:
-        plan = initialize_weekly_plan(start_date)
-    auto_generate_weekly_plan(plan, start_date=start_date)
+    with locked("plan"):
+        plan = load_weekly_plan()
+        if start_date and plan and plan.get("start_date") != start_date:
+            plan = initialize_weekly_plan(start_date)
+        auto_generate_weekly_plan(plan, start_date=start_date)
     return redirect(url_for("plan_view"))
 
 
-@app.route("/shopping-list")
-def shopping_list_view():
+def _shopping_lists(lang):
+    # (weekly ingredients not yet on the list, shopping list items)
     plan = load_weekly_plan()
-    lang = request.args.get("lang", "en")
-    weekly_items = compute_shopping_list(plan, language=lang) or []
+    weekly_items = get_shopping_list(plan, language=lang) or []
     state = sync_shopping_state(weekly_items, language=lang)
     weekly_by_key = {item["key"]: item for item in weekly_items}
-    for item in weekly_items:
-        key = item["key"]
-        if key.startswith(f"{lang}|"):
-            parts = key.split("|", 2)
-            if len(parts) == 3:
-                legacy_key = f"{parts[1]}|{parts[2]}"
-                weekly_by_key.setdefault(legacy_key, item)
     shopping_items = []
     for key, stored in state.items():
         weekly = weekly_by_key.get(key)
@@ -171,11 +291,35 @@ def shopping_list_view():
                 }
             )
     weekly_list = [item for item in weekly_items if item["key"] not in state]
-    recipes_by_id = {r.get("recipe_id"): r for r in load_recipes()}
+    return weekly_list, shopping_items
+
+
+@app.route("/shopping-list")
+@conditional("plan", "shopping", "recipes", "config", "ingredients")
+def shopping_list_view():
+    lang = request.args.get("lang", "en")
+    weekly_list, shopping_items = _shopping_lists(lang)
+    # Rows are keyed on their own contents, so a quantity edit re-renders one row.
+    weekly_rows = [
+        _shopping_row("partials/shopping_weekly_row.html", item, lang) for item in weekly_list
+    ]
+    shopping_rows = [
+        _shopping_row("partials/shopping_item_row.html", item, lang) for item in shopping_items
+    ]
+    # The recipe drawer only needs the recipes these rows point at.
+    recipe_ids = set()
+    for item in [*weekly_list, *shopping_items]:
+        recipe_ids.update(item.get("recipe_ids", []))
+    recipes_by_id = {
+        recipe_id: {field: recipe.get(field) for field in DRAWER_RECIPE_FIELDS}
+        for recipe_id, recipe in recipes_by_ids(sorted(recipe_ids)).items()
+    }
     return render_template(
         "shopping_list.html",
         weekly_list=weekly_list,
+        weekly_rows=weekly_rows,
         shopping_items=shopping_items,
+        shopping_rows=shopping_rows,
         lang=lang,
         recipes_by_id=recipes_by_id,
     )
@@ -190,15 +334,16 @@ def shopping_list_add():
     lang = request.form.get("lang", "en")
     if not key or not name:
         return redirect(url_for("shopping_list_view", lang=lang))
-    state = load_shopping_state()
-    state[key] = {
-        "name": name,
-        "unit": unit,
-        "quantity": quantity,
-        "manual": False,
-        "lang": lang,
-    }
-    save_shopping_state(state)
+    with locked("shopping"):
+        state = load_shopping_state()
+        state[key] = {
+            "name": name,
+            "unit": unit,
+            "quantity": quantity,
+            "manual": False,
+            "lang": lang,
+        }
+        save_shopping_state(state)
     return redirect(url_for("shopping_list_view", lang=lang))
 
 
@@ -206,10 +351,11 @@ def shopping_list_add():
 def shopping_list_remove():
     key = request.form.get("key", "")
     lang = request.form.get("lang", "en")
-    state = load_shopping_state()
-    if key in state:
-        state.pop(key, None)
-        save_shopping_state(state)
+    with locked("shopping"):
+        state = load_shopping_state()
+        if key in state:
+            state.pop(key, None)
+            save_shopping_state(state)
     return redirect(url_for("shopping_list_view", lang=lang))
 
 
@@ -218,10 +364,11 @@ def shopping_list_update():
     key = request.form.get("key", "")
     quantity = request.form.get("quantity", "")
     lang = request.form.get("lang", "en")
-    state = load_shopping_state()
-    if key in state:
-        state[key]["quantity"] = quantity
-        save_shopping_state(state)
+    with locked("shopping"):
+        state = load_shopping_state()
+        if key in state:
+            state[key]["quantity"] = quantity
+            save_shopping_state(state)
     return redirect(url_for("shopping_list_view", lang=lang))
 
 
@@ -234,49 +381,85 @@ def shopping_list_add_manual():
     if not name:
         return redirect(url_for("shopping_list_view", lang=lang))
     key = f"manual:{uuid.uuid4().hex}"
-    state = load_shopping_state()
-    state[key] = {
-        "name": name,
-        "unit": unit,
-        "quantity": quantity,
-        "manual": True,
-        "lang": lang,
-    }
-    save_shopping_state(state)
+    with locked("shopping"):
+        state = load_shopping_state()
+        state[key] = {
+            "name": name,
+            "unit": unit,
+            "quantity": quantity,
+            "manual": True,
+            "lang": lang,
+        }
+        save_shopping_state(state)
     return redirect(url_for("shopping_list_view", lang=lang))
 
 
+HISTORY_PAGE_SIZE = 50
+
+
 @app.route("/history")
+@conditional("history")
 def history_view():
-    history = load_plan_history()
+    limit = request.args.get("limit", type=int) or HISTORY_PAGE_SIZE
+    start_date = request.args.get("start_date") or None
+    history = load_plan_history(limit=limit, start_date=start_date)
     return render_template("history.html", history=history, format_date=format_date)
 
 
+RECIPE_PAGE_SIZE = 50
+MAX_RECIPE_PAGE_SIZE = 200
+
+
+def _page_limit():
+    limit = request.args.get("limit", type=int) or RECIPE_PAGE_SIZE
+    return max(1, min(limit, MAX_RECIPE_PAGE_SIZE))
+
+
 @app.route("/recipes")
+@conditional("recipes")
 def recipes_view():
-    recipes = load_recipes()
     filters = request.args.getlist("meal_type")
-    if filters:
-        recipes = [
-            recipe
-            for recipe in recipes
-            if any(meal in recipe.get("meal_types", []) for meal in filters)
-        ]
-    return render_template("recipes.html", recipes=recipes, filters=filters)
+    page = recipe_page(
+        meal_types=filters, after=request.args.get("after"), limit=_page_limit()
+    )
+    return render_template(
+        "recipes.html",
+        recipes=page["recipes"],
+        filters=filters,
+        next_cursor=page["next"],
+        paged=bool(request.args.get("after")),
+    )
+
+
+@app.route("/recipes/search")
+@conditional("recipes")
+def recipes_search():
+    query = request.args.get("q", "").strip()
+    filters = request.args.getlist("meal_type")
+    if not query:
+        return redirect(url_for("recipes_view", meal_type=filters))
+    recipes = search_recipes(query, limit=_page_limit(), meal_types=filters)
+    return render_template(
+        "recipes.html", recipes=recipes, filters=filters, query=query, paged=False
+    )
+
+
+def _recipe_with_source(recipe_id):
+    recipe = get_recipe_by_id(recipe_id)
+    if recipe and not recipe.get("source_url"):
+        source = load_recipe_source(recipe_id)
+        if source:
+            recipe["source_url"] = source.get("source_url")
+    return recipe
 
 
 @app.route("/recipes/<recipe_id>")
+@conditional("recipes", "recipe_sources")
 def recipe_detail(recipe_id):
-    recipe = get_recipe_by_id(recipe_id)
+    recipe = _recipe_with_source(recipe_id)
     if not recipe:
         return redirect(url_for("recipes_view"))
-    source_url = recipe.get("source_url")
-    if not source_url:
-        source = load_recipe_source(recipe_id)
-        if source:
-            source_url = source.get("source_url")
-            recipe["source_url"] = source_url
-    youtube_id = _youtube_id(source_url)
+    youtube_id = youtube_video_id(recipe.get("source_url"))
     embed_url = f"https://www.youtube.com/embed/{youtube_id}" if youtube_id else None
     return render_template(
         "recipe_detail.html",
@@ -301,25 +484,28 @@ def recipe_edit(recipe_id):
             meal_types = [t.strip() for t in meal_types_raw.split(",") if t.strip()]
             servings = request.form.get("servings", "").strip()
             source_url = request.form.get("source_url", "").strip()
-            recipe.update(
-                {
-                    "name": name,
-                    "meal_types": meal_types,
-                    "servings": int(servings) if servings.isdigit() else recipe.get("servings"),
-                    "source_url": source_url or None,
-                    "ingredients": _parse_ingredients(request.form.get("ingredients", "")),
-                    "ingredients_original": _parse_ingredients(
-                        request.form.get("ingredients_original", "")
-                    ),
-                    "instructions": _parse_instructions(
-                        request.form.get("instructions", "")
-                    ),
-                    "instructions_original": _parse_instructions(
-                        request.form.get("instructions_original", "")
-                    ),
-                }
-            )
-            if not update_recipe(recipe_id, recipe):
+            with locked("recipes"):
+                recipe = get_recipe_by_id(recipe_id) or recipe
+                recipe.update(
+                    {
+                        "name": name,
+                        "meal_types": meal_types,
+                        "servings": int(servings) if servings.isdigit() else recipe.get("servings"),
+                        "source_url": source_url or None,
+                        "ingredients": _parse_ingredients(request.form.get("ingredients", "")),
+                        "ingredients_original": _parse_ingredients(
+                            request.form.get("ingredients_original", "")
+                        ),
+                        "instructions": _parse_instructions(
+                            request.form.get("instructions", "")
+                        ),
+                        "instructions_original": _parse_instructions(
+                            request.form.get("instructions_original", "")
+                        ),
+                    }
+                )
+                saved = update_recipe(recipe_id, recipe)
+            if not saved:
                 error = "Unable to save recipe. Try again."
             else:
                 return redirect(url_for("recipe_detail", recipe_id=recipe_id))
@@ -327,11 +513,15 @@ def recipe_edit(recipe_id):
 
 
 @app.route("/plan/select")
+@conditional("plan", "recipes")
 def plan_select():
     date_str = request.args.get("date")
     meal_type = request.args.get("meal")
-    recipes = load_recipes()
-    plan = load_weekly_plan() or initialize_weekly_plan()
+    # As in plan_view: the lock is only taken to write a first plan.
+    plan = load_weekly_plan()
+    if not plan:
+        with locked("plan"):
+            plan = load_weekly_plan() or initialize_weekly_plan()
     used_ids = set()
     for day in plan.get("days", []):
         if day.get("date") == date_str:
@@ -339,18 +529,31 @@ def plan_select():
                 if meal and meal.get("recipe_id"):
                     used_ids.add(meal.get("recipe_id"))
             break
-    available = [
-        recipe
-        for recipe in recipes
-        if recipe.get("recipe_id") not in used_ids
-        and (not meal_type or meal_type in recipe.get("meal_types", []))
-    ]
+    meal_types = [meal_type] if meal_type else None
+    query = request.args.get("q", "").strip()
+    if query:
+        page = {
+            "recipes": search_recipes(
+                query, limit=_page_limit(), meal_types=meal_types, exclude=used_ids
+            ),
+            "next": None,
+        }
+    else:
+        page = recipe_page(
+            meal_types=meal_types,
+            exclude=used_ids,
+            after=request.args.get("after"),
+            limit=_page_limit(),
+        )
     return render_template(
         "plan_select.html",
-        recipes=available,
+        recipes=page["recipes"],
         date=date_str,
         meal_type=meal_type,
+        query=query,
         format_date=format_date,
+        next_cursor=page["next"],
+        paged=bool(request.args.get("after")),
     )
 
 
@@ -361,12 +564,13 @@ def plan_assign():
     recipe_id = request.form.get("recipe_id")
     if not (date_str and meal_type and recipe_id):
         return redirect(url_for("plan_view"))
-    plan = load_weekly_plan() or initialize_weekly_plan()
     recipe = get_recipe_by_id(recipe_id)
     if not recipe:
         return redirect(url_for("plan_view"))
-    assign_meal(plan, date_str, meal_type, recipe)
-    save_weekly_plan(plan)
+    with locked("plan"):
+        plan = load_weekly_plan() or initialize_weekly_plan()
+        assign_meal(plan, date_str, meal_type, recipe)
+        save_weekly_plan(plan)
     return redirect(url_for("plan_view"))
 
 
@@ -376,14 +580,15 @@ def plan_toggle_lock():
     meal_type = request.form.get("meal_type")
     if not (date_str and meal_type):
         return redirect(url_for("plan_view"))
-    plan = load_weekly_plan() or initialize_weekly_plan()
-    for day in plan.get("days", []):
-        if day.get("date") == date_str:
-            meal = day.get("meals", {}).get(meal_type)
-            if meal:
-                meal["locked"] = not meal.get("locked", False)
-                save_weekly_plan(plan)
-            break
+    with locked("plan"):
+        plan = load_weekly_plan() or initialize_weekly_plan()
+        for day in plan.get("days", []):
+            if day.get("date") == date_str:
+                meal = day.get("meals", {}).get(meal_type)
+                if meal:
+                    meal["locked"] = not meal.get("locked", False)
+                    save_weekly_plan(plan)
+                break
     return redirect(url_for("plan_view"))
 
 
@@ -393,31 +598,34 @@ def plan_clear():
     meal_type = request.form.get("meal_type")
     if not (date_str and meal_type):
         return redirect(url_for("plan_view"))
-    plan = load_weekly_plan() or initialize_weekly_plan()
-    clear_meal(plan, date_str, meal_type)
-    save_weekly_plan(plan)
+    with locked("plan"):
+        plan = load_weekly_plan() or initialize_weekly_plan()
+        clear_meal(plan, date_str, meal_type)
+        save_weekly_plan(plan)
     return redirect(url_for("plan_view"))
 
 
 @app.route("/plan/lock-all", methods=["POST"])
 def plan_lock_all():
-    plan = load_weekly_plan() or initialize_weekly_plan()
-    for day in plan.get("days", []):
-        for meal in day.get("meals", {}).values():
-            if meal:
-                meal["locked"] = True
-    save_weekly_plan(plan)
+    with locked("plan"):
+        plan = load_weekly_plan() or initialize_weekly_plan()
+        for day in plan.get("days", []):
+            for meal in day.get("meals", {}).values():
+                if meal:
+                    meal["locked"] = True
+        save_weekly_plan(plan)
     return redirect(url_for("plan_view"))
 
 
 @app.route("/plan/unlock-all", methods=["POST"])
 def plan_unlock_all():
-    plan = load_weekly_plan() or initialize_weekly_plan()
-    for day in plan.get("days", []):
-        for meal in day.get("meals", {}).values():
-            if meal:
-                meal["locked"] = False
-    save_weekly_plan(plan)
+    with locked("plan"):
+        plan = load_weekly_plan() or initialize_weekly_plan()
+        for day in plan.get("days", []):
+            for meal in day.get("meals", {}).values():
+                if meal:
+                    meal["locked"] = False
+        save_weekly_plan(plan)
     return redirect(url_for("plan_view"))
 
 
@@ -520,7 +728,11 @@ def recipes_import():
                         payload["recipe_id"] = recipe_id or uuid.uuid4().hex
                     if not payload.get("source_url") and source_url:
                         payload["source_url"] = source_url
-                    if has_recipe_id(payload["recipe_id"]):
+                    with locked("recipes"):
+                        exists = has_recipe_id(payload["recipe_id"])
+                        if not exists:
+                            add_recipe(payload)
+                    if exists:
                         error = (
                             "Recipe ID already exists. Please use a new ID or edit "
                             "the existing recipe."
@@ -532,7 +744,6 @@ def recipes_import():
                             recipe_id=payload["recipe_id"],
                             source_url=source_url,
                         )
-                    add_recipe(payload)
                     return redirect(url_for("recipes_view"))
             except json.JSONDecodeError as exc:
                 error = f"Invalid JSON: {exc}"
@@ -545,5 +756,67 @@ def recipes_import():
     )
 
 
+# JSON API. Lists return summary records (id, name, meal types, thumbnail);
+# detail routes return full payloads.
+
+
+def _api_response(payload, status=200):
+    return app.response_class(
+        json_codec.dumps(payload), status=status, mimetype="application/json"
+    )
+
+
+def _api_error(message, status):
+    return _api_response({"error": message}, status)
+
+
+@app.route("/api/recipes")
+@conditional("recipes")
+def api_recipes():
+    filters = request.args.getlist("meal_type")
+    query = request.args.get("q", "").strip()
+    if query:
+        recipes = search_recipes(query, limit=_page_limit(), meal_types=filters, summary=True)
+        return _api_response({"recipes": recipes, "next": None})
+    page = recipe_page(
+        meal_types=filters, after=request.args.get("after"), limit=_page_limit(), summary=True
+    )
+    return _api_response(page)
+
+
+@app.route("/api/recipes/<recipe_id>")
+@conditional("recipes", "recipe_sources")
+def api_recipe_detail(recipe_id):
+    recipe = _recipe_with_source(recipe_id)
+    if not recipe:
+        return _api_error("Recipe not found.", 404)
+    return _api_response(recipe)
+
+
+@app.route("/api/plan")
+@conditional("plan")
+def api_plan():
+    plan = load_weekly_plan()
+    if not plan:
+        return _api_error("No plan found yet.", 404)
+    return _api_response(plan)
+
+
+@app.route("/api/shopping-list")
+@conditional("plan", "shopping", "recipes", "config", "ingredients")
+def api_shopping_list():
+    lang = request.args.get("lang", "en")
+    weekly_list, shopping_items = _shopping_lists(lang)
+    return _api_response({"lang": lang, "weekly": weekly_list, "shopping": shopping_items})
+
+
+@app.route("/api/history")
+@conditional("history")
+def api_history():
+    limit = request.args.get("limit", type=int) or HISTORY_PAGE_SIZE
+    start_date = request.args.get("start_date") or None
+    return _api_response({"history": load_plan_history(limit=limit, start_date=start_date)})
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,149 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.compare import DEFAULT_FLOOR_MS, DEFAULT_THRESHOLD, compare, format_rows
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_corpus(args, backend, size):
+    with tempfile.TemporaryDirectory(prefix="planner-bench-") as tmp:
+        result_path = Path(tmp) / "result.json"
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.worker",
+            "--data",
+            str(Path(tmp) / "data"),
+            "--result",
+            str(result_path),
+            "--recipes",
+            str(size),
+            "--weeks",
+            str(args.weeks),
+            "--shopping-items",
+            str(args.shopping_items),
+            "--backend",
+            backend,
+            "--repeat",
+            str(args.repeat),
+            "--seed",
+            str(args.seed),
+        ]
+        if args.no_routes:
+            command.append("--no-routes")
+        subprocess.run(command, cwd=REPO_DIR, check=True)
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def _print_results(results):
+    for group, result in results.items():
+        print(f"\n{group}  (setup {result['setup']})")
+        for name, stats in result["scenarios"].items():
+            print(f"  {name:<56} {stats['median_ms']:>10.2f} ms  (best {stats['best_ms']:.2f})")
+
+
+def run(args):
+    sizes = [int(value) for value in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    corpora = {}
+    for backend in backends:
+        for size in sizes:
+            print(f"Running {backend}/{size}...", file=sys.stderr)
+            corpora[f"{backend}/{size}"] = _run_corpus(args, backend, size)
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "backends": backends,
+            "weeks": args.weeks,
+            "shopping_items": args.shopping_items,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "corpora": {group: {"setup": c["setup"], "environment": c["environment"]} for group, c in corpora.items()},
+        "results": {group: c["scenarios"] for group, c in corpora.items()},
+    }
+    _print_results(corpora)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nWrote {args.out}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        return _report_comparison(baseline, report, args)
+    return 0
+
+
+def _report_comparison(baseline, current, args):
+    rows = compare(baseline, current, args.threshold, args.floor_ms)
+    print()
+    print(format_rows(rows))
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}.")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} across {len(rows)} scenario(s).")
+    return 0
+
+
+def compare_files(args):
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    return _report_comparison(baseline, current, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmark planner hot paths on synthetic data."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Generate corpora and time every scenario.")
+    run_parser.add_argument("--sizes", default="1000,10000", help="Recipe counts, e.g. 1000,100000.")
+    run_parser.add_argument("--backends", default="json", help="json, sqlite or json,sqlite.")
+    run_parser.add_argument("--weeks", type=int, default=520, help="Plan history length.")
+    run_parser.add_argument("--shopping-items", type=int, default=2000)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--no-routes", action="store_true", help="Skip the Flask routes.")
+    run_parser.add_argument("--out", help="Write the results JSON here.")
+    run_parser.add_argument("--baseline", help="Compare against this results JSON.")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+        sub.add_argument("--floor-ms", type=float, default=DEFAULT_FLOOR_MS)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        return run(args)
+    return compare_files(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import math
+
+# A scenario regresses when its median is both `threshold` slower (relative)
+# and `floor_ms` slower (absolute) than the baseline, so sub-millisecond noise
+# on fast paths does not fail a run.
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_FLOOR_MS = 1.0
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, floor_ms=DEFAULT_FLOOR_MS):
+    rows = []
+    base_results = baseline.get("results", {})
+    for group, scenarios in current.get("results", {}).items():
+        for name, stats in scenarios.items():
+            base = base_results.get(group, {}).get(name)
+            if base is None:
+                continue
+            before = base["median_ms"]
+            after = stats["median_ms"]
+            ratio = after / before if before else math.inf
+            regressed = ratio > 1 + threshold and after - before > floor_ms
+            rows.append(
+                {
+                    "group": group,
+                    "scenario": name,
+                    "baseline_ms": before,
+                    "current_ms": after,
+                    "change": ratio - 1,
+                    "regressed": regressed,
+                }
+            )
+    return rows
+
+
+def format_rows(rows):
+    lines = [f"{'corpus':<14} {'scenario':<52} {'base ms':>9} {'now ms':>9} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(
+            f"{row['group']:<14} {row['scenario'][:52]:<52} {row['baseline_ms']:>9.2f} "
+            f"{row['current_ms']:>9.2f} {row['change'] * 100:>+7.1f}%{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+import copy
+import random
+import statistics
+import time
+from datetime import date
+
+# Timed scenarios. Each is (name, fn, setup): setup runs untimed before every
+# call of fn, so cold-cache and write paths start from the same state.
+
+LOOKUPS_PER_RUN = 500
+
+
+def measure(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "best_ms": round(min(timings), 3),
+        "runs": repeat,
+    }
+
+
+def planner_scenarios(planner, dataset, seed=0):
+    rng = random.Random(seed)
+    recipe_ids = [recipe["recipe_id"] for recipe in dataset["recipes"]]
+    lookups = [rng.choice(recipe_ids) for _ in range(LOOKUPS_PER_RUN)]
+    plan = dataset["plan"]
+    start_date = date.fromisoformat(plan["start_date"])
+    weekly_items = planner.get_shopping_list(plan) or []
+
+    def cold_catalog():
+        # A fresh storage object and an empty file cache, as in a new worker.
+        planner.invalidate_recipe_cache()
+        planner.set_storage(None)
+
+    def lookup():
+        for recipe_id in lookups:
+            planner.get_recipe_by_id(recipe_id)
+
+    def locked_plan():
+        state["plan"] = copy.deepcopy(plan)
+        for day in state["plan"]["days"][:2]:
+            day["meals"]["dinner"]["locked"] = True
+
+    def restore_shopping():
+        planner.save_shopping_state(dataset["shopping"])
+
+    state = {}
+    return [
+        ("load_recipes.cold", planner.load_recipes, cold_catalog),
+        ("load_recipes.warm", planner.load_recipes, None),
+        (f"get_recipe_by_id.x{LOOKUPS_PER_RUN}", lookup, None),
+        ("generate_meal_plans", lambda: planner.generate_meal_plans(start_date), None),
+        (
+            "auto_generate_weekly_plan",
+            lambda: planner.auto_generate_weekly_plan(state["plan"]),
+            locked_plan,
+        ),
+        ("compute_shopping_list.en", lambda: planner.compute_shopping_list(plan), None),
+        (
+            "compute_shopping_list.original",
+            lambda: planner.compute_shopping_list(plan, language="original"),
+            None,
+        ),
+        ("get_shopping_list.en", lambda: planner.get_shopping_list(plan), None),
+        (
+            "sync_shopping_state",
+            lambda: planner.sync_shopping_state(weekly_items, language="en"),
+            restore_shopping,
+        ),
+        ("append_plan_history", lambda: planner.append_plan_history(plan), None),
+        ("load_plan_history.recent", lambda: planner.load_plan_history(limit=50), None),
+    ]
+
+
+def route_scenarios(client, dataset):
+    plan = dataset["plan"]
+    first_day = plan["days"][0]["date"]
+    recipe = dataset["recipes"][len(dataset["recipes"]) // 2]
+    word = recipe["name"].split()[0].lower()
+    gets = [
+        "/plan",
+        "/shopping-list",
+        "/shopping-list?lang=original",
+        "/history",
+        "/recipes",
+        f"/recipes?after={recipe['recipe_id']}&meal_type=lunch",
+        f"/recipes/search?q={word}",
+        f"/recipes/{recipe['recipe_id']}",
+        f"/plan/select?date={first_day}&meal=lunch",
+        "/api/recipes",
+        f"/api/recipes/{recipe['recipe_id']}",
+        "/api/plan",
+        "/api/shopping-list",
+        "/api/history",
+    ]
+
+    def get(url):
+        def fn():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+        return fn
+
+    def post(url, data):
+        def fn():
+            response = client.post(url, data=data)
+            if response.status_code >= 400:
+                raise RuntimeError(f"POST {url} returned {response.status_code}")
+
+        return fn
+
+    scenarios = [(f"GET {url}", get(url), None) for url in gets]
+    scenarios.append(
+        (
+            "POST /plan/toggle-lock",
+            post("/plan/toggle-lock", {"date": first_day, "meal_type": "lunch"}),
+            None,
+        )
+    )
+    scenarios.append(
+        (
+            "POST /shopping-list/update",
+            post("/shopping-list/update", {"key": next(iter(dataset["shopping"])), "quantity": "2"}),
+            None,
+        )
+    )
+    return scenarios
@@ -0,0 +1,222 @@
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import json_codec
+
+# Deterministic synthetic data in the planner's JSON layout. planner itself is
+# not imported here: it reads PLANNER_DATA_DIR at import time, so the runner
+# writes the tree first and imports planner afterwards.
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+DICTIONARY_FILE = REPO_DIR / "data" / "ingredients.json"
+MEAL_TYPES = ("breakfast", "lunch", "dinner")
+FIRST_WEEK = date(2015, 1, 5)
+
+# (English unit, Korean unit, weight, quantity choices). cup and pinch have no
+# alias on purpose: real recipes carry units the normalizer passes through.
+UNIT_MIX = (
+    ("g", "g", 28, (5, 10, 20, 50, 100, 150, 200, 300, 500)),
+    ("ml", "ml", 12, (15, 30, 50, 100, 200, 250, 500)),
+    ("tbsp", "큰술", 16, (0.5, 1, 1.5, 2, 3, 4)),
+    ("tsp", "작은술", 12, (0.25, 0.5, 1, 2, 3)),
+    ("count", "개", 16, (1, 2, 3, 4, 6)),
+    ("cup", "컵", 6, (0.25, 0.5, 1, 2, 3)),
+    ("kg", "kg", 2, (0.5, 1, 1.5, 2)),
+    ("l", "리터", 1, (0.5, 1, 1.5)),
+    ("pinch", "꼬집", 3, (1, 2)),
+    ("", "", 4, (0, 1)),
+)
+LONG_TAIL = 2000
+DICTIONARY_SHARE = 0.55
+ALIAS_SHARE = 0.2
+FLAVOURS = (
+    ("Kimchi", "김치"),
+    ("Spicy pork", "제육"),
+    ("Tofu", "두부"),
+    ("Egg", "계란"),
+    ("Beef", "소고기"),
+    ("Mushroom", "버섯"),
+    ("Chicken", "닭"),
+    ("Seafood", "해물"),
+    ("Potato", "감자"),
+    ("Zucchini", "애호박"),
+    ("Spinach", "시금치"),
+    ("Anchovy", "멸치"),
+)
+DISHES = (
+    ("stew", "찌개"),
+    ("soup", "국"),
+    ("fried rice", "볶음밥"),
+    ("noodles", "국수"),
+    ("pancake", "전"),
+    ("salad", "샐러드"),
+    ("stir-fry", "볶음"),
+    ("braise", "조림"),
+    ("porridge", "죽"),
+    ("rice bowl", "덮밥"),
+)
+
+
+class Vocabulary:
+    # Ingredient names: the real dictionary (sometimes via an alias, so
+    # matching is exercised) plus a long tail of names it does not know.
+    def __init__(self, rng):
+        payload = json.loads(DICTIONARY_FILE.read_text(encoding="utf-8"))
+        self.dictionary = [
+            (entry["en"], entry["ko"], entry.get("aliases") or [])
+            for entry in payload.get("ingredients", [])
+            if entry.get("en") and entry.get("ko")
+        ]
+        self.long_tail = [(f"ingredient {idx}", f"재료 {idx}") for idx in range(LONG_TAIL)]
+        self.units = [item[:2] + (item[3],) for item in UNIT_MIX]
+        self.unit_weights = [item[2] for item in UNIT_MIX]
+        self.rng = rng
+
+    def line(self):
+        rng = self.rng
+        if self.dictionary and rng.random() < DICTIONARY_SHARE:
+            en, ko, aliases = rng.choice(self.dictionary)
+            if aliases and rng.random() < ALIAS_SHARE:
+                alias = rng.choice(aliases)
+                # Aliases are in either language.
+                if alias.isascii():
+                    en = alias
+                else:
+                    ko = alias
+        else:
+            en, ko = rng.choice(self.long_tail)
+        en_unit, ko_unit, quantities = rng.choices(self.units, self.unit_weights)[0]
+        quantity = rng.choice(quantities)
+        return (
+            {"name": en, "quantity": quantity, "unit": en_unit},
+            {"name": ko, "quantity": quantity, "unit": ko_unit},
+        )
+
+
+def make_recipes(count, rng, vocabulary):
+    recipes = []
+    for idx in range(count):
+        flavour, flavour_ko = rng.choice(FLAVOURS)
+        dish, dish_ko = rng.choice(DISHES)
+        lines = [vocabulary.line() for _ in range(rng.randint(4, 16))]
+        ingredients = [en for en, _ in lines]
+        ingredients_original = [ko for _, ko in lines]
+        steps = rng.sample(lines, k=min(len(lines), rng.randint(3, 8)))
+        video_id = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(11))
+        recipes.append(
+            {
+                "recipe_id": f"bench-{idx:06d}",
+                "name": f"{flavour} {dish} {idx}",
+                "name_original": f"{flavour_ko}{dish_ko} {idx}",
+                "meal_types": rng.sample(MEAL_TYPES, k=rng.choices((1, 2, 3), (6, 3, 1))[0]),
+                "servings": rng.choice((1, 2, 2, 3, 4, 4, 6)),
+                "source_url": f"https://www.youtube.com/watch?v={video_id}",
+                "thumbnail_url": "",
+                "ingredients": ingredients,
+                "ingredients_original": ingredients_original,
+                "instructions": [
+                    f"Add the {en['name']} and cook for {rng.randint(1, 20)} minutes."
+                    for en, _ in steps
+                ],
+                "instructions_original": [
+                    f"{ko['name']}을(를) 넣고 {rng.randint(1, 20)}분간 익힌다." for _, ko in steps
+                ],
+            }
+        )
+    return recipes
+
+
+def _plan(week_start, recipes, rng):
+    days = []
+    for offset in range(7):
+        meals = {}
+        for meal_type in MEAL_TYPES:
+            recipe = rng.choice(recipes)
+            meals[meal_type] = {
+                "recipe_id": recipe["recipe_id"],
+                "name": recipe["name"],
+                "ingredients": [dict(item) for item in recipe["ingredients"]],
+                "locked": rng.random() < 0.1,
+            }
+        days.append({"date": (week_start + timedelta(days=offset)).isoformat(), "meals": meals})
+    return {"start_date": week_start.isoformat(), "days": days}
+
+
+def make_history(weeks, recipes, rng):
+    history = []
+    for week in range(weeks):
+        week_start = FIRST_WEEK + timedelta(weeks=week)
+        history.append(
+            {
+                "generated_at": f"{week_start.isoformat()}T08:00:00",
+                "plan": _plan(week_start, recipes, rng),
+            }
+        )
+    return history
+
+
+def make_shopping_state(count, plan, rng, vocabulary):
+    # Ticked rows for this week's ingredients, stale rows from old weeks and
+    # manual additions, in both languages.
+    state = {}
+    for day in plan["days"]:
+        for meal in day["meals"].values():
+            for item in meal["ingredients"]:
+                key = f"en|{item['name'].lower()}|{item['unit']}"
+                state[key] = {
+                    "name": item["name"],
+                    "unit": item["unit"],
+                    "quantity": item["quantity"],
+                    "manual": False,
+                    "lang": "en",
+                }
+    idx = 0
+    while len(state) < count:
+        en, ko = vocabulary.line()
+        lang, item = ("en", en) if rng.random() < 0.7 else ("original", ko)
+        if rng.random() < 0.15:
+            key = f"manual:{idx:032x}"
+        else:
+            key = f"{lang}|{item['name'].lower()}|{item['unit']}|{idx}"
+        state[key] = {
+            "name": item["name"],
+            "unit": item["unit"],
+            "quantity": item["quantity"],
+            "manual": key.startswith("manual:"),
+            "lang": lang,
+        }
+        idx += 1
+    return state
+
+
+def make_dataset(recipes=1000, weeks=520, shopping_items=2000, seed=0):
+    rng = random.Random(seed)
+    vocabulary = Vocabulary(rng)
+    catalog = make_recipes(recipes, rng, vocabulary)
+    history = make_history(weeks, catalog, rng)
+    plan = history[-1]["plan"] if history else _plan(FIRST_WEEK, catalog, rng)
+    return {
+        "recipes": catalog,
+        "history": history,
+        "plan": plan,
+        "shopping": make_shopping_state(shopping_items, plan, rng, vocabulary),
+        "config": {"family_size": 4, "max_repeat_per_week": 2, "allow_repeats_if_needed": True},
+    }
+
+
+def write_json_tree(data_dir, dataset):
+    # The layout JsonStorage reads; indexes are left for planner to build.
+    data_dir = Path(data_dir)
+    recipes_dir = data_dir / "recipes"
+    recipes_dir.mkdir(parents=True, exist_ok=True)
+    for recipe in dataset["recipes"]:
+        path = recipes_dir / f"{recipe['recipe_id']}.json"
+        path.write_bytes(json_codec.dumps(recipe, pretty=True))
+    (data_dir / "ingredients.json").write_bytes(DICTIONARY_FILE.read_bytes())
+    (data_dir / "config.json").write_bytes(json_codec.dumps(dataset["config"], pretty=True))
+    (data_dir / "weekly_plan.json").write_bytes(json_codec.dumps(dataset["plan"]))
+    (data_dir / "shopping_list.json").write_bytes(json_codec.dumps(dataset["shopping"]))
+    with (data_dir / "plan_history.jsonl").open("wb") as f:
+        f.writelines(json_codec.dumps(entry) + b"\n" for entry in dataset["history"])
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from benchmarks.scenarios import measure, planner_scenarios, route_scenarios
+from benchmarks.synthetic import make_dataset, write_json_tree
+
+# One corpus size and backend per process: planner binds DATA_DIR at import,
+# so the data tree is written and the environment set before importing it.
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, round(time.perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios for one corpus.")
+    parser.add_argument("--data", required=True, help="Empty directory for the synthetic tree.")
+    parser.add_argument("--result", required=True, help="Where to write the JSON result.")
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--weeks", type=int, default=520)
+    parser.add_argument("--shopping-items", type=int, default=2000)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-routes", action="store_true")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data)
+    dataset, generate_s = _timed(
+        lambda: make_dataset(args.recipes, args.weeks, args.shopping_items, args.seed)
+    )
+    _, write_s = _timed(lambda: write_json_tree(data_dir, dataset))
+    os.environ["PLANNER_DATA_DIR"] = str(data_dir)
+    os.environ["PLANNER_STORAGE"] = args.backend
+    os.environ["PLANNER_DB"] = str(data_dir / "planner.db")
+
+    import json_codec
+    import planner
+
+    setup = {"generate_s": generate_s, "write_s": write_s}
+    if args.backend == "sqlite":
+        from sqlite_storage import SqliteStorage
+
+        _, setup["import_s"] = _timed(
+            lambda: SqliteStorage(data_dir / "planner.db").import_from(planner.JsonStorage())
+        )
+        planner.set_storage(None)
+
+    scenarios = {}
+    for name, fn, before in planner_scenarios(planner, dataset, args.seed):
+        scenarios[name] = measure(fn, args.repeat, before)
+    if not args.no_routes:
+        from app import app
+
+        client = app.test_client()
+        for name, fn, before in route_scenarios(client, dataset):
+            scenarios[name] = measure(fn, args.repeat, before)
+
+    result = {
+        "setup": setup,
+        "environment": {"json_codec": json_codec.CODEC, "numpy": planner.np is not None},
+        "scenarios": scenarios,
+    }
+    Path(args.result).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
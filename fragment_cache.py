@@ -0,0 +1,48 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Size-bounded LRU of rendered HTML fragments (plan day cards, shopping rows).
+# A key is built from what its fragment is rendered from: a fingerprint of its
+# own content (a day's meals, a shopping row) plus, for data it only points at,
+# the version of that store. An entry is never invalidated in place; after an
+# edit the changed fragments get new keys and the old entries age out.
+
+FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "2000"))
+
+
+class FragmentCache:
+    def __init__(self, max_entries=None):
+        if max_entries is None:
+            max_entries = FRAGMENT_CACHE_MAX_ENTRIES
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            html = self.entries.get(key)
+            if html is not None:
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return html
+            self.stats["misses"] += 1
+        # Rendered outside the lock; two threads racing on one key both
+        # render and the last one wins, which is harmless.
+        html = render()
+        with self._lock:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return html
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self.entries)}
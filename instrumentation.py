@@ -0,0 +1,205 @@
+import contextvars
+import os
+import threading
+import time
+from functools import wraps
+
+# Per-request accounting for the Flask app. planner reports file reads and
+# writes and wraps its hot functions with instrument(); the app starts a
+# RequestStats before each request and hands it to Metrics afterwards.
+# Outside a request (scripts, benchmarks) every hook is a no-op.
+
+SLOW_REQUEST_MS = float(os.getenv("PLANNER_SLOW_REQUEST_MS", "500"))
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("planner_request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = None
+        self.files_read = 0
+        self.files_written = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        # name -> [calls, seconds]. Seconds are self time: a section that
+        # calls another (load_recipes -> load_json) is charged only for the
+        # time not spent in the inner one, so the breakdown adds up.
+        self.sections = {}
+        self._children = []
+
+    def enter(self):
+        self._children.append(0.0)
+        return time.perf_counter()
+
+    def leave(self, name, start):
+        elapsed = time.perf_counter() - start
+        section = self.sections.setdefault(name, [0, 0.0])
+        section[0] += 1
+        section[1] += elapsed - self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def breakdown(self):
+        parts = [
+            f"files read {self.files_read} ({self.bytes_read} B)",
+            f"written {self.files_written} ({self.bytes_written} B)",
+        ]
+        accounted = 0.0
+        for name, (calls, seconds) in sorted(self.sections.items(), key=lambda item: -item[1][1]):
+            accounted += seconds
+            parts.append(f"{name} {seconds * 1000:.1f} ms x{calls}")
+        parts.append(f"other {max(0.0, self.duration - accounted) * 1000:.1f} ms")
+        return ", ".join(parts)
+
+
+def begin_request():
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def end_request():
+    stats = _current.get()
+    _current.set(None)
+    return stats.finish() if stats is not None else None
+
+
+def record_read(nbytes):
+    stats = _current.get()
+    if stats is not None:
+        stats.files_read += 1
+        stats.bytes_read += nbytes
+
+
+def record_write(nbytes):
+    stats = _current.get()
+    if stats is not None:
+        stats.files_written += 1
+        stats.bytes_written += nbytes
+
+
+def instrument(name):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None:
+                return fn(*args, **kwargs)
+            start = stats.enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.leave(name, start)
+
+        return wrapper
+
+    return decorator
+
+
+def _labels(**labels):
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class Metrics:
+    # Aggregates finished requests per (route, method) and renders them in the
+    # Prometheus text exposition format. Routes are URL rules such as
+    # /recipes/<recipe_id>, so label cardinality stays bounded.
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.routes = {}
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, stats):
+        key = (route, method)
+        with self._lock:
+            entry = self.routes.get(key)
+            if entry is None:
+                entry = self.routes[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "count": 0,
+                    "sum": 0.0,
+                    "files_read": 0,
+                    "files_written": 0,
+                    "bytes_read": 0,
+                    "bytes_written": 0,
+                    "sections": {},
+                }
+            for idx, bound in enumerate(self.buckets):
+                if stats.duration <= bound:
+                    entry["buckets"][idx] += 1
+            entry["count"] += 1
+            entry["sum"] += stats.duration
+            entry["files_read"] += stats.files_read
+            entry["files_written"] += stats.files_written
+            entry["bytes_read"] += stats.bytes_read
+            entry["bytes_written"] += stats.bytes_written
+            for name, (calls, seconds) in stats.sections.items():
+                section = entry["sections"].setdefault(name, [0, 0.0])
+                section[0] += calls
+                section[1] += seconds
+            status_key = (route, method, str(status))
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def render(self):
+        with self._lock:
+            routes = sorted(self.routes.items())
+            statuses = sorted(self.statuses.items())
+            lines = [
+                "# HELP planner_requests_total Requests handled, by route and status.",
+                "# TYPE planner_requests_total counter",
+            ]
+            for (route, method, status), count in statuses:
+                lines.append(
+                    f"planner_requests_total{_labels(route=route, method=method, status=status)} {count}"
+                )
+            lines += [
+                "# HELP planner_request_duration_seconds Time spent handling a request.",
+                "# TYPE planner_request_duration_seconds histogram",
+            ]
+            for (route, method), entry in routes:
+                for bound, count in zip(self.buckets, entry["buckets"]):
+                    labels = _labels(route=route, method=method, le=f"{bound:g}")
+                    lines.append(f"planner_request_duration_seconds_bucket{labels} {count}")
+                labels = _labels(route=route, method=method, le="+Inf")
+                lines.append(f"planner_request_duration_seconds_bucket{labels} {entry['count']}")
+                labels = _labels(route=route, method=method)
+                lines.append(f"planner_request_duration_seconds_sum{labels} {entry['sum']:.6f}")
+                lines.append(f"planner_request_duration_seconds_count{labels} {entry['count']}")
+            for field, help_text in (
+                ("files_read", "Data files opened for reading."),
+                ("bytes_read", "Bytes read from data files."),
+                ("files_written", "Data files written."),
+                ("bytes_written", "Bytes written to data files."),
+            ):
+                lines += [
+                    f"# HELP planner_request_{field}_total {help_text}",
+                    f"# TYPE planner_request_{field}_total counter",
+                ]
+                for (route, method), entry in routes:
+                    labels = _labels(route=route, method=method)
+                    lines.append(f"planner_request_{field}_total{labels} {entry[field]}")
+            lines += [
+                "# HELP planner_request_section_seconds_total Self time spent in each instrumented section.",
+                "# TYPE planner_request_section_seconds_total counter",
+            ]
+            calls = [
+                "# HELP planner_request_section_calls_total Calls of each instrumented section.",
+                "# TYPE planner_request_section_calls_total counter",
+            ]
+            for (route, method), entry in routes:
+                for name, (count, seconds) in sorted(entry["sections"].items()):
+                    labels = _labels(route=route, method=method, section=name)
+                    lines.append(f"planner_request_section_seconds_total{labels} {seconds:.6f}")
+                    calls.append(f"planner_request_section_calls_total{labels} {count}")
+        return "\n".join(lines + calls) + "\n"
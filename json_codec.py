@@ -0,0 +1,108 @@
+import json
+import os
+from collections.abc import Mapping
+from datetime import date
+
+# JSON codec for data files and API responses. orjson or msgspec is used when
+# installed, falling back to the standard library; PLANNER_JSON_CODEC=
+# orjson|msgspec|json pins one. Every codec reads the others' output, emits
+# UTF-8 and accepts the read-only recipe records (any Mapping) as they are.
+# Dates become ISO strings and sets and tuples lists; any other type is a TypeError
+# rather than a string nobody can read back.
+# Compact output is the default; pretty output (2-space indent, sorted keys) is
+# laid out the way json.dump(indent=2, sort_keys=True) always wrote files.
+
+CODECS = ("orjson", "msgspec", "json")
+
+
+def _default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, tuple):
+        return list(value)
+    # datetime is a date subclass.
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_codec():
+    import orjson
+
+    compact = orjson.OPT_NON_STR_KEYS
+    pretty_options = compact | orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+
+    def dumps(value, pretty=False):
+        return orjson.dumps(value, default=_default, option=pretty_options if pretty else compact)
+
+    # orjson.JSONDecodeError is already a ValueError.
+    return dumps, orjson.loads
+
+
+def _msgspec_codec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    sorted_encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted")
+    decoder = msgspec.json.Decoder()
+
+    def dumps(value, pretty=False):
+        if pretty:
+            return msgspec.json.format(sorted_encoder.encode(value), indent=2)
+        return encoder.encode(value)
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+    return dumps, loads
+
+
+def _stdlib_codec():
+    compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+    pretty_encoder = json.JSONEncoder(
+        ensure_ascii=False, indent=2, sort_keys=True, default=_default
+    )
+
+    def dumps(value, pretty=False):
+        return (pretty_encoder if pretty else compact).encode(value).encode("utf-8")
+
+    return dumps, json.loads
+
+
+_FACTORIES = {"orjson": _orjson_codec, "msgspec": _msgspec_codec, "json": _stdlib_codec}
+
+
+def get_codec(name):
+    # (dumps, loads) for one codec; ImportError when it is not installed.
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON codec {name!r}; expected one of {', '.join(CODECS)}.")
+    return _FACTORIES[name]()
+
+
+def available_codecs():
+    names = []
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _select(name):
+    if name and name != "auto":
+        return name, get_codec(name)
+    for candidate in CODECS:
+        try:
+            return candidate, get_codec(candidate)
+        except ImportError:
+            continue
+
+
+CODEC, (dumps, loads) = _select(os.getenv("PLANNER_JSON_CODEC", "auto"))
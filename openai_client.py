@@ -0,0 +1,101 @@
+import os
+import random
+import threading
+import time
+
+# Shared HTTP client for the OpenAI chat-completions API. One pooled
+# keep-alive session per (api key, base URL), a semaphore bounding in-flight
+# requests, and jittered exponential backoff on 429/5xx and connection errors.
+# OPENAI_BASE_URL points it at scripts/openai_stub_server.py for offline runs.
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+_CLIENTS_LOCK = threading.Lock()
+_clients = {}
+
+
+class OpenAIClient:
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        max_concurrency=None,
+        max_retries=None,
+        backoff=1.0,
+        max_backoff=30.0,
+        timeout=30,
+    ):
+        try:
+            import requests
+        except ImportError as exc:
+            raise RuntimeError("requests is not installed.") from exc
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+        if max_retries is None:
+            max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.transient_errors = (requests.ConnectionError, requests.Timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_concurrency))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        )
+        self.stats = {"requests": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _delay(self, attempt, response):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.max_backoff)
+        except ValueError:
+            pass
+        # Full jitter keeps a burst of workers from retrying in lockstep.
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def chat_completion(self, payload):
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(self.max_retries + 1):
+            response = None
+            error = None
+            with self.semaphore:
+                self._count("requests")
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+                except self.transient_errors as exc:
+                    error = exc
+            if response is not None:
+                if response.status_code == 200:
+                    return response.json()
+                error = f"{response.status_code} {response.text}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(self._delay(attempt, response))
+        raise RuntimeError(f"OpenAI API error: {error}")
+
+
+def get_openai_client(api_key, base_url=None):
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL
+    key = (api_key, base_url)
+    with _CLIENTS_LOCK:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = OpenAIClient(api_key, base_url=base_url)
+        return client
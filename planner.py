@@ -1,45 +1,177 @@
+import hashlib
+import heapq
 import json
 import os
 import random
 import re
-from collections import defaultdict
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-
-DATA_DIR = Path(__file__).parent / "data"
+from urllib.parse import parse_qs, urlparse
+
+import json_codec
+from instrumentation import instrument, record_read, record_write
+from openai_client import DEFAULT_MODEL, get_openai_client
+from recipe_model import Recipe, as_dict
+from search_index import RecipeSearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover threads in this process.
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:  # Range aggregation falls back to a pure-Python loop.
+    np = None
+
+# PLANNER_DATA_DIR points the JSON backend at another tree (benchmarks, tests).
+DATA_DIR = Path(os.getenv("PLANNER_DATA_DIR") or Path(__file__).parent / "data")
 RECIPES_DIR = DATA_DIR / "recipes"
 LEGACY_RECIPES_FILE = DATA_DIR / "recipes.json"
 PLAN_FILE = DATA_DIR / "weekly_plan.json"
 HISTORY_FILE = DATA_DIR / "weekly_plans.json"
+HISTORY_MIGRATED_FILE = DATA_DIR / "weekly_plans.json.migrated"
+HISTORY_LOG_FILE = DATA_DIR / "plan_history.jsonl"
+HISTORY_INDEX_FILE = DATA_DIR / "plan_history.idx"
 YOUTUBE_CACHE_FILE = DATA_DIR / "youtube_cache.json"
+YOUTUBE_CACHE_DIR = DATA_DIR / "youtube_cache"
+LLM_CACHE_DIR = DATA_DIR / "llm_cache"
 CONFIG_FILE = DATA_DIR / "config.json"
 RECIPE_SOURCES_DIR = DATA_DIR / "recipe_sources"
 SHOPPING_FILE = DATA_DIR / "shopping_list.json"
-
-
+RECIPE_INDEX_FILE = DATA_DIR / "recipe_index.json"
+SOURCE_INDEX_FILE = DATA_DIR / "recipe_sources_index.json"
+LOCKS_DIR = DATA_DIR / ".locks"
+VERSIONS_FILE = DATA_DIR / "versions.json"
+SQLITE_DB_FILE = DATA_DIR / "planner.db"
+SHOPPING_AGGREGATE_DOC = "shopping_aggregate"
+INGREDIENTS_DOC = "ingredients"
+# User-owned documents; derived ones (aggregates) are neither versioned nor
+# pretty-printed.
+VERSIONED_DOCUMENTS = (INGREDIENTS_DOC,)
+YOUTUBE_CACHE_TTL = int(os.getenv("YOUTUBE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+YOUTUBE_CACHE_NEGATIVE_TTL = int(os.getenv("YOUTUBE_CACHE_NEGATIVE_TTL_SECONDS", "3600"))
+YOUTUBE_CACHE_MAX_ENTRIES = int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", "500"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+# Recipes collected without a thumbnail fall back to YouTube's still.
+YOUTUBE_THUMBNAIL_URL = "https://i.ytimg.com/vi/{}/hqdefault.jpg"
+# Bump when the parsing prompt changes so cached completions are not reused.
+RECIPE_PARSE_PROMPT_VERSION = 1
+RECIPE_PARSE_TEXT_LIMIT = 5000
+
+_RECIPE_CACHE_LOCK = threading.RLock()
+_recipe_cache = {"dir_stamp": None, "paths": [], "files": {}, "recipes": None}
+_recipe_index = {"stamp": None, "index": None}
+_source_index = {"stamp": None, "index": None}
+_meal_index_cache = {"recipes": None, "index": None}
+_facet_index_cache = {"recipes": None, "index": None}
+_search_index_cache = {"recipes": None, "index": None}
+_summary_cache = {"recipes": None, "summaries": None}
+_pantry_index_cache = {"recipes": None, "version": None, "index": None}
+_aggregator_cache = {"recipes": None, "version": None, "languages": {}}
+_INGREDIENTS_LOCK = threading.Lock()
+_ingredient_dictionary = None
+_YOUTUBE_STATS_LOCK = threading.Lock()
+_youtube_cache_stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+_LLM_STATS_LOCK = threading.Lock()
+_llm_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_LLM_KEY_LOCKS = [threading.Lock() for _ in range(64)]
+_NAMED_LOCKS_GUARD = threading.Lock()
+_named_locks = {}
+_STORAGE_LOCK = threading.Lock()
+_storage = None
+
+
+@instrument("load_json")
 def _load_json(path, default):
-    if not path.exists():
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
         return default
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    record_read(len(data))
+    return json_codec.loads(data)
 
 
-def _save_json(path, payload):
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, sort_keys=True, ensure_ascii=False)
+@instrument("save_json")
+def _save_json(path, payload, pretty=False):
+    # Machine-owned files are written compact; files people edit by hand
+    # (config, recipes, the ingredient dictionary) pass pretty=True.
+    # Write a sibling temp file and rename it over the target so readers in
+    # other workers only ever see the old or the new document.
+    _write_atomic(path, json_codec.dumps(payload, pretty=pretty))
+
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    record_write(len(data))
+
+
+@contextmanager
+def locked(name):
+    # Reentrant per process (RLock) and exclusive across processes (flock on
+    # data/.locks/<name>.lock). Wrap every load -> mutate -> save sequence.
+    with _NAMED_LOCKS_GUARD:
+        entry = _named_locks.setdefault(
+            name, {"lock": threading.RLock(), "depth": 0, "handle": None}
+        )
+    with entry["lock"]:
+        if entry["depth"] == 0 and fcntl is not None:
+            LOCKS_DIR.mkdir(parents=True, exist_ok=True)
+            handle = (LOCKS_DIR / f"{name}.lock").open("a")
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            entry["handle"] = handle
+        entry["depth"] += 1
+        try:
+            yield
+        finally:
+            entry["depth"] -= 1
+            if entry["depth"] == 0 and entry["handle"] is not None:
+                fcntl.flock(entry["handle"].fileno(), fcntl.LOCK_UN)
+                entry["handle"].close()
+                entry["handle"] = None
+
+
+def _next_version(current):
+    # Millisecond clock floor: a store that is wiped and recreated never
+    # reuses a version an old client may still hold.
+    return max(current + 1, time.time_ns() // 1_000_000)
+
+
+@instrument("store_versions")
+def store_versions(*names):
+    versions = get_storage().load_versions()
+    return {name: versions.get(name, 0) for name in names}
 
 
 def load_config():
-    return _load_json(
-        CONFIG_FILE,
+    return get_storage().load_config(
         {
             "family_size": 4,
             "max_repeat_per_week": 2,
             "allow_repeats_if_needed": True,
+            "prefer_shared_ingredients": False,
         },
     )
 
 
+@instrument("normalize_recipe")
 def _normalize_recipe(recipe):
     normalized = dict(recipe)
     if not normalized.get("recipe_id"):
@@ -54,69 +186,831 @@ def _normalize_recipe(recipe):
     return normalized
 
 
+def _file_stamp(path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_recipe_file(path):
+    data = _load_json(path, None)
+    if isinstance(data, list):
+        return [Recipe(_normalize_recipe(item)) for item in data]
+    if isinstance(data, dict):
+        return [Recipe(_normalize_recipe(data))]
+    return []
+
+
+@instrument("recipe_catalog")
+def _cached_recipe_catalog():
+    # Directory mtime tells us whether files were added/removed/renamed; the
+    # per-file (mtime, size) stamp tells us whether a file was edited in place.
+    cache = _recipe_cache
+    dir_stamp = _file_stamp(RECIPES_DIR)
+    if dir_stamp is None:
+        paths = []
+    elif dir_stamp == cache["dir_stamp"]:
+        paths = cache["paths"]
+    else:
+        paths = sorted(RECIPES_DIR.glob("*.json"))
+    if LEGACY_RECIPES_FILE.exists():
+        legacy_paths = [LEGACY_RECIPES_FILE]
+    else:
+        legacy_paths = []
+
+    changed = paths is not cache["paths"] or cache["recipes"] is None
+    files = {}
+    for path in paths + legacy_paths:
+        stamp = _file_stamp(path)
+        if stamp is None:
+            changed = True
+            continue
+        entry = cache["files"].get(path)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, _read_recipe_file(path))
+            changed = True
+        files[path] = entry
+
+    if changed:
+        recipes = []
+        for path in paths:
+            if path in files:
+                recipes.extend(files[path][1])
+        if not recipes and LEGACY_RECIPES_FILE in files:
+            recipes.extend(files[LEGACY_RECIPES_FILE][1])
+        cache.update(
+            {"dir_stamp": dir_stamp, "paths": paths, "files": files, "recipes": recipes}
+        )
+    return cache["recipes"]
+
+
+def _recipe_files_stamp():
+    # Digest of the stamps _cached_recipe_catalog() compares: the directory
+    # and every recipe file. The cached file list is reused while the
+    # directory stamp matches, so this is one stat per file.
+    dir_stamp = _file_stamp(RECIPES_DIR)
+    with _RECIPE_CACHE_LOCK:
+        paths = _recipe_cache["paths"] if dir_stamp == _recipe_cache["dir_stamp"] else None
+    if paths is None:
+        paths = sorted(RECIPES_DIR.glob("*.json")) if dir_stamp else []
+    digest = hashlib.sha1(repr(dir_stamp).encode("utf-8"))
+    for path in [*paths, LEGACY_RECIPES_FILE]:
+        digest.update(f"|{path.name}:{_file_stamp(path)}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def invalidate_recipe_cache(path=None):
+    with _RECIPE_CACHE_LOCK:
+        if path is None:
+            _recipe_cache.update(
+                {"dir_stamp": None, "paths": [], "files": {}, "recipes": None}
+            )
+        else:
+            _recipe_cache["files"].pop(Path(path), None)
+            _recipe_cache["dir_stamp"] = None
+            _recipe_cache["recipes"] = None
+
+
+@instrument("load_recipes")
 def load_recipes():
-    recipes = []
-    if RECIPES_DIR.exists():
-        for path in sorted(RECIPES_DIR.glob("*.json")):
+    # The cached catalog's read-only Recipe mappings, not copies: as_dict()
+    # the few records a caller needs to change. Assigning to a record raises
+    # a TypeError that says so.
+    return list(get_storage().load_recipes())
+
+
+def _recipes_dir_stamp():
+    # Stored as a list so it compares equal after a JSON round-trip.
+    stamp = _file_stamp(RECIPES_DIR)
+    return list(stamp) if stamp else None
+
+
+def _build_recipe_index():
+    index = {"dir_stamp": _recipes_dir_stamp(), "ids": {}, "slugs": {}, "lists": [], "files": {}}
+    if not RECIPES_DIR.exists():
+        return index
+    for path in sorted(RECIPES_DIR.glob("*.json")):
+        stamp = _file_stamp(path)
+        index["files"][path.name] = list(stamp) if stamp else None
+        data = _load_json(path, None)
+        if isinstance(data, list):
+            index["lists"].append(path.name)
+        elif isinstance(data, dict):
+            recipe = _normalize_recipe(data)
+            index["ids"].setdefault(recipe["recipe_id"], path.name)
+            index["slugs"].setdefault(_slugify(recipe.get("name", "")), path.name)
+    return index
+
+
+def _save_recipe_index(index):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    _save_json(RECIPE_INDEX_FILE, index)
+    _recipe_index.update({"stamp": _file_stamp(RECIPE_INDEX_FILE), "index": index})
+
+
+def _load_recipe_index(rebuild=False):
+    # The index is trusted while the recipes directory stamp matches the one it
+    # was built against; anything that adds, removes or renames files forces a
+    # rebuild on the next lookup.
+    with _RECIPE_CACHE_LOCK:
+        index = None
+        if not rebuild:
+            stamp = _file_stamp(RECIPE_INDEX_FILE)
+            if stamp is not None and stamp == _recipe_index["stamp"]:
+                index = _recipe_index["index"]
+            elif stamp is not None:
+                index = _load_json(RECIPE_INDEX_FILE, None)
+                _recipe_index.update({"stamp": stamp, "index": index})
+        if (
+            not isinstance(index, dict)
+            or "files" not in index
+            or index.get("dir_stamp") != _recipes_dir_stamp()
+        ):
+            index = _build_recipe_index()
+            if index["dir_stamp"] is not None:
+                _save_recipe_index(index)
+        return index
+
+
+def _update_recipe_index(current, path, recipe, previous_id=None):
+    # `current` must be loaded before the recipe file is written: atomic saves
+    # bump the directory mtime, which would otherwise look like an external
+    # change and force a full rebuild.
+    with _RECIPE_CACHE_LOCK:
+        index = {
+            "dir_stamp": _recipes_dir_stamp(),
+            "ids": dict(current.get("ids", {})),
+            "slugs": dict(current.get("slugs", {})),
+            "lists": list(current.get("lists", [])),
+            "files": dict(current.get("files", {})),
+        }
+        stamp = _file_stamp(path)
+        index["files"][path.name] = list(stamp) if stamp else None
+        if previous_id and index["ids"].get(previous_id) == path.name:
+            index["ids"].pop(previous_id, None)
+        for slug, name in list(index["slugs"].items()):
+            if name == path.name:
+                index["slugs"].pop(slug)
+        index["ids"][recipe["recipe_id"]] = path.name
+        index["slugs"].setdefault(_slugify(recipe.get("name", "")), path.name)
+        _save_recipe_index(index)
+
+
+def _lookup_recipe(recipe_id):
+    if not recipe_id or not RECIPES_DIR.exists():
+        return None, None
+    index = _load_recipe_index()
+    for attempt in range(2):
+        name = index.get("ids", {}).get(recipe_id)
+        if name:
+            path = RECIPES_DIR / name
             data = _load_json(path, None)
-            if isinstance(data, list):
-                recipes.extend([_normalize_recipe(item) for item in data])
-            elif isinstance(data, dict):
-                recipes.append(_normalize_recipe(data))
-    if not recipes and LEGACY_RECIPES_FILE.exists():
-        legacy = _load_json(LEGACY_RECIPES_FILE, [])
-        if isinstance(legacy, list):
-            recipes.extend([_normalize_recipe(item) for item in legacy])
-    return recipes
+            if isinstance(data, dict):
+                recipe = _normalize_recipe(data)
+                if recipe.get("recipe_id") == recipe_id:
+                    return path, recipe
+        elif not _recipe_files_changed(index):
+            return None, None
+        if attempt == 0:
+            index = _load_recipe_index(rebuild=True)
+    return None, None
+
+
+def _recipe_files_changed(index):
+    # Editing a file in place (a hand-changed recipe_id, say) keeps the
+    # directory mtime, so a miss re-checks the per-file stamps before giving up.
+    current = {}
+    for path in RECIPES_DIR.glob("*.json"):
+        stamp = _file_stamp(path)
+        current[path.name] = list(stamp) if stamp else None
+    return current != index.get("files")
+
+
+def _has_unindexed_recipes():
+    index = _load_recipe_index()
+    return bool(index.get("lists")) or (
+        not index.get("ids") and LEGACY_RECIPES_FILE.exists()
+    )
+
+
+def get_recipe_path(recipe_id):
+    path, _ = _lookup_recipe(recipe_id)
+    return path
+
+
+def get_recipe_path_by_slug(slug):
+    if not slug or not RECIPES_DIR.exists():
+        return None
+    name = _load_recipe_index().get("slugs", {}).get(slug)
+    if not name:
+        return None
+    path = RECIPES_DIR / name
+    return path if path.exists() else None
+
+
+def rebuild_recipe_index():
+    return _load_recipe_index(rebuild=True)
+
+
+def _sources_dir_stamp():
+    stamp = _file_stamp(RECIPE_SOURCES_DIR)
+    return list(stamp) if stamp else None
+
+
+def _index_source(index, name, payload):
+    index["ids"].setdefault(name[: -len("_source.json")], name)
+    if payload.get("recipe_id"):
+        index["ids"].setdefault(payload["recipe_id"], name)
+    if payload.get("source_url"):
+        index["videos"].setdefault(youtube_cache_key(payload["source_url"]), name)
+
+
+def _build_source_index():
+    index = {"dir_stamp": _sources_dir_stamp(), "ids": {}, "videos": {}}
+    if not RECIPE_SOURCES_DIR.exists():
+        return index
+    for path in sorted(RECIPE_SOURCES_DIR.glob("*_source.json")):
+        try:
+            payload = _load_json(path, None)
+        except (json.JSONDecodeError, OSError):
+            continue
+        if isinstance(payload, dict):
+            _index_source(index, path.name, payload)
+    return index
+
+
+def _save_source_index(index):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    _save_json(SOURCE_INDEX_FILE, index)
+    _source_index.update({"stamp": _file_stamp(SOURCE_INDEX_FILE), "index": index})
+
+
+def _load_source_index(rebuild=False):
+    # Same contract as the recipe index: trusted while the recipe_sources
+    # directory stamp matches, rebuilt otherwise.
+    with _RECIPE_CACHE_LOCK:
+        index = None
+        if not rebuild:
+            stamp = _file_stamp(SOURCE_INDEX_FILE)
+            if stamp is not None and stamp == _source_index["stamp"]:
+                index = _source_index["index"]
+            elif stamp is not None:
+                index = _load_json(SOURCE_INDEX_FILE, None)
+                _source_index.update({"stamp": stamp, "index": index})
+        if not isinstance(index, dict) or index.get("dir_stamp") != _sources_dir_stamp():
+            index = _build_source_index()
+            if index["dir_stamp"] is not None:
+                _save_source_index(index)
+        return index
+
+
+def rebuild_source_index():
+    return _load_source_index(rebuild=True)
+
+
+def load_source_index():
+    # Call before writing a source file and pass the result to
+    # record_source_file(), under locked("recipe_sources").
+    return _load_source_index()
+
+
+def record_source_file(current, path, payload):
+    with _RECIPE_CACHE_LOCK:
+        index = {
+            "dir_stamp": _sources_dir_stamp(),
+            "ids": dict(current.get("ids", {})),
+            "videos": dict(current.get("videos", {})),
+        }
+        _index_source(index, Path(path).name, payload)
+        _save_source_index(index)
+    get_storage().bump_version("recipe_sources")
+
+
+def _indexed_source(table, key, matches):
+    # (path, payload) for an index hit that still checks out; a stale hit
+    # rebuilds the index once.
+    index = _load_source_index()
+    for attempt in range(2):
+        name = index.get(table, {}).get(key)
+        if not name:
+            return None, None
+        path = RECIPE_SOURCES_DIR / name
+        try:
+            payload = _load_json(path, None)
+        except (json.JSONDecodeError, OSError):
+            payload = None
+        if isinstance(payload, dict) and matches(name, payload):
+            return path, payload
+        if attempt == 0:
+            index = _load_source_index(rebuild=True)
+    return None, None
+
+
+def find_source_file(url):
+    key = youtube_cache_key(url)
+    path, _ = _indexed_source(
+        "videos",
+        key,
+        lambda name, payload: youtube_cache_key(payload.get("source_url")) == key,
+    )
+    return path
+
+
+def _filter_history(history, limit=None, start_date=None):
+    if start_date:
+        history = [
+            entry
+            for entry in history
+            if (entry.get("plan") or {}).get("start_date") == start_date
+        ]
+    if limit is not None:
+        history = history[-limit:] if limit > 0 else []
+    return history
+
+
+def _history_index_line(offset, length, entry):
+    plan = entry.get("plan") or {}
+    start_date = plan.get("start_date") or ""
+    return f"{offset}\t{length}\t{start_date}\t{entry.get('generated_at') or ''}\n"
+
+
+def _parse_history_index(text):
+    index = []
+    for line in text.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 4:
+            continue
+        try:
+            index.append((int(parts[0]), int(parts[1]), parts[2], parts[3]))
+        except ValueError:
+            continue
+    return index
+
+
+def _rebuild_history_index():
+    lines = []
+    offset = 0
+    if HISTORY_LOG_FILE.exists():
+        with HISTORY_LOG_FILE.open("rb") as f:
+            for raw in f:
+                if raw.endswith(b"\n") and raw.strip():
+                    try:
+                        entry = json_codec.loads(raw)
+                    except ValueError:
+                        entry = None
+                    if isinstance(entry, dict):
+                        lines.append(_history_index_line(offset, len(raw), entry))
+                offset += len(raw)
+    with HISTORY_INDEX_FILE.open("w", encoding="utf-8") as f:
+        f.writelines(lines)
+    return _parse_history_index("".join(lines))
+
+
+def _history_index_is_current(last_line):
+    # Every log line is indexed as soon as it is written, so the last index
+    # entry must end exactly where the log ends.
+    log_stamp = _file_stamp(HISTORY_LOG_FILE)
+    log_size = log_stamp[1] if log_stamp else 0
+    entries = _parse_history_index(last_line)
+    if not entries:
+        return log_size == 0
+    offset, length, _, _ = entries[-1]
+    return offset + length == log_size
+
+
+def _history_index_tail():
+    if not HISTORY_INDEX_FILE.exists():
+        return None
+    with HISTORY_INDEX_FILE.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 512))
+        tail = f.read().decode("utf-8", errors="ignore")
+    lines = tail.splitlines()
+    return lines[-1] if lines else ""
+
+
+def _load_history_index():
+    if not HISTORY_INDEX_FILE.exists():
+        return _rebuild_history_index()
+    text = HISTORY_INDEX_FILE.read_text(encoding="utf-8")
+    record_read(len(text))
+    lines = text.splitlines()
+    if not _history_index_is_current(lines[-1] if lines else ""):
+        return _rebuild_history_index()
+    return _parse_history_index(text)
+
+
+def _read_history_entries(index):
+    entries = []
+    if not index:
+        return entries
+    with HISTORY_LOG_FILE.open("rb") as f:
+        for offset, length, _, _ in index:
+            f.seek(offset)
+            entries.append(json_codec.loads(f.read(length)))
+    record_read(sum(item[1] for item in index))
+    return entries
+
+
+def _append_history_entries(entries):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tail = _history_index_tail()
+    prefix = b""
+    if tail is None or not _history_index_is_current(tail):
+        _rebuild_history_index()
+        # A torn write from an interrupted append must not swallow this entry.
+        if HISTORY_LOG_FILE.exists() and HISTORY_LOG_FILE.stat().st_size:
+            with HISTORY_LOG_FILE.open("rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    prefix = b"\n"
+    lines = [json_codec.dumps(entry) + b"\n" for entry in entries]
+    with HISTORY_LOG_FILE.open("ab") as f:
+        offset = f.tell() + len(prefix)
+        f.write(prefix + b"".join(lines))
+    index_lines = []
+    for entry, line in zip(entries, lines):
+        index_lines.append(_history_index_line(offset, len(line), entry))
+        offset += len(line)
+    with HISTORY_INDEX_FILE.open("a", encoding="utf-8") as f:
+        f.write("".join(index_lines))
+    record_write(len(prefix) + sum(len(line) for line in lines))
+
+
+def _convert_plan_history():
+    # Callers hold locked("history") and have checked that the log does not
+    # exist yet; it is the only copy once appends start.
+    history = _load_json(HISTORY_FILE, [])
+    if not isinstance(history, list):
+        history = []
+    lines = [json_codec.dumps(entry) + b"\n" for entry in history if isinstance(entry, dict)]
+    tmp_path = HISTORY_LOG_FILE.with_name(f".{HISTORY_LOG_FILE.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as f:
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, HISTORY_LOG_FILE)
+    _rebuild_history_index()
+    # Moved aside so neither a rerun nor load_history falls back to it.
+    os.replace(HISTORY_FILE, HISTORY_MIGRATED_FILE)
+    return len(lines)
+
+
+def convert_plan_history():
+    # None when there is nothing to convert or the log already exists.
+    with locked("history"):
+        if not HISTORY_FILE.exists() or HISTORY_LOG_FILE.exists():
+            return None
+        return _convert_plan_history()
+
+
+class JsonStorage:
+    # Default backend: one JSON file per recipe/source plus whole-file state
+    # under DATA_DIR. Alternative backends implement the same methods.
+
+    name = "json"
+
+    def load_config(self, default):
+        return _load_json(CONFIG_FILE, default)
+
+    def save_config(self, config):
+        _save_json(CONFIG_FILE, config, pretty=True)
+        self.bump_version("config")
+
+    def load_recipes(self):
+        with _RECIPE_CACHE_LOCK:
+            return _cached_recipe_catalog()
+
+    def get_recipe(self, recipe_id):
+        _, recipe = _lookup_recipe(recipe_id)
+        if recipe is not None:
+            return recipe
+        if _has_unindexed_recipes():
+            for recipe in self.load_recipes():
+                if recipe.get("recipe_id") == recipe_id:
+                    return as_dict(recipe)
+        return None
+
+    def has_recipe(self, recipe_id):
+        if recipe_id in _load_recipe_index().get("ids", {}):
+            return True
+        return self.get_recipe(recipe_id) is not None
+
+    def add_recipe(self, recipe):
+        RECIPES_DIR.mkdir(parents=True, exist_ok=True)
+        slug = _slugify(recipe.get("name", ""))
+        with locked("recipes"):
+            index = _load_recipe_index()
+            path = _unique_path(RECIPES_DIR / f"{slug}.json")
+            _save_json(path, recipe, pretty=True)
+            invalidate_recipe_cache(path)
+            _update_recipe_index(index, path, recipe)
+        self.bump_version("recipes")
+
+    def update_recipe(self, recipe_id, recipe):
+        with locked("recipes"):
+            path = get_recipe_path(recipe_id)
+            if not path:
+                return False
+            index = _load_recipe_index()
+            _save_json(path, recipe, pretty=True)
+            invalidate_recipe_cache(path)
+            _update_recipe_index(index, path, recipe, previous_id=recipe_id)
+        self.bump_version("recipes")
+        return True
+
+    def load_recipe_source(self, recipe_id):
+        path = RECIPE_SOURCES_DIR / f"{recipe_id}_source.json"
+        if path.exists():
+            return _load_json(path, None)
+        if not RECIPE_SOURCES_DIR.exists():
+            return None
+        _, payload = _indexed_source(
+            "ids",
+            recipe_id,
+            lambda name, payload: recipe_id
+            in (payload.get("recipe_id"), name[: -len("_source.json")]),
+        )
+        return payload
+
+    def load_recipe_sources(self):
+        sources = []
+        if RECIPE_SOURCES_DIR.exists():
+            for path in sorted(RECIPE_SOURCES_DIR.glob("*_source.json")):
+                data = _load_json(path, None)
+                if isinstance(data, dict):
+                    sources.append(data)
+        return sources
+
+    def save_recipe_source(self, source):
+        with locked("recipe_sources"):
+            index = _load_source_index()
+            RECIPE_SOURCES_DIR.mkdir(parents=True, exist_ok=True)
+            path = RECIPE_SOURCES_DIR / f"{source['recipe_id']}_source.json"
+            _save_json(path, source, pretty=True)
+            record_source_file(index, path, source)
+
+    def find_recipe_source(self, key, key_of):
+        _, payload = _indexed_source(
+            "videos", key, lambda name, payload: key_of(payload.get("source_url")) == key
+        )
+        return payload
+
+    def load_plan(self):
+        return _load_json(PLAN_FILE, None)
+
+    def save_plan(self, plan):
+        _save_json(PLAN_FILE, plan)
+        self.bump_version("plan")
+
+    def load_history(self, limit=None, start_date=None):
+        if not HISTORY_LOG_FILE.exists():
+            return _filter_history(_load_json(HISTORY_FILE, []), limit, start_date)
+        with locked("history"):
+            index = _load_history_index()
+        if start_date:
+            index = [item for item in index if item[2] == start_date]
+        if limit is not None:
+            index = index[-limit:] if limit > 0 else []
+        return _read_history_entries(index)
+
+    def append_history(self, entry):
+        self.append_history_entries([entry])
+
+    def append_history_entries(self, entries):
+        with locked("history"):
+            if not HISTORY_LOG_FILE.exists() and HISTORY_FILE.exists():
+                _convert_plan_history()
+            _append_history_entries(entries)
+        self.bump_version("history")
+
+    def load_shopping_state(self):
+        return _load_json(SHOPPING_FILE, {})
+
+    def save_shopping_state(self, state):
+        _save_json(SHOPPING_FILE, state)
+        self.bump_version("shopping")
+
+    # Per-store change counters behind the Flask ETags. Bumped after the write
+    # so a reader never pairs a new version with old data.
+
+    def recipe_catalog_stamp(self):
+        return _recipe_files_stamp()
+
+    def load_versions(self):
+        versions = _load_json(VERSIONS_FILE, {})
+        # Recipe and source files also change outside planner (by hand, a git
+        # pull). Adding, removing or replacing one (editors and planner save
+        # through a rename) moves its directory's mtime, so one stat per
+        # directory keeps this cheap enough for every conditional GET.
+        for name, paths in (
+            ("recipes", (RECIPES_DIR, LEGACY_RECIPES_FILE)),
+            ("recipe_sources", (RECIPE_SOURCES_DIR,)),
+        ):
+            stamps = "-".join(str((_file_stamp(path) or (0,))[0]) for path in paths)
+            versions[name] = f"{versions.get(name, 0)}-{stamps}"
+        return versions
+
+    def bump_version(self, *names):
+        with locked("versions"):
+            versions = _load_json(VERSIONS_FILE, {})
+            for name in names:
+                versions[name] = _next_version(versions.get(name, 0))
+            _save_json(VERSIONS_FILE, versions)
+
+    # YouTube extractions: one file per cache key; the file mtime is the LRU
+    # access time.
+
+    def get_youtube_entry(self, key):
+        try:
+            return _load_json(YOUTUBE_CACHE_DIR / f"{key}.json", None)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def put_youtube_entry(self, key, entry):
+        YOUTUBE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _save_json(YOUTUBE_CACHE_DIR / f"{key}.json", entry)
+
+    def touch_youtube_entry(self, key):
+        try:
+            os.utime(YOUTUBE_CACHE_DIR / f"{key}.json")
+        except OSError:
+            pass
+
+    def delete_youtube_entries(self, keys):
+        for key in keys:
+            (YOUTUBE_CACHE_DIR / f"{key}.json").unlink(missing_ok=True)
+
+    def list_youtube_entries(self):
+        if not YOUTUBE_CACHE_DIR.exists():
+            return []
+        entries = []
+        with os.scandir(YOUTUBE_CACHE_DIR) as it:
+            for item in it:
+                if item.name.endswith(".json") and not item.name.startswith("."):
+                    entries.append((item.name[: -len(".json")], item.stat().st_mtime))
+        return entries
+
+    def load_legacy_youtube_cache(self):
+        if not YOUTUBE_CACHE_FILE.exists():
+            return None
+        return _load_json(YOUTUBE_CACHE_FILE, {})
+
+    def drop_legacy_youtube_cache(self):
+        YOUTUBE_CACHE_FILE.replace(YOUTUBE_CACHE_FILE.with_name(f"{YOUTUBE_CACHE_FILE.name}.bak"))
+
+    # Recipe-parsing completions, keyed by content hash; same layout as the
+    # YouTube entries.
+
+    def get_llm_entry(self, key):
+        try:
+            return _load_json(LLM_CACHE_DIR / f"{key}.json", None)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def put_llm_entry(self, key, entry):
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _save_json(LLM_CACHE_DIR / f"{key}.json", entry)
+
+    def touch_llm_entry(self, key):
+        try:
+            os.utime(LLM_CACHE_DIR / f"{key}.json")
+        except OSError:
+            pass
+
+    def delete_llm_entries(self, keys):
+        for key in keys:
+            (LLM_CACHE_DIR / f"{key}.json").unlink(missing_ok=True)
+
+    def list_llm_entries(self):
+        if not LLM_CACHE_DIR.exists():
+            return []
+        entries = []
+        with os.scandir(LLM_CACHE_DIR) as it:
+            for item in it:
+                if item.name.endswith(".json") and not item.name.startswith("."):
+                    entries.append((item.name[: -len(".json")], item.stat().st_mtime))
+        return entries
+
+    def load_document(self, name, default=None):
+        return _load_json(DATA_DIR / f"{name}.json", default)
+
+    def save_document(self, name, payload):
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        _save_json(DATA_DIR / f"{name}.json", payload, pretty=name in VERSIONED_DOCUMENTS)
+        if name in VERSIONED_DOCUMENTS:
+            self.bump_version(name)
+
+    def delete_document(self, name):
+        (DATA_DIR / f"{name}.json").unlink(missing_ok=True)
+        if name in VERSIONED_DOCUMENTS:
+            self.bump_version(name)
+
+
+def _create_storage(backend=None):
+    backend = backend or os.getenv("PLANNER_STORAGE", "json")
+    if backend == "json":
+        return JsonStorage()
+    if backend == "sqlite":
+        from sqlite_storage import SqliteStorage
+
+        return SqliteStorage(os.getenv("PLANNER_DB") or SQLITE_DB_FILE)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_storage():
+    global _storage
+    with _STORAGE_LOCK:
+        if _storage is None:
+            _storage = _create_storage()
+        return _storage
+
+
+def set_storage(storage):
+    global _storage
+    with _STORAGE_LOCK:
+        _storage = storage
+    reload_ingredient_dictionary()
 
 
 def has_recipe_id(recipe_id):
     if not recipe_id:
         return False
-    for recipe in load_recipes():
-        if recipe.get("recipe_id") == recipe_id:
-            return True
-    return False
+    return get_storage().has_recipe(recipe_id)
 
 
+@instrument("get_recipe_by_id")
 def get_recipe_by_id(recipe_id):
     if not recipe_id:
         return None
-    for recipe in load_recipes():
-        if recipe.get("recipe_id") == recipe_id:
-            return recipe
-    return None
+    return get_storage().get_recipe(recipe_id)
 
 
-def get_recipe_path(recipe_id):
-    if not recipe_id or not RECIPES_DIR.exists():
-        return None
-    for path in RECIPES_DIR.glob("*.json"):
-        data = _load_json(path, None)
-        if isinstance(data, dict) and data.get("recipe_id") == recipe_id:
-            return path
-    return None
+@instrument("update_recipe")
+def update_recipe(recipe_id, payload):
+    return bool(update_recipes({recipe_id: payload}))
+
+
+def update_recipes(updates):
+    # {recipe_id: payload}; the shopping aggregate is refreshed once for the
+    # whole batch. Returns the ids that existed and were written.
+    updated = []
+    for recipe_id, payload in updates.items():
+        payload = _normalize_recipe(payload)
+        if get_storage().update_recipe(recipe_id, payload):
+            _index_recipe_for_search(payload, previous_id=recipe_id)
+            updated.append(recipe_id)
+    if updated:
+        _update_shopping_aggregate()
+    return updated
 
 
-def update_recipe(recipe_id, payload):
-    path = get_recipe_path(recipe_id)
-    if not path:
-        return False
-    payload = _normalize_recipe(payload)
-    _save_json(path, payload)
-    return True
+def clean_recipe_files():
+    # JSON backend: rewrite the recipe files whose stored form differs from
+    # the normalized one the catalog loads (a missing recipe_id, a meal_type
+    # string, untrimmed ingredient fields). Files already clean are left alone.
+    updates = {}
+    paths = sorted(RECIPES_DIR.glob("*.json")) if RECIPES_DIR.exists() else []
+    for path in paths:
+        try:
+            data = _load_json(path, None)
+        except (json.JSONDecodeError, OSError):
+            continue
+        if isinstance(data, dict):
+            recipe = _normalize_recipe(data)
+            if recipe != data:
+                updates[recipe["recipe_id"]] = recipe
+    return update_recipes(updates)
 
 
+@instrument("load_recipe_source")
 def load_recipe_source(recipe_id):
     if not recipe_id:
         return None
-    path = RECIPE_SOURCES_DIR / f"{recipe_id}_source.json"
-    if path.exists():
-        return _load_json(path, None)
-    matches = list(RECIPE_SOURCES_DIR.glob(f"*{recipe_id}*_source.json"))
-    if not matches:
-        return None
-    return _load_json(matches[0], None)
+    return get_storage().load_recipe_source(recipe_id)
+
+
+def save_recipe_source(source):
+    get_storage().save_recipe_source(source)
+
+
+def save_recipe_prompt(recipe_id, prompt):
+    # The parsing prompt for a collected source, as a text file to paste from
+    # on either backend.
+    with locked("recipe_sources"):
+        RECIPE_SOURCES_DIR.mkdir(parents=True, exist_ok=True)
+        path = _unique_path(RECIPE_SOURCES_DIR / f"{recipe_id}_prompt.txt")
+        _write_atomic(path, prompt.encode("utf-8"))
+    return path
+
+
+def find_recipe_source(url):
+    # A source already collected for the same video (watch, short and
+    # youtu.be links match), or None.
+    return get_storage().find_recipe_source(youtube_cache_key(url), youtube_cache_key)
 
 
 def _slugify(text, max_len=60):
@@ -141,22 +1035,105 @@ def _unique_path(base_path):
     raise RuntimeError("Too many duplicate filenames.")
 
 
+@instrument("add_recipe")
 def add_recipe(recipe):
-    RECIPES_DIR.mkdir(parents=True, exist_ok=True)
     recipe = _normalize_recipe(recipe)
-    name = recipe.get("name", "")
-    slug = _slugify(name)
-    path = _unique_path(RECIPES_DIR / f"{slug}.json")
-    _save_json(path, recipe)
+    get_storage().add_recipe(recipe)
+    _index_recipe_for_search(recipe)
+    _update_shopping_aggregate()
     return recipe
 
 
-def load_youtube_cache():
-    return _load_json(YOUTUBE_CACHE_FILE, {})
-
-
-def save_youtube_cache(cache):
-    _save_json(YOUTUBE_CACHE_FILE, cache)
+def youtube_video_id(url):
+    if not url:
+        return ""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if "v" in query:
+        return query["v"][0]
+    if parsed.path.startswith("/shorts/"):
+        return parsed.path.split("/shorts/")[1].split("/")[0]
+    if parsed.netloc.endswith("youtu.be"):
+        return parsed.path.strip("/")
+    return ""
+
+
+def youtube_cache_key(url):
+    # Watch, short and youtu.be links to one video share an entry. Anything
+    # that is not a plain video id is hashed so it is always a safe filename.
+    video_id = youtube_video_id(url)
+    if re.fullmatch(r"[A-Za-z0-9_-]{1,64}", video_id):
+        return video_id
+    return "url-" + hashlib.sha1((url or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+def _count_youtube(stat, amount=1):
+    with _YOUTUBE_STATS_LOCK:
+        _youtube_cache_stats[stat] += amount
+
+
+def youtube_cache_stats():
+    with _YOUTUBE_STATS_LOCK:
+        return dict(_youtube_cache_stats)
+
+
+def convert_youtube_cache(storage=None):
+    # One-time move of the legacy url -> recipe document into keyed entries.
+    storage = storage or get_storage()
+    if storage.load_legacy_youtube_cache() is None:
+        return 0
+    with locked("youtube_cache"):
+        legacy = storage.load_legacy_youtube_cache()
+        if legacy is None:
+            return 0
+        now = time.time()
+        for url, recipe in legacy.items():
+            if recipe:
+                storage.put_youtube_entry(
+                    youtube_cache_key(url),
+                    {"url": url, "recipe": recipe, "error": None, "fetched_at": now},
+                )
+        storage.drop_legacy_youtube_cache()
+        return len(legacy)
+
+
+def _store_youtube_entry(storage, key, entry):
+    with locked("youtube_cache"):
+        storage.put_youtube_entry(key, entry)
+        entries = storage.list_youtube_entries()
+        excess = len(entries) - YOUTUBE_CACHE_MAX_ENTRIES
+        if excess > 0:
+            entries.sort(key=lambda item: item[1])
+            storage.delete_youtube_entries([item[0] for item in entries[:excess]])
+            _count_youtube("evictions", excess)
+
+
+def llm_cache_key(model, text):
+    # The title only seeds the recipe name, so re-uploads and shorts that
+    # share a description still hit.
+    payload = json.dumps([RECIPE_PARSE_PROMPT_VERSION, model, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count_llm(stat, amount=1):
+    with _LLM_STATS_LOCK:
+        _llm_cache_stats[stat] += amount
+
+
+def llm_cache_stats():
+    with _LLM_STATS_LOCK:
+        return dict(_llm_cache_stats)
+
+
+def _store_llm_entry(storage, key, entry):
+    with locked("llm_cache"):
+        storage.put_llm_entry(key, entry)
+        entries = storage.list_llm_entries()
+        excess = len(entries) - LLM_CACHE_MAX_ENTRIES
+        if excess > 0:
+            entries.sort(key=lambda item: item[1])
+            storage.delete_llm_entries([item[0] for item in entries[:excess]])
+            _count_llm("evictions", excess)
 
 
 def _parse_ingredients_from_comment(text):
@@ -228,7 +1205,120 @@ def _clean_field(value):
     return text
 
 
+UNIT_ALIASES = {
+    "g": "g",
+    "gram": "g",
+    "grams": "g",
+    "그램": "g",
+    "kg": "kg",
+    "kilogram": "kg",
+    "kilograms": "kg",
+    "킬로그램": "kg",
+    "ml": "ml",
+    "milliliter": "ml",
+    "milliliters": "ml",
+    "밀리리터": "ml",
+    "l": "l",
+    "liter": "l",
+    "liters": "l",
+    "리터": "l",
+    "tbsp": "tbsp",
+    "tablespoon": "tbsp",
+    "tablespoons": "tbsp",
+    "큰술": "tbsp",
+    "스푼": "tbsp",
+    "tsp": "tsp",
+    "teaspoon": "tsp",
+    "teaspoons": "tsp",
+    "작은술": "tsp",
+    "t": "tbsp",
+    "count": "count",
+    "piece": "count",
+    "pieces": "count",
+    "pcs": "count",
+    "ea": "count",
+}
+
+
+def _build_ingredient_dictionary(payload):
+    # payload: {"ingredients": [{"id", "en", "ko", "aliases", "unit"}]}.
+    # Every alias, the id and both names resolve to the id after folding.
+    entries = {}
+    aliases = {}
+    for entry in (payload or {}).get("ingredients", []):
+        ingredient_id = _fold_text(entry.get("id"))
+        if not ingredient_id:
+            continue
+        entries[ingredient_id] = entry
+        for alias in [entry.get("id"), entry.get("en"), entry.get("ko")] + list(
+            entry.get("aliases") or []
+        ):
+            folded = _fold_text(alias)
+            if folded:
+                aliases.setdefault(folded, ingredient_id)
+    version = hashlib.sha1(
+        json.dumps(payload or {}, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:12]
+    return {"entries": entries, "aliases": aliases, "version": version}
+
+
+def load_ingredient_dictionary():
+    # Loaded once per process; reload_ingredient_dictionary() after editing.
+    global _ingredient_dictionary
+    with _INGREDIENTS_LOCK:
+        if _ingredient_dictionary is None:
+            payload = get_storage().load_document(INGREDIENTS_DOC, None)
+            _ingredient_dictionary = _build_ingredient_dictionary(payload)
+        return _ingredient_dictionary
+
+
+def reload_ingredient_dictionary():
+    global _ingredient_dictionary
+    with _INGREDIENTS_LOCK:
+        _ingredient_dictionary = None
+    _resolve_ingredient.cache_clear()
+    # Shopping aggregators hold resolved ids and are rebuilt with the catalog,
+    # so it is re-read too.
+    invalidate_recipe_cache()
+
+
+def save_ingredient_dictionary(payload):
+    get_storage().save_document(INGREDIENTS_DOC, payload)
+    reload_ingredient_dictionary()
+
+
+@lru_cache(maxsize=65536)
+def _fold_text(value):
+    if value is None:
+        return ""
+    return sys.intern(" ".join(str(value).split()).casefold())
+
+
+@lru_cache(maxsize=65536)
+def _resolve_ingredient(name):
+    # (canonical id or None, shopping key name) for a free-text name.
+    folded = _fold_text(name)
+    ingredient_id = load_ingredient_dictionary()["aliases"].get(folded)
+    return ingredient_id, ingredient_id or folded
+
+
+def _ingredient_identity(item, language):
+    # (key name, display name, raw unit) used to merge shopping rows. The name
+    # decides the id, so a renamed ingredient merges under its new name.
+    display_name = item.get("name")
+    unit = item.get("unit", "")
+    ingredient_id, key_name = _resolve_ingredient(display_name)
+    if ingredient_id is not None:
+        entry = load_ingredient_dictionary()["entries"][ingredient_id]
+        display_name = entry.get("ko" if language == "original" else "en") or display_name
+        if not (unit or "").strip() and entry.get("unit"):
+            unit = entry["unit"]
+    return key_name, display_name, unit
+
+
 def _sanitize_ingredients(items):
+    # Ids are resolved from the name when needed, never stored: one written
+    # into a recipe file would go stale as soon as someone renames the line.
     sanitized = []
     for item in items or []:
         name = _clean_field(item.get("name"))
@@ -238,43 +1328,10 @@ def _sanitize_ingredients(items):
     return sanitized
 
 
+@lru_cache(maxsize=4096)
 def _normalize_unit(unit):
-    unit = (unit or "").strip()
-    unit_lower = unit.lower()
-    aliases = {
-        "g": "g",
-        "gram": "g",
-        "grams": "g",
-        "그램": "g",
-        "kg": "kg",
-        "kilogram": "kg",
-        "kilograms": "kg",
-        "킬로그램": "kg",
-        "ml": "ml",
-        "milliliter": "ml",
-        "milliliters": "ml",
-        "밀리리터": "ml",
-        "l": "l",
-        "liter": "l",
-        "liters": "l",
-        "리터": "l",
-        "tbsp": "tbsp",
-        "tablespoon": "tbsp",
-        "tablespoons": "tbsp",
-        "큰술": "tbsp",
-        "스푼": "tbsp",
-        "tsp": "tsp",
-        "teaspoon": "tsp",
-        "teaspoons": "tsp",
-        "작은술": "tsp",
-        "t": "tbsp",
-        "count": "count",
-        "piece": "count",
-        "pieces": "count",
-        "pcs": "count",
-        "ea": "count",
-    }
-    return aliases.get(unit_lower, unit_lower)
+    unit_lower = (unit or "").strip().lower()
+    return UNIT_ALIASES.get(unit_lower, unit_lower)
 
 
 def _normalize_quantity_unit(quantity, unit):
@@ -306,17 +1363,13 @@ def _round_quantity(value):
     except (TypeError, ValueError):
         return value
 
-def _parse_recipe_with_openai(source_text, title):
-    if not source_text:
-        return None
+
+def _request_recipe_parse(model, text, title):
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set.")
 
-    try:
-        import requests
-    except ImportError as exc:
-        raise RuntimeError("requests is not installed.") from exc
+    client = get_openai_client(api_key)
 
     prompt = (
         "Extract a recipe from the text. Return ONLY valid JSON with keys: "
@@ -329,33 +1382,60 @@ def _parse_recipe_with_openai(source_text, title):
         "Use meal_type in [breakfast, lunch, dinner]. "
         "Quantities should be numeric when possible, else 0.\n\n"
         f"Title: {title}\n\n"
-        f"Text:\n{source_text[:5000]}"
+        f"Text:\n{text}"
     )
 
-    response = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        json={
-            "model": "gpt-4o-mini",
+    payload = client.chat_completion(
+        {
+            "model": model,
             "temperature": 0.2,
             "messages": [
                 {"role": "system", "content": "You output JSON only."},
                 {"role": "user", "content": prompt},
             ],
-        },
-        timeout=30,
+        }
     )
-    if response.status_code != 200:
-        raise RuntimeError(f"OpenAI API error: {response.status_code} {response.text}")
-    payload = response.json()
     content = payload["choices"][0]["message"]["content"]
     parsed = json.loads(_extract_json_payload(content))
     return _normalize_recipe_payload(parsed)
 
 
+def _parse_recipe_with_openai(source_text, title):
+    # Completions are cached by content hash, so identical text reached through
+    # another URL (or a --force re-collect) never costs a second request.
+    if not source_text:
+        return None
+    model = os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+    text = source_text[:RECIPE_PARSE_TEXT_LIMIT]
+    key = llm_cache_key(model, text)
+    storage = get_storage()
+    # Concurrent batch workers parsing the same text wait for the first one.
+    with _LLM_KEY_LOCKS[int(key[:8], 16) % len(_LLM_KEY_LOCKS)]:
+        entry = storage.get_llm_entry(key)
+        if entry is not None and entry.get("recipe"):
+            _count_llm("hits")
+            storage.touch_llm_entry(key)
+            return entry["recipe"]
+        _count_llm("misses")
+        recipe = _request_recipe_parse(model, text, title)
+        _store_llm_entry(
+            storage,
+            key,
+            {
+                "model": model,
+                "prompt_version": RECIPE_PARSE_PROMPT_VERSION,
+                "recipe": recipe,
+                "created_at": time.time(),
+            },
+        )
+        return recipe
+
+
+class YoutubeUnavailable(RuntimeError):
+    # The video itself could not be fetched; cached like an empty result.
+    pass
+
+
 def fetch_recipe_from_youtube(url):
     try:
         import yt_dlp
@@ -372,7 +1452,7 @@ def fetch_recipe_from_youtube(url):
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
     except Exception as exc:
-        raise RuntimeError(f"Failed to fetch YouTube data: {exc}") from exc
+        raise YoutubeUnavailable(f"Failed to fetch YouTube data: {exc}") from exc
 
     title = info.get("title") or "YouTube recipe"
     comments = info.get("comments") or []
@@ -396,16 +1476,41 @@ def fetch_recipe_from_youtube(url):
 
 
 def extract_recipe_from_youtube(url):
-    cache = load_youtube_cache()
-    if url in cache:
-        cached = cache.get(url)
-        if cached and (cached.get("instructions") or cached.get("ingredients_original")):
-            return cached
-
-    recipe = fetch_recipe_from_youtube(url)
-    if recipe:
-        cache[url] = recipe
-        save_youtube_cache(cache)
+    # Positive results live for YOUTUBE_CACHE_TTL; videos without a recipe or
+    # that failed to load are remembered for YOUTUBE_CACHE_NEGATIVE_TTL.
+    # Configuration errors (missing keys or packages) are never cached.
+    storage = get_storage()
+    convert_youtube_cache(storage)
+    key = youtube_cache_key(url)
+    entry = storage.get_youtube_entry(key)
+    now = time.time()
+    if entry is not None:
+        recipe = entry.get("recipe")
+        ttl = YOUTUBE_CACHE_TTL if recipe else YOUTUBE_CACHE_NEGATIVE_TTL
+        if now - entry.get("fetched_at", 0) >= ttl:
+            _count_youtube("expired")
+        elif recipe and (recipe.get("instructions") or recipe.get("ingredients_original")):
+            _count_youtube("hits")
+            storage.touch_youtube_entry(key)
+            return recipe
+        elif not recipe:
+            _count_youtube("negative_hits")
+            storage.touch_youtube_entry(key)
+            if entry.get("error"):
+                raise YoutubeUnavailable(entry["error"])
+            return None
+
+    _count_youtube("misses")
+    try:
+        recipe = fetch_recipe_from_youtube(url)
+    except YoutubeUnavailable as exc:
+        _store_youtube_entry(
+            storage, key, {"url": url, "recipe": None, "error": str(exc), "fetched_at": now}
+        )
+        raise
+    _store_youtube_entry(
+        storage, key, {"url": url, "recipe": recipe, "error": None, "fetched_at": now}
+    )
     return recipe
 
 
@@ -414,85 +1519,589 @@ def _week_start(target_date=None):
     return target_date - timedelta(days=target_date.weekday())
 
 
-def _parse_date(date_str):
+def parse_date(date_str):
+    # A date from YYYY-MM-DD (or a full ISO timestamp); None when it is not one.
     try:
         return datetime.fromisoformat(date_str).date()
     except (TypeError, ValueError):
         return None
 
 
-def _pick_recipe(candidates, usage_counts, max_repeat):
-    random.shuffle(candidates)
-    for recipe in candidates:
-        if usage_counts[recipe["name"]] < max_repeat:
-            return recipe
-    return None
+MEAL_TYPES = ("breakfast", "lunch", "dinner")
+SHOPPING_LANGUAGES = ("en", "original")
+SHARED_INGREDIENT_DRAWS = 4
+DEFAULT_PROFILE = "default"
 
 
-def generate_weekly_plan(start_date=None):
-    config = load_config()
-    recipes = load_recipes()
-    if not recipes:
-        raise ValueError("No recipes available in data/recipes.json")
+def _recipe_meal_types(recipe):
+    meal_types = list(recipe.get("meal_types") or [])
+    legacy = recipe.get("meal_type")
+    if legacy and legacy not in meal_types:
+        meal_types.append(legacy)
+    return meal_types
 
+
+def _build_meal_index(recipes):
     by_meal = defaultdict(list)
     for recipe in recipes:
-        meal_types = recipe.get("meal_types") or []
-        legacy = recipe.get("meal_type")
-        if legacy and legacy not in meal_types:
-            meal_types.append(legacy)
-        for meal_type in meal_types:
+        for meal_type in _recipe_meal_types(recipe):
             by_meal[meal_type].append(recipe)
+    entries_by_name = defaultdict(list)
+    for meal_type, candidates in by_meal.items():
+        for entry, recipe in enumerate(candidates):
+            entries_by_name[recipe.get("name")].append((meal_type, entry))
+    return {"by_meal": dict(by_meal), "entries_by_name": dict(entries_by_name)}
+
+
+def _meal_index(recipes=None):
+    # Candidate pools depend only on the catalog, so they are rebuilt only when
+    # the storage hands back a different catalog object.
+    if recipes is not None:
+        return _build_meal_index(recipes)
+    catalog = get_storage().load_recipes()
+    with _RECIPE_CACHE_LOCK:
+        if _meal_index_cache["recipes"] is not catalog:
+            _meal_index_cache.update(
+                {"recipes": catalog, "index": _build_meal_index(catalog)}
+            )
+        return _meal_index_cache["index"]
 
-    week_start = start_date or _week_start()
-    usage_counts = defaultdict(int)
-    days = []
 
-    for day_offset in range(7):
-        day_date = week_start + timedelta(days=day_offset)
-        meals = {}
-        used_ids = set()
-        for meal_type in ("breakfast", "lunch", "dinner"):
-            candidates = by_meal.get(meal_type, [])
-            if not candidates:
-                meals[meal_type] = None
+def _build_facet_index(recipes):
+    by_id = {}
+    by_meal = defaultdict(list)
+    for recipe in recipes:
+        recipe_id = recipe.get("recipe_id")
+        if not recipe_id or recipe_id in by_id:
+            continue
+        by_id[recipe_id] = recipe
+        for meal_type in _recipe_meal_types(recipe):
+            by_meal[meal_type].append(recipe_id)
+    return {
+        "by_id": by_id,
+        "ids": sorted(by_id),
+        "by_meal": {meal_type: sorted(ids) for meal_type, ids in by_meal.items()},
+    }
+
+
+def _facet_index():
+    catalog = get_storage().load_recipes()
+    with _RECIPE_CACHE_LOCK:
+        if _facet_index_cache["recipes"] is not catalog:
+            _facet_index_cache.update(
+                {"recipes": catalog, "index": _build_facet_index(catalog)}
+            )
+        return _facet_index_cache["index"]
+
+
+def recipe_summary(recipe):
+    # The fields list views and the JSON API show; detail views load the
+    # full record.
+    thumbnail = recipe.get("thumbnail_url")
+    if not thumbnail:
+        video_id = youtube_video_id(recipe.get("source_url"))
+        thumbnail = YOUTUBE_THUMBNAIL_URL.format(video_id) if video_id else None
+    return {
+        "recipe_id": recipe.get("recipe_id"),
+        "name": recipe.get("name"),
+        "meal_types": _recipe_meal_types(recipe),
+        "thumbnail_url": thumbnail,
+    }
+
+
+def _recipe_summaries():
+    catalog = get_storage().load_recipes()
+    with _RECIPE_CACHE_LOCK:
+        if _summary_cache["recipes"] is not catalog:
+            summaries = {}
+            for recipe in catalog:
+                recipe_id = recipe.get("recipe_id")
+                if recipe_id and recipe_id not in summaries:
+                    summaries[recipe_id] = recipe_summary(recipe)
+            _summary_cache.update({"recipes": catalog, "summaries": summaries})
+        return _summary_cache["summaries"]
+
+
+def _summarize(records):
+    # Summaries are shared between requests; a record from a catalog that
+    # changed in between is projected on the spot.
+    summaries = _recipe_summaries()
+    return [
+        summaries.get(recipe.get("recipe_id")) or recipe_summary(recipe) for recipe in records
+    ]
+
+
+def _ids_after(ids, after):
+    start = bisect_right(ids, after) if after else 0
+    return (ids[pos] for pos in range(start, len(ids)))
+
+
+@instrument("recipe_page")
+def recipe_page(meal_types=None, exclude=(), after=None, limit=50, summary=False):
+    # Keyset pagination over recipe_id: the cursor is the last id shown, so a
+    # page costs a bisect plus `limit` steps whatever the catalog size.
+    index = _facet_index()
+    if meal_types:
+        lists = [index["by_meal"].get(meal_type, []) for meal_type in meal_types]
+        ids = heapq.merge(*(_ids_after(item, after) for item in lists))
+    else:
+        ids = _ids_after(index["ids"], after)
+    page = []
+    next_cursor = None
+    previous = None
+    for recipe_id in ids:
+        if recipe_id == previous or recipe_id in exclude:
+            continue
+        previous = recipe_id
+        if len(page) == limit:
+            next_cursor = page[-1].get("recipe_id")
+            break
+        page.append(index["by_id"][recipe_id])
+    if summary:
+        return {"recipes": _summarize(page), "next": next_cursor}
+    return {"recipes": [as_dict(recipe) for recipe in page], "next": next_cursor}
+
+
+@instrument("recipes_by_ids")
+def recipes_by_ids(recipe_ids):
+    by_id = _facet_index()["by_id"]
+    return {
+        recipe_id: as_dict(by_id[recipe_id]) for recipe_id in recipe_ids if recipe_id in by_id
+    }
+
+
+def _recipe_search_index():
+    catalog = get_storage().load_recipes()
+    with _RECIPE_CACHE_LOCK:
+        index = _search_index_cache["index"]
+        if index is None:
+            index = RecipeSearchIndex()
+            index.rebuild(catalog)
+        elif _search_index_cache["recipes"] is not catalog:
+            index.sync(catalog)
+        _search_index_cache.update({"recipes": catalog, "index": index})
+        return index
+
+
+def _index_recipe_for_search(recipe, previous_id=None):
+    # Writes re-index just the saved recipe; the next catalog sync then finds
+    # its text unchanged and only swaps in the catalog record.
+    with _RECIPE_CACHE_LOCK:
+        index = _search_index_cache["index"]
+        if index is None:
+            return
+        if previous_id and previous_id != recipe.get("recipe_id"):
+            index.remove(previous_id)
+        index.add(Recipe(recipe))
+
+
+@instrument("search_recipes")
+def search_recipes(query, limit=20, meal_types=None, exclude=(), summary=False):
+    index = _recipe_search_index()
+    accept = None
+    if meal_types or exclude:
+
+        def accept(recipe):
+            if recipe.get("recipe_id") in exclude:
+                return False
+            return not meal_types or any(
+                meal_type in meal_types for meal_type in _recipe_meal_types(recipe)
+            )
+
+    with _RECIPE_CACHE_LOCK:
+        results = index.search(query, limit=limit, accept=accept)
+    if summary:
+        return _summarize(results)
+    return [as_dict(recipe) for recipe in results]
+
+
+class PantryIndex:
+    # Canonical ingredient key -> ascending catalog positions (array("I")), so
+    # "what can I cook from these" counts posting hits per recipe instead of
+    # walking every recipe's ingredient list. English lines are used, since
+    # dictionary ids already merge both languages.
+
+    def __init__(self, recipes):
+        self.recipes = []
+        self.doc_ids = {}
+        self.doc_keys = []
+        postings = defaultdict(lambda: array("I"))
+        for recipe in recipes:
+            recipe_id = recipe.get("recipe_id")
+            if recipe_id in self.doc_ids:
                 continue
-            available = [
-                recipe
-                for recipe in candidates
-                if usage_counts[recipe["name"]] < config["max_repeat_per_week"]
-                and recipe.get("recipe_id") not in used_ids
-            ]
-            recipe = _pick_recipe(
-                available,
-                usage_counts,
-                config["max_repeat_per_week"],
+            doc = len(self.recipes)
+            keys = {}
+            for item in recipe.get("ingredients") or recipe.get("ingredients_original") or []:
+                if item.get("name"):
+                    key_name, display_name, _ = _ingredient_identity(item, "en")
+                    keys.setdefault(key_name, display_name)
+            self.recipes.append(recipe)
+            self.doc_keys.append(keys)
+            if recipe_id:
+                self.doc_ids[recipe_id] = doc
+            for key_name in keys:
+                postings[key_name].append(doc)
+        self.postings = dict(postings)
+        self.sizes = [len(keys) for keys in self.doc_keys]
+        if np is not None:
+            self.size_array = np.array(self.sizes, dtype=np.int64)
+
+    def recipe_keys(self, recipe_id):
+        doc = self.doc_ids.get(recipe_id)
+        return self.doc_keys[doc] if doc is not None else {}
+
+    def _ranked(self, postings, max_missing):
+        # Doc numbers ordered by (missing, -coverage, doc).
+        if np is not None:
+            have = np.bincount(
+                np.concatenate([np.frombuffer(posting, dtype=np.uint32) for posting in postings]),
+                minlength=len(self.recipes),
             )
-            if recipe is None:
-                meals[meal_type] = None
+            docs = np.flatnonzero(have)
+            matched = have[docs]
+            missing = self.size_array[docs] - matched
+            if max_missing is not None:
+                keep = missing <= max_missing
+                docs, matched, missing = docs[keep], matched[keep], missing[keep]
+            coverage = matched / self.size_array[docs]
+            return (int(docs[pos]) for pos in np.lexsort((docs, -coverage, missing)))
+        counts = Counter()
+        for posting in postings:
+            counts.update(posting)
+        ranked = []
+        for doc, matched in counts.items():
+            missing = self.sizes[doc] - matched
+            if max_missing is None or missing <= max_missing:
+                ranked.append((missing, -(matched / self.sizes[doc]), doc))
+        ranked.sort()
+        return (doc for _, _, doc in ranked)
+
+    def match(self, names, limit=20, max_missing=None, accept=None):
+        pantry = {_resolve_ingredient(name)[1] for name in names if name and name.strip()}
+        postings = [self.postings[key] for key in pantry if key in self.postings]
+        if not postings:
+            return []
+        results = []
+        for doc in self._ranked(postings, max_missing):
+            recipe = self.recipes[doc]
+            if accept is not None and not accept(recipe):
                 continue
-            usage_counts[recipe["name"]] += 1
-            used_ids.add(recipe.get("recipe_id"))
-            meals[meal_type] = {
-                "recipe_id": recipe.get("recipe_id"),
-                "name": recipe["name"],
-                "ingredients": recipe["ingredients"],
-                "locked": False,
-            }
-        days.append({"date": day_date.isoformat(), "meals": meals})
+            keys = self.doc_keys[doc]
+            matched = [name for key, name in keys.items() if key in pantry]
+            results.append(
+                {
+                    "recipe": as_dict(recipe),
+                    "matched": matched,
+                    "missing": [name for key, name in keys.items() if key not in pantry],
+                    "coverage": round(len(matched) / len(keys), 3),
+                }
+            )
+            if len(results) == limit:
+                break
+        return results
+
+
+def _pantry_index(recipes=None):
+    if recipes is not None:
+        return PantryIndex(recipes)
+    catalog = get_storage().load_recipes()
+    version = load_ingredient_dictionary()["version"]
+    with _RECIPE_CACHE_LOCK:
+        if (
+            _pantry_index_cache["recipes"] is not catalog
+            or _pantry_index_cache["version"] != version
+        ):
+            _pantry_index_cache.update(
+                {"recipes": catalog, "version": version, "index": PantryIndex(catalog)}
+            )
+        return _pantry_index_cache["index"]
 
-    plan = {"start_date": week_start.isoformat(), "days": days}
-    _save_json(PLAN_FILE, plan)
-    append_plan_history(plan)
+
+def recipes_from_pantry(ingredients, limit=20, max_missing=None, meal_types=None):
+    # Recipes ranked by how few ingredients are missing, then by how much of
+    # the recipe the pantry covers.
+    accept = None
+    if meal_types:
+
+        def accept(recipe):
+            return any(meal_type in meal_types for meal_type in _recipe_meal_types(recipe))
+
+    return _pantry_index().match(
+        ingredients, limit=limit, max_missing=max_missing, accept=accept
+    )
+
+
+class _CandidatePool:
+    # order[:size] holds the entries that may still be picked this week;
+    # where[] is the inverse permutation so removal and restore are O(1).
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.order = list(range(len(candidates)))
+        self.where = list(range(len(candidates)))
+        self.size = len(candidates)
+
+    def _swap(self, a, b):
+        order = self.order
+        order[a], order[b] = order[b], order[a]
+        self.where[order[a]] = a
+        self.where[order[b]] = b
+
+    def remove(self, entry):
+        pos = self.where[entry]
+        if pos < self.size:
+            self.size -= 1
+            self._swap(pos, self.size)
+
+    def restore(self, entry):
+        pos = self.where[entry]
+        if pos >= self.size:
+            self._swap(pos, self.size)
+            self.size += 1
+
+    def sample(self, rng, exclude_ids):
+        if not self.size:
+            return None
+        # Same-day exclusions are at most a couple of ids, so rejection sampling
+        # almost always succeeds; fall back to a scan for tiny/exhausted pools.
+        for _ in range(8):
+            recipe = self.candidates[self.order[rng.randrange(self.size)]]
+            if recipe.get("recipe_id") not in exclude_ids:
+                return recipe
+        available = [
+            self.candidates[entry]
+            for entry in self.order[: self.size]
+            if self.candidates[entry].get("recipe_id") not in exclude_ids
+        ]
+        return rng.choice(available) if available else None
+
+
+class PlanEngine:
+    def __init__(self, meal_index, max_repeat, rng=None, pantry=None):
+        self.max_repeat = max_repeat
+        self.rng = rng or random
+        # With a PantryIndex, picks lean towards recipes that reuse the
+        # ingredients already planned this week.
+        self.pantry = pantry
+        self.week_keys = set()
+        self.pools = {
+            meal_type: _CandidatePool(candidates)
+            for meal_type, candidates in meal_index["by_meal"].items()
+        }
+        self.entries_by_name = meal_index["entries_by_name"]
+        self.usage = defaultdict(int)
+        self.exhausted = []
+
+    def reset(self):
+        for name in self.exhausted:
+            for meal_type, entry in self.entries_by_name.get(name, []):
+                self.pools[meal_type].restore(entry)
+        self.exhausted = []
+        self.usage.clear()
+        self.week_keys.clear()
+
+    def use(self, name):
+        self.usage[name] += 1
+        if self.usage[name] == self.max_repeat:
+            for meal_type, entry in self.entries_by_name.get(name, []):
+                self.pools[meal_type].remove(entry)
+            self.exhausted.append(name)
+
+    def note_ingredients(self, recipe_id):
+        if self.pantry is not None:
+            self.week_keys.update(self.pantry.recipe_keys(recipe_id))
+
+    def _shared(self, recipe):
+        keys = self.pantry.recipe_keys(recipe.get("recipe_id"))
+        return sum(1 for key in keys if key in self.week_keys)
+
+    def pick(self, meal_type, exclude_ids=()):
+        pool = self.pools.get(meal_type)
+        if pool is None or self.max_repeat <= 0:
+            return None
+        recipe = pool.sample(self.rng, exclude_ids)
+        if recipe is not None and self.pantry is not None and self.week_keys:
+            # Best of a few random draws keeps plans varied.
+            best = self._shared(recipe)
+            for _ in range(SHARED_INGREDIENT_DRAWS - 1):
+                other = pool.sample(self.rng, exclude_ids)
+                shared = self._shared(other)
+                if shared > best:
+                    recipe, best = other, shared
+        if recipe is not None:
+            self.use(recipe.get("name"))
+            self.note_ingredients(recipe.get("recipe_id"))
+        return recipe
+
+
+def _meal_ingredients(recipe):
+    # Plan slots are JSON documents, so catalog records are copied out.
+    return [as_dict(item) for item in recipe.get("ingredients") or []]
+
+
+def _plan_weeks(meal_index, first_week, weeks, config, rng=None, pantry=None):
+    engine = PlanEngine(meal_index, config["max_repeat_per_week"], rng, pantry)
+    plans = []
+    for week in range(weeks):
+        engine.reset()
+        week_start = first_week + timedelta(weeks=week)
+        days = []
+        for day_offset in range(7):
+            day_date = week_start + timedelta(days=day_offset)
+            meals = {}
+            used_ids = set()
+            for meal_type in MEAL_TYPES:
+                recipe = engine.pick(meal_type, used_ids)
+                if recipe is None:
+                    meals[meal_type] = None
+                    continue
+                used_ids.add(recipe.get("recipe_id"))
+                meals[meal_type] = {
+                    "recipe_id": recipe.get("recipe_id"),
+                    "name": recipe["name"],
+                    "ingredients": _meal_ingredients(recipe),
+                    "locked": False,
+                }
+            days.append({"date": day_date.isoformat(), "meals": meals})
+        plans.append({"start_date": week_start.isoformat(), "days": days})
+    return plans
+
+
+@instrument("generate_meal_plans")
+def generate_meal_plans(start_date=None, weeks=1, config=None, recipes=None, rng=None):
+    config = config or load_config()
+    first_week = start_date or _week_start()
+    pantry = _pantry_index(recipes) if config.get("prefer_shared_ingredients") else None
+    return _plan_weeks(_meal_index(recipes), first_week, weeks, config, rng, pantry)
+
+
+def _profile_config(config, profile):
+    base = {key: value for key, value in config.items() if key != "profiles"}
+    if profile == DEFAULT_PROFILE:
+        return base
+    overrides = (config.get("profiles") or {}).get(profile)
+    if overrides is None:
+        raise ValueError(f"Unknown profile: {profile}")
+    base.update(overrides)
+    return base
+
+
+def profile_family_size(profile=None, config=None):
+    # A profile dropped from config.json since its plans were saved falls
+    # back to the base family size.
+    config = config or load_config()
+    try:
+        return _target_servings(_profile_config(config, profile or DEFAULT_PROFILE))
+    except ValueError:
+        return _target_servings(config)
+
+
+_batch_worker_state = {}
+
+
+def _init_batch_worker(meal_index):
+    _batch_worker_state["meal_index"] = meal_index
+
+
+def _run_batch_job(job, meal_index=None):
+    profile, config, first_week, weeks, seed = job
+    meal_index = meal_index or _batch_worker_state["meal_index"]
+    rng = random.Random(seed) if seed is not None else None
+    pantry = _pantry_index() if config.get("prefer_shared_ingredients") else None
+    return profile, _plan_weeks(meal_index, first_week, weeks, config, rng, pantry)
+
+
+def generate_plan_batch(start_date=None, weeks=1, profiles=None, processes=1, seed=None):
+    # One catalog load and one meal-type index shared by every profile/week
+    # chunk; with processes > 1 the index is shipped once per worker.
+    config = load_config()
+    if not get_storage().load_recipes():
+        raise ValueError("No recipes available in data/recipes/*.json")
+    meal_index = _meal_index()
+    first_week = start_date or _week_start()
+    profiles = profiles or [DEFAULT_PROFILE]
+    chunk = weeks
+    if processes > len(profiles):
+        # Few profiles: also split each profile's weeks across the workers.
+        chunk = max(1, -(-weeks * len(profiles) // processes))
+    jobs = []
+    for profile in profiles:
+        profile_config = _profile_config(config, profile)
+        for offset in range(0, weeks, chunk):
+            job_seed = None if seed is None else seed + len(jobs)
+            jobs.append(
+                (
+                    profile,
+                    profile_config,
+                    first_week + timedelta(weeks=offset),
+                    min(chunk, weeks - offset),
+                    job_seed,
+                )
+            )
+
+    if any(job[1].get("prefer_shared_ingredients") for job in jobs):
+        # Built once here; forked workers inherit it.
+        _pantry_index()
+
+    if processes > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(jobs)),
+            initializer=_init_batch_worker,
+            initargs=(meal_index,),
+        ) as pool:
+            results = list(pool.map(_run_batch_job, jobs))
+    else:
+        results = [_run_batch_job(job, meal_index) for job in jobs]
+
+    batch = {profile: [] for profile in profiles}
+    for profile, plans in results:
+        for plan in plans:
+            if profile != DEFAULT_PROFILE:
+                plan["profile"] = profile
+        batch[profile].extend(plans)
+    return batch
+
+
+def save_plan_batch(batch):
+    # The first week of the first profile becomes the current plan; every
+    # week goes to the history.
+    generated_at = datetime.now().isoformat(timespec="seconds")
+    entries = [
+        {"generated_at": generated_at, "plan": plan}
+        for plans in batch.values()
+        for plan in plans
+    ]
+    if not entries:
+        return 0
+    with locked("plan"):
+        save_weekly_plan(entries[0]["plan"])
+        get_storage().append_history_entries(entries)
+    return len(entries)
+
+
+@instrument("generate_weekly_plan")
+def generate_weekly_plan(start_date=None):
+    if not get_storage().load_recipes():
+        raise ValueError("No recipes available in data/recipes.json")
+    plan = generate_meal_plans(start_date)[0]
+    with locked("plan"):
+        save_weekly_plan(plan)
+        append_plan_history(plan)
     return plan
 
 
+@instrument("load_weekly_plan")
 def load_weekly_plan():
-    return _load_json(PLAN_FILE, None)
+    return get_storage().load_plan()
 
 
+@instrument("save_weekly_plan")
 def save_weekly_plan(plan):
-    _save_json(PLAN_FILE, plan)
+    get_storage().save_plan(plan)
+    _update_shopping_aggregate(plan)
 
 
 def _item_key(name, unit, language=None):
@@ -501,49 +2110,86 @@ def _item_key(name, unit, language=None):
     return f"{name}|{unit}"
 
 
+@instrument("load_shopping_state")
 def load_shopping_state():
-    return _load_json(SHOPPING_FILE, {})
+    return get_storage().load_shopping_state()
 
 
+@instrument("save_shopping_state")
 def save_shopping_state(state):
-    _save_json(SHOPPING_FILE, state)
+    get_storage().save_shopping_state(state)
 
 
+@instrument("sync_shopping_state")
 def sync_shopping_state(weekly_items, language=None):
-    state = load_shopping_state()
     if not weekly_items:
-        return state
-    weekly_keys = {_item_key(item["name"], item["unit"], language) for item in weekly_items}
-    legacy_keys = {_item_key(item["name"], item["unit"]) for item in weekly_items}
+        return load_shopping_state()
+    with locked("shopping"):
+        return _sync_shopping_state(weekly_items, language)
+
+
+def _sync_shopping_state(weekly_items, language=None):
+    state = load_shopping_state()
+    weekly_keys = {
+        item.get("key") or _item_key(item["name"], item["unit"], language)
+        for item in weekly_items
+    }
     updated = {}
+    migrated = {}
     for key, value in state.items():
         if language and value.get("lang") and value.get("lang") != language:
             updated[key] = value
         elif value.get("manual"):
             updated[key] = value
-        elif key in weekly_keys or key in legacy_keys:
+        elif key in weekly_keys:
             updated[key] = value
+        else:
+            new_key = _migrate_shopping_key(key, language)
+            if new_key in weekly_keys:
+                migrated.setdefault(new_key, value)
+    # A row already stored under its current key wins over a migrated one.
+    for key, value in migrated.items():
+        updated.setdefault(key, value)
     if updated != state:
         save_shopping_state(updated)
     return updated
 
 
+def _migrate_shopping_key(key, language=None):
+    # Rows saved before shopping keys were folded are keyed on the display
+    # name: "en|Garlic|tbsp", or "Garlic|tbsp" from before keys carried a
+    # language. Map them onto the current identity for the same unit.
+    prefix, _, rest = key.partition("|")
+    if prefix in SHOPPING_LANGUAGES and "|" in rest:
+        language, key = prefix, rest
+    name, separator, unit = key.rpartition("|")
+    if not separator or not name:
+        return None
+    return _item_key(_resolve_ingredient(name)[1], unit, language)
+
+
+@instrument("initialize_weekly_plan")
 def initialize_weekly_plan(start_date=None):
-    week_start = _parse_date(start_date) or _week_start()
+    week_start = parse_date(start_date) or _week_start()
     days = []
     for day_offset in range(7):
         day_date = week_start + timedelta(days=day_offset)
-        meals = {meal_type: None for meal_type in ("breakfast", "lunch", "dinner")}
+        meals = {meal_type: None for meal_type in MEAL_TYPES}
         days.append({"date": day_date.isoformat(), "meals": meals})
     plan = {"start_date": week_start.isoformat(), "days": days}
-    _save_json(PLAN_FILE, plan)
+    save_weekly_plan(plan)
     return plan
 
 
+@instrument("auto_generate_weekly_plan")
 def auto_generate_weekly_plan(plan=None, start_date=None):
+    with locked("plan"):
+        return _auto_generate_weekly_plan(plan, start_date)
+
+
+def _auto_generate_weekly_plan(plan=None, start_date=None):
     config = load_config()
-    recipes = load_recipes()
-    if not recipes:
+    if not get_storage().load_recipes():
         raise ValueError("No recipes available in data/recipes/*.json")
 
     if plan is None:
@@ -551,62 +2197,41 @@ def auto_generate_weekly_plan(plan=None, start_date=None):
     elif start_date and plan.get("start_date") != start_date:
         plan = initialize_weekly_plan(start_date)
 
-    by_meal = defaultdict(list)
-    for recipe in recipes:
-        meal_types = recipe.get("meal_types") or []
-        legacy = recipe.get("meal_type")
-        if legacy and legacy not in meal_types:
-            meal_types.append(legacy)
-        for meal_type in meal_types:
-            by_meal[meal_type].append(recipe)
-
-    usage_counts = defaultdict(int)
+    pantry = _pantry_index() if config.get("prefer_shared_ingredients") else None
+    engine = PlanEngine(_meal_index(), config["max_repeat_per_week"], pantry=pantry)
     for day in plan.get("days", []):
         for meal in day.get("meals", {}).values():
             if meal and meal.get("locked"):
-                usage_counts[meal.get("name")] += 1
+                engine.use(meal.get("name"))
+                engine.note_ingredients(meal.get("recipe_id"))
 
     for day in plan.get("days", []):
-        for meal_type in ("breakfast", "lunch", "dinner"):
+        for meal_type in MEAL_TYPES:
             meal = day.get("meals", {}).get(meal_type)
             if meal and meal.get("locked"):
                 continue
-            candidates = by_meal.get(meal_type, [])
-            if not candidates:
-                day["meals"][meal_type] = None
-                continue
             used_ids = {
                 m.get("recipe_id")
                 for m in day.get("meals", {}).values()
                 if m and m.get("recipe_id")
             }
-            available = [
-                recipe
-                for recipe in candidates
-                if usage_counts[recipe["name"]] < config["max_repeat_per_week"]
-                and recipe.get("recipe_id") not in used_ids
-            ]
-            recipe = _pick_recipe(
-                available,
-                usage_counts,
-                config["max_repeat_per_week"],
-            )
+            recipe = engine.pick(meal_type, used_ids)
             if recipe is None:
                 day["meals"][meal_type] = None
                 continue
-            usage_counts[recipe["name"]] += 1
             day["meals"][meal_type] = {
                 "recipe_id": recipe.get("recipe_id"),
                 "name": recipe.get("name"),
-                "ingredients": recipe.get("ingredients", []),
+                "ingredients": _meal_ingredients(recipe),
                 "locked": False,
             }
 
-    _save_json(PLAN_FILE, plan)
+    save_weekly_plan(plan)
     append_plan_history(plan)
     return plan
 
 
+@instrument("assign_meal")
 def assign_meal(plan, date_str, meal_type, recipe):
     for day in plan.get("days", []):
         if day.get("date") == date_str:
@@ -617,7 +2242,7 @@ def assign_meal(plan, date_str, meal_type, recipe):
             day["meals"][meal_type] = {
                 "recipe_id": recipe.get("recipe_id"),
                 "name": recipe.get("name"),
-                "ingredients": recipe.get("ingredients", []),
+                "ingredients": _meal_ingredients(recipe),
                 "source_url": recipe.get("source_url"),
                 "locked": False,
             }
@@ -625,6 +2250,7 @@ def assign_meal(plan, date_str, meal_type, recipe):
     return False
 
 
+@instrument("clear_meal")
 def clear_meal(plan, date_str, meal_type):
     for day in plan.get("days", []):
         if day.get("date") == date_str:
@@ -634,21 +2260,22 @@ def clear_meal(plan, date_str, meal_type):
     return False
 
 
-def load_plan_history():
-    return _load_json(HISTORY_FILE, [])
+@instrument("load_plan_history")
+def load_plan_history(limit=None, start_date=None):
+    return get_storage().load_history(limit=limit, start_date=start_date)
 
 
+@instrument("append_plan_history")
 def append_plan_history(plan):
-    history = load_plan_history()
-    history.append(
+    get_storage().append_history(
         {
             "generated_at": datetime.now().isoformat(timespec="seconds"),
             "plan": plan,
         }
     )
-    _save_json(HISTORY_FILE, history)
 
 
+@instrument("get_today_meals")
 def get_today_meals(plan=None):
     plan = plan or load_weekly_plan()
     if not plan:
@@ -660,83 +2287,509 @@ def get_today_meals(plan=None):
     return None
 
 
+def _meal_contributions(meal, recipe, language, target_servings):
+    # One meal's scaled, normalized ingredient lines as
+    # (key, quantity, unit, group, display_name, key_unit) tuples.
+    ingredients = meal.get("ingredients", [])
+    servings = None
+    if recipe is not None:
+        if language == "original":
+            ingredients = recipe.get("ingredients_original", [])
+        else:
+            ingredients = recipe.get("ingredients", [])
+        servings = recipe.get("servings")
+    scale = 1
+    try:
+        if servings:
+            scale = target_servings / float(servings)
+    except (TypeError, ValueError, ZeroDivisionError):
+        scale = 1
+    items = []
+    for item in ingredients:
+        if not item.get("name"):
+            continue
+        key_name, display_name, unit = _ingredient_identity(item, language)
+        qty = item.get("quantity", 0)
+        try:
+            qty = float(qty)
+        except (TypeError, ValueError):
+            qty = 0
+        qty *= scale
+        qty, unit = _normalize_quantity_unit(qty, unit)
+
+        _, key_unit = _normalize_quantity_unit(1, unit)
+        key = _item_key(key_name, key_unit, language)
+        items.append((key, qty, unit, _unit_group(unit), display_name, key_unit))
+    return items
+
+
+def _add_contribution(totals, item, recipe_id, sign=1):
+    # Groups, names and recipes are counted rather than kept as sets so a meal
+    # can be subtracted again when it leaves the plan.
+    key, qty, unit, group, display_name, key_unit = item
+    entry = totals.get(key)
+    if entry is None:
+        if sign < 0:
+            return
+        entry = totals[key] = {
+            "quantity": 0,
+            "unit": unit,
+            "groups": {},
+            "recipes": {},
+            "names": {},
+            "key_unit": key_unit,
+            "count": 0,
+        }
+    entry["quantity"] += sign * qty
+    entry["count"] += sign
+    entry["groups"][group] = entry["groups"].get(group, 0) + sign
+    if entry["groups"][group] <= 0:
+        del entry["groups"][group]
+    entry["names"][display_name] = entry["names"].get(display_name, 0) + sign
+    if entry["names"][display_name] <= 0:
+        del entry["names"][display_name]
+    if recipe_id:
+        entry["recipes"][recipe_id] = entry["recipes"].get(recipe_id, 0) + sign
+        if entry["recipes"][recipe_id] <= 0:
+            del entry["recipes"][recipe_id]
+    if entry["count"] <= 0:
+        del totals[key]
+
+
+def _shopping_list_from_totals(totals):
+    shopping_list = []
+    for key in sorted(totals.keys()):
+        entry = totals[key]
+        unit = "mixed" if len(entry["groups"]) > 1 else entry["unit"]
+        shopping_list.append(
+            {
+                # Spellings folded into one key show the first one seen.
+                "name": next(iter(entry["names"])),
+                "unit": unit,
+                "quantity": _round_quantity(entry["quantity"]),
+                "recipes_count": len(entry["recipes"]),
+                "recipe_ids": sorted(entry["recipes"]),
+                "key": key,
+            }
+        )
+    return shopping_list
+
+
+def _target_servings(config=None):
+    config = config or load_config()
+    return config.get("family_size", 4) or 1
+
+
+@instrument("compute_shopping_list")
 def compute_shopping_list(plan=None, language="en"):
     plan = plan or load_weekly_plan()
     if not plan:
         return None
 
-    config = load_config()
-    target_servings = config.get("family_size", 4) or 1
+    target_servings = _target_servings()
     totals = {}
-    recipes_by_id = {r.get("recipe_id"): r for r in load_recipes()}
+    recipes_by_id = {r.get("recipe_id"): r for r in get_storage().load_recipes()}
     for day in plan.get("days", []):
         for meal in day.get("meals", {}).values():
             if not meal:
                 continue
-            ingredients = meal.get("ingredients", [])
             recipe_id = meal.get("recipe_id")
-            servings = None
-            if recipe_id and recipe_id in recipes_by_id:
-                recipe = recipes_by_id[recipe_id]
-                if language == "original":
-                    ingredients = recipe.get("ingredients_original", [])
-                else:
-                    ingredients = recipe.get("ingredients", [])
-                servings = recipe.get("servings")
-            scale = 1
-            try:
-                if servings:
-                    scale = target_servings / float(servings)
-            except (TypeError, ValueError, ZeroDivisionError):
-                scale = 1
-            for item in ingredients:
-                display_name = item.get("name")
-                if not display_name:
-                    continue
-                unit = item.get("unit", "")
-                qty = item.get("quantity", 0)
-                try:
-                    qty = float(qty)
-                except (TypeError, ValueError):
-                    qty = 0
-                qty *= scale
-                qty, unit = _normalize_quantity_unit(qty, unit)
-
-                _, key_unit = _normalize_quantity_unit(1, unit)
-                key = _item_key(display_name, key_unit, language)
-                group = _unit_group(unit)
-
-                if key not in totals:
-                    totals[key] = {
-                        "quantity": 0,
-                        "unit": unit,
-                        "groups": set([group]),
-                        "recipes": set(),
-                        "display_name": display_name,
-                        "key_unit": key_unit,
-                    }
-                totals[key]["quantity"] += qty
-                totals[key]["groups"].add(group)
-                if recipe_id:
-                    totals[key]["recipes"].add(recipe_id)
-                if len(totals[key]["groups"]) > 1:
-                    totals[key]["unit"] = "mixed"
+            recipe = recipes_by_id.get(recipe_id) if recipe_id else None
+            for item in _meal_contributions(meal, recipe, language, target_servings):
+                _add_contribution(totals, item, recipe_id)
+    return _shopping_list_from_totals(totals)
 
-    shopping_list = []
-    for key in sorted(totals.keys()):
-        entry = totals[key]
-        unit = entry["unit"]
-        shopping_list.append(
-            {
-                "name": entry["display_name"],
-                "unit": unit,
-                "quantity": _round_quantity(entry["quantity"]),
-                "recipes_count": len(entry["recipes"]),
-                "recipe_ids": sorted(entry["recipes"]),
-                "key": key,
+
+def _unit_factors(unit):
+    # The multiplier/divisor _normalize_quantity_unit applies, kept apart so
+    # (qty * scale) * mul / div reproduces its float arithmetic exactly.
+    unit = _normalize_unit(unit)
+    if unit in ("kg", "l"):
+        return 1000, 1
+    if unit == "tsp":
+        return 1, 3
+    return 1, 1
+
+
+def _servings_scale(target_servings, servings):
+    try:
+        if servings:
+            return target_servings / float(servings)
+    except (TypeError, ValueError, ZeroDivisionError):
+        pass
+    return 1
+
+
+class _InternTable:
+    # Interns values as dense ids, each with one piece of data (the unit of a
+    # key) fixed when the value is first seen. An overlay over a shared table
+    # numbers its new values after the shared ones and only reads the base.
+
+    def __init__(self, base=None):
+        self.base = base
+        self.offset = len(base) if base is not None else 0
+        self.values = []
+        self.data = []
+        self.ids = {}
+
+    def __len__(self):
+        return self.offset + len(self.values)
+
+    def __getitem__(self, value_id):
+        if value_id < self.offset:
+            return self.base[value_id]
+        return self.values[value_id - self.offset]
+
+    def data_of(self, value_id):
+        if value_id < self.offset:
+            return self.base.data_of(value_id)
+        return self.data[value_id - self.offset]
+
+    def intern(self, value, data=None):
+        if self.base is not None:
+            value_id = self.base.ids.get(value)
+            if value_id is not None:
+                return value_id
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self)
+            self.values.append(value)
+            self.data.append(data)
+        return value_id
+
+
+class ShoppingAggregator:
+    # Column store of every catalog ingredient line for one language:
+    # interned key/group ids plus the parsed base quantity and unit factors,
+    # built once per catalog. Aggregating a range is then a gather plus a
+    # bincount (NumPy) or a tight loop over the same columns. The store is
+    # read-only after __init__, so threads share it without a lock.
+
+    def __init__(self, recipes, language):
+        self.language = language
+        self.tables = {"key": _InternTable(), "name": _InternTable(), "group": _InternTable()}
+        self.spans = {}
+        self.servings = {}
+        columns = {"key": [], "name": [], "base": [], "mul": [], "div": [], "group": []}
+        for recipe in recipes:
+            if language == "original":
+                ingredients = recipe.get("ingredients_original", [])
+            else:
+                ingredients = recipe.get("ingredients", [])
+            start = len(columns["key"])
+            for item in ingredients:
+                self._append_line(columns, self.tables, item)
+            self.spans[recipe.get("recipe_id")] = (start, len(columns["key"]))
+            self.servings[recipe.get("recipe_id")] = recipe.get("servings")
+        self.columns = columns
+        self.size = len(columns["key"])
+        if np is not None:
+            self.arrays = {
+                "key": np.array(columns["key"], dtype=np.int64),
+                "name": np.array(columns["name"], dtype=np.int64),
+                "base": np.array(columns["base"], dtype=np.float64),
+                "mul": np.array(columns["mul"], dtype=np.float64),
+                "div": np.array(columns["div"], dtype=np.float64),
+                "group": np.array(columns["group"], dtype=np.int64),
             }
+
+    def _append_line(self, columns, tables, item):
+        if not item.get("name"):
+            return
+        key_name, display_name, raw_unit = _ingredient_identity(item, self.language)
+        qty = item.get("quantity", 0)
+        try:
+            qty = float(qty)
+        except (TypeError, ValueError):
+            qty = 0
+        _, unit = _normalize_quantity_unit(1, raw_unit)
+        _, key_unit = _normalize_quantity_unit(1, unit)
+        mul, div = _unit_factors(raw_unit)
+        key = _item_key(key_name, key_unit, self.language)
+        columns["key"].append(tables["key"].intern(key, unit))
+        columns["name"].append(tables["name"].intern(display_name))
+        columns["base"].append(qty)
+        columns["mul"].append(mul)
+        columns["div"].append(div)
+        columns["group"].append(tables["group"].intern(_unit_group(unit)))
+
+    def aggregate(self, meals):
+        # `meals` is an ordered list of (meal, target_servings). Lines of meals
+        # whose recipe is not in the catalog go to side columns numbered after
+        # the catalog lines, with their new keys in per-call overlay tables, so
+        # the shared store never grows.
+        segments = []
+        extra = {name: [] for name in self.columns}
+        tables = {name: _InternTable(table) for name, table in self.tables.items()}
+        recipe_ids = []
+        recipe_index = {}
+        scales = {}
+        for meal, target_servings in meals:
+            recipe_id = meal.get("recipe_id")
+            rid = -1
+            if recipe_id:
+                rid = recipe_index.setdefault(recipe_id, len(recipe_ids))
+                if rid == len(recipe_ids):
+                    recipe_ids.append(recipe_id)
+            span = self.spans.get(recipe_id) if recipe_id else None
+            if span is not None:
+                scale = scales.get((rid, target_servings))
+                if scale is None:
+                    scale = scales[(rid, target_servings)] = _servings_scale(
+                        target_servings, self.servings.get(recipe_id)
+                    )
+            else:
+                start = self.size + len(extra["key"])
+                for item in meal.get("ingredients", []):
+                    self._append_line(extra, tables, item)
+                span = (start, self.size + len(extra["key"]))
+                scale = 1
+            if span[1] > span[0]:
+                segments.append((span[0], span[1], scale, rid))
+        if np is not None:
+            totals = self._aggregate_numpy(extra, len(tables["group"]), segments)
+        else:
+            totals = self._aggregate_python(extra, segments)
+        return self._shopping_list(totals, tables, recipe_ids)
+
+    def _aggregate_python(self, extra, segments):
+        totals = {}
+        for start, end, scale, rid in segments:
+            # A segment is one meal, so it lies wholly in the catalog columns
+            # or wholly in the side columns.
+            columns, offset = (self.columns, 0) if start < self.size else (extra, self.size)
+            keys, base = columns["key"], columns["base"]
+            mul, div, groups = columns["mul"], columns["div"], columns["group"]
+            names = columns["name"]
+            for line in range(start - offset, end - offset):
+                key_id = keys[line]
+                entry = totals.get(key_id)
+                if entry is None:
+                    entry = totals[key_id] = [0, set(), set(), names[line]]
+                entry[0] += base[line] * scale * mul[line] / div[line]
+                entry[1].add(groups[line])
+                if rid >= 0:
+                    entry[2].add(rid)
+        return totals
+
+    def _aggregate_numpy(self, extra, group_count, segments):
+        if not segments:
+            return {}
+        starts, ends, scales, rids = (np.array(column) for column in zip(*segments))
+        lengths = ends - starts
+        # Line indices of every segment back to back, without a Python loop.
+        offsets = np.cumsum(lengths) - lengths
+        index = np.arange(int(lengths.sum())) - np.repeat(offsets - starts, lengths)
+        scales = np.repeat(scales.astype(np.float64), lengths)
+        rids = np.repeat(rids.astype(np.int64), lengths)
+        side = index >= self.size
+        has_side = bool(side.any())
+
+        def take(name):
+            shared = self.arrays[name]
+            if not has_side:
+                return shared[index]
+            values = np.empty(len(index), dtype=shared.dtype)
+            values[~side] = shared[index[~side]]
+            values[side] = np.array(extra[name], dtype=shared.dtype)[index[side] - self.size]
+            return values
+
+        keys = take("key")
+        qty = take("base") * scales * take("mul") / take("div")
+        # bincount sums each bin in input order, i.e. in meal order, matching
+        # the sequential += of compute_shopping_list bit for bit.
+        sums = np.bincount(keys, weights=qty)
+        # The name of a key's first line in meal order, as in the loop above.
+        present, first = np.unique(keys, return_index=True)
+        first_names = take("name")[first]
+        totals = {
+            int(key_id): [sums[key_id], set(), set(), int(name_id)]
+            for key_id, name_id in zip(present.tolist(), first_names.tolist())
+        }
+        pairs = np.unique(keys * group_count + take("group"))
+        for pair in pairs.tolist():
+            totals[pair // group_count][1].add(pair % group_count)
+        with_recipe = rids >= 0
+        if with_recipe.any():
+            width = int(rids.max()) + 1
+            recipe_pairs = np.unique(keys[with_recipe] * width + rids[with_recipe])
+            for pair in recipe_pairs.tolist():
+                totals[pair // width][2].add(pair % width)
+        return totals
+
+    def _shopping_list(self, totals, tables, recipe_ids):
+        keys = tables["key"]
+        entries = sorted(totals.items(), key=lambda item: keys[item[0]])
+        shopping_list = []
+        for key_id, (quantity, groups, rids, name_id) in entries:
+            names = sorted(recipe_ids[rid] for rid in rids)
+            shopping_list.append(
+                {
+                    "name": tables["name"][name_id],
+                    "unit": "mixed" if len(groups) > 1 else keys.data_of(key_id),
+                    "quantity": _round_quantity(float(quantity)),
+                    "recipes_count": len(names),
+                    "recipe_ids": names,
+                    "key": keys[key_id],
+                }
+            )
+        return shopping_list
+
+
+def _shopping_aggregator(language):
+    catalog = get_storage().load_recipes()
+    version = load_ingredient_dictionary()["version"]
+    with _RECIPE_CACHE_LOCK:
+        if (
+            _aggregator_cache["recipes"] is not catalog
+            or _aggregator_cache["version"] != version
+        ):
+            _aggregator_cache.update({"recipes": catalog, "version": version, "languages": {}})
+        aggregator = _aggregator_cache["languages"].get(language)
+        if aggregator is None:
+            aggregator = ShoppingAggregator(catalog, language)
+            _aggregator_cache["languages"][language] = aggregator
+        return aggregator
+
+
+def compute_shopping_list_range(
+    plans, language="en", start_date=None, end_date=None, family_sizes=None
+):
+    # Aggregate many weekly plans (a month, or several households via
+    # per-plan family_sizes) in one pass. Output matches compute_shopping_list.
+    default_servings = _target_servings()
+    meals = []
+    for position, plan in enumerate(plans):
+        target = default_servings
+        if family_sizes is not None and family_sizes[position]:
+            target = family_sizes[position]
+        for day in (plan or {}).get("days", []):
+            day_date = day.get("date") or ""
+            if (start_date and day_date < start_date) or (end_date and day_date > end_date):
+                continue
+            for meal in day.get("meals", {}).values():
+                if meal:
+                    meals.append((meal, target))
+    return _shopping_aggregator(language).aggregate(meals)
+
+
+def _plan_slot_signatures(plan):
+    signatures = {}
+    for day in plan.get("days", []):
+        for meal_type, meal in day.get("meals", {}).items():
+            if not meal:
+                continue
+            # Locking a meal does not change what needs to be bought.
+            content = {key: value for key, value in meal.items() if key != "locked"}
+            signatures[f"{day.get('date')}|{meal_type}"] = (
+                meal,
+                json.dumps(content, sort_keys=True, ensure_ascii=False),
+            )
+    return signatures
+
+
+def _sync_shopping_aggregate(aggregate, plan, language):
+    # Apply per-slot deltas so the stored totals match `plan`: slots that
+    # changed or disappeared are subtracted, new slots are added.
+    state = aggregate["languages"].setdefault(language, {"slots": {}, "totals": {}})
+    slots, totals = state["slots"], state["totals"]
+    signatures = _plan_slot_signatures(plan)
+    changed = False
+    for slot in list(slots):
+        current = signatures.get(slot)
+        if current is None or current[1] != slots[slot]["signature"]:
+            stored = slots.pop(slot)
+            for item in stored["items"]:
+                _add_contribution(totals, item, stored["recipe_id"], -1)
+            changed = True
+    for slot, (meal, signature) in signatures.items():
+        if slot in slots:
+            continue
+        recipe_id = meal.get("recipe_id")
+        recipe = get_recipe_by_id(recipe_id) if recipe_id else None
+        items = _meal_contributions(
+            meal, recipe, language, aggregate["family_size"]
         )
-    return shopping_list
+        for item in items:
+            _add_contribution(totals, item, recipe_id)
+        slots[slot] = {"signature": signature, "recipe_id": recipe_id, "items": items}
+        changed = True
+    return changed
+
+
+def _shopping_aggregate_signature():
+    # Everything besides the plan that the stored totals depend on. Recipes
+    # can change outside planner, so the catalog stamp is part of it.
+    return {
+        "family_size": _target_servings(),
+        "dictionary": load_ingredient_dictionary()["version"],
+        "catalog": get_storage().recipe_catalog_stamp(),
+    }
+
+
+def _current_shopping_aggregate(aggregate, signature):
+    if isinstance(aggregate, dict) and all(
+        aggregate.get(name) == value for name, value in signature.items()
+    ):
+        return aggregate
+    return dict(signature, languages={})
+
+
+def _update_shopping_aggregate(plan=None):
+    # Called on every plan save and recipe write, and the only place the
+    # aggregate is stored. A signature change starts it over; otherwise only
+    # the plan slots that changed are applied.
+    plan = plan or load_weekly_plan()
+    if not plan:
+        return
+    storage = get_storage()
+    with locked("shopping_aggregate"):
+        stored = storage.load_document(SHOPPING_AGGREGATE_DOC, None)
+        aggregate = _current_shopping_aggregate(stored, _shopping_aggregate_signature())
+        changed = aggregate is not stored
+        for language in SHOPPING_LANGUAGES:
+            changed = _sync_shopping_aggregate(aggregate, plan, language) or changed
+        if changed:
+            storage.save_document(SHOPPING_AGGREGATE_DOC, aggregate)
+
+
+@instrument("get_shopping_list")
+def get_shopping_list(plan=None, language="en"):
+    # Read-only: a stale or missing aggregate is brought up to date in memory
+    # and left for the next write to store.
+    plan = plan or load_weekly_plan()
+    if not plan:
+        return None
+    stored = get_storage().load_document(SHOPPING_AGGREGATE_DOC, None)
+    aggregate = _current_shopping_aggregate(stored, _shopping_aggregate_signature())
+    _sync_shopping_aggregate(aggregate, plan, language)
+    return _shopping_list_from_totals(aggregate["languages"][language]["totals"])
+
+
+def reset_shopping_aggregate():
+    with locked("shopping_aggregate"):
+        get_storage().delete_document(SHOPPING_AGGREGATE_DOC)
+    _update_shopping_aggregate()
+
+
+def check_shopping_aggregate(plan=None, language="en"):
+    plan = plan or load_weekly_plan()
+    if not plan:
+        return []
+    expected = {item["key"]: item for item in compute_shopping_list(plan, language)}
+    actual = {item["key"]: item for item in get_shopping_list(plan, language)}
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want, got = expected.get(key), actual.get(key)
+        if (
+            want is None
+            or got is None
+            or want["unit"] != got["unit"]
+            or want["recipe_ids"] != got["recipe_ids"]
+            or abs(float(want["quantity"]) - float(got["quantity"])) > 0.01
+        ):
+            mismatches.append({"key": key, "expected": want, "actual": got})
+    return mismatches
 
 
 def format_date(iso_date):
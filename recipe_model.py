@@ -0,0 +1,147 @@
+import sys
+from collections.abc import Mapping
+
+# Compact in-memory form of the recipe JSON schema for the per-worker catalog
+# cache. Both classes read like the dicts they replace (`recipe.get(...)`,
+# `recipe["name"]`, iteration) so planner code works on either, and
+# `to_dict()` gives back the exact JSON document they were built from.
+
+_MISSING = object()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _freeze(value):
+    # JSON arrays become tuples; JSON has no tuples, so this round-trips.
+    if type(value) is list:
+        return tuple(_intern(item) for item in value)
+    return _intern(value)
+
+
+def _thaw(value):
+    if type(value) is tuple:
+        return list(value)
+    return value
+
+
+class _Record(Mapping):
+    __slots__ = ()
+    FIELDS = ()
+
+    def _set_fields(self, data):
+        extra = None
+        for field in self.FIELDS:
+            object.__setattr__(self, field, _MISSING)
+        for key, value in data.items():
+            if key in self.FIELDS:
+                object.__setattr__(self, key, self._convert(key, value))
+            else:
+                extra = extra or {}
+                extra[key] = value
+        object.__setattr__(self, "extra", extra)
+
+    def _convert(self, key, value):
+        return _freeze(value)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == as_dict(other)
+
+    __hash__ = None
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only; use to_dict()")
+
+    def __setitem__(self, key, value):
+        # Records are shared by every caller of the catalog cache.
+        raise TypeError(f"{type(self).__name__} is read-only; copy it with as_dict() to change it")
+
+    def __delitem__(self, key):
+        raise TypeError(f"{type(self).__name__} is read-only; copy it with as_dict() to change it")
+
+    def __reduce__(self):
+        # Pickled (batch worker processes) via the JSON form.
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Ingredient(_Record):
+    __slots__ = ("name", "quantity", "unit", "ingredient_id", "extra")
+    FIELDS = ("name", "quantity", "unit", "ingredient_id")
+
+    def __init__(self, data):
+        self._set_fields(data)
+
+    def to_dict(self):
+        return {key: _thaw(self[key]) for key in self}
+
+
+class Recipe(_Record):
+    __slots__ = (
+        "recipe_id",
+        "name",
+        "name_original",
+        "meal_types",
+        "servings",
+        "source_url",
+        "thumbnail_url",
+        "notes",
+        "family_feedback_score",
+        "family_feedback",
+        "ingredients",
+        "ingredients_original",
+        "instructions",
+        "instructions_original",
+        "extra",
+    )
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, data):
+        self._set_fields(data)
+
+    def _convert(self, key, value):
+        if key in ("ingredients", "ingredients_original") and type(value) is list:
+            return tuple(
+                Ingredient(item) if isinstance(item, dict) else item for item in value
+            )
+        return _freeze(value)
+
+    def to_dict(self):
+        data = {}
+        for key in self:
+            value = self[key]
+            if key in ("ingredients", "ingredients_original") and type(value) is tuple:
+                value = [as_dict(item) for item in value]
+            data[key] = _thaw(value)
+        return data
+
+
+def as_dict(record):
+    # Plain JSON-ready dict for a Recipe/Ingredient or any other mapping.
+    if isinstance(record, _Record):
+        return record.to_dict()
+    return dict(record)
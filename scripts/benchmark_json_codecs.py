@@ -0,0 +1,126 @@
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from json_codec import available_codecs, get_codec
+from planner import MEAL_TYPES
+
+INGREDIENTS = [f"ingredient {idx}" for idx in range(400)]
+UNITS = ["g", "ml", "tbsp", "tsp", "count", ""]
+
+
+def _synthetic_catalog(count, rng):
+    recipes = []
+    for idx in range(count):
+        ingredients = [
+            {
+                "name": rng.choice(INGREDIENTS),
+                "quantity": rng.randint(1, 500),
+                "unit": rng.choice(UNITS),
+            }
+            for _ in range(rng.randint(5, 15))
+        ]
+        recipes.append(
+            {
+                "recipe_id": f"recipe-{idx}",
+                "name": f"Recipe {idx}",
+                "name_original": f"레시피 {idx}",
+                "meal_types": rng.sample(MEAL_TYPES, k=rng.randint(1, 3)),
+                "servings": rng.choice([2, 4]),
+                "ingredients": ingredients,
+                "ingredients_original": [dict(item) for item in ingredients],
+                "instructions": [f"Step {step}" for step in range(rng.randint(3, 8))],
+            }
+        )
+    return recipes
+
+
+def _synthetic_history(weeks, rng):
+    first_week = date(2020, 1, 6)
+    history = []
+    for week in range(weeks):
+        start = first_week + timedelta(weeks=week)
+        days = []
+        for offset in range(7):
+            meals = {}
+            for meal_type in MEAL_TYPES:
+                recipe = rng.randrange(5000)
+                meals[meal_type] = {
+                    "recipe_id": f"recipe-{recipe}",
+                    "name": f"Recipe {recipe}",
+                    "locked": rng.random() < 0.2,
+                }
+            days.append({"date": (start + timedelta(days=offset)).isoformat(), "meals": meals})
+        history.append(
+            {
+                "generated_at": f"{start.isoformat()}T08:00:00",
+                "plan": {"start_date": start.isoformat(), "days": days},
+            }
+        )
+    return history
+
+
+def _legacy_dumps(value):
+    # What _save_json wrote before the codec was pluggable.
+    return json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare read/write throughput of the installed JSON codecs."
+    )
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--weeks", type=int, default=520)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = {
+        "catalog": _synthetic_catalog(args.recipes, rng),
+        "history": _synthetic_history(args.weeks, rng),
+    }
+    variants = [("json", "legacy", _legacy_dumps, json.loads)]
+    for name in available_codecs():
+        dumps, loads = get_codec(name)
+        variants.append((name, "compact", dumps, loads))
+        variants.append((name, "pretty", lambda value, dumps=dumps: dumps(value, pretty=True), loads))
+
+    mb = 1024 * 1024
+    print(
+        f"{'document':>8} {'codec':>8} {'layout':>8} {'size MB':>8} "
+        f"{'write ms':>9} {'read ms':>8} {'write MB/s':>10} {'read MB/s':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "document.json"
+        for label, document in documents.items():
+            for codec, layout, dumps, loads in variants:
+                write = _time(lambda: path.write_bytes(dumps(document)), args.repeat)
+                size = path.stat().st_size
+                read = _time(lambda: loads(path.read_bytes()), args.repeat)
+                assert loads(path.read_bytes()) == document
+                print(
+                    f"{label:>8} {codec:>8} {layout:>8} {size / mb:>8.2f} "
+                    f"{write * 1000:>9.1f} {read * 1000:>8.1f} "
+                    f"{size / mb / write:>10.1f} {size / mb / read:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import MEAL_TYPES, generate_meal_plans
+
+
+def _synthetic_recipes(count, seed=0):
+    rng = random.Random(seed)
+    recipes = []
+    for idx in range(count):
+        meal_types = rng.sample(MEAL_TYPES, k=rng.randint(1, 3))
+        recipes.append(
+            {
+                "recipe_id": f"r{idx}",
+                "name": f"Recipe {idx}",
+                "meal_types": meal_types,
+                "ingredients": [{"name": "egg", "quantity": 1, "unit": "count"}],
+            }
+        )
+    return recipes
+
+
+def _legacy_plans(recipes, max_repeat, weeks, first_week):
+    # The pre-engine algorithm: rebuild by_meal per week, filter every
+    # candidate per slot, shuffle the filtered list.
+    plans = []
+    for week in range(weeks):
+        by_meal = defaultdict(list)
+        for recipe in recipes:
+            for meal_type in recipe.get("meal_types") or []:
+                by_meal[meal_type].append(recipe)
+        usage_counts = defaultdict(int)
+        week_start = first_week + timedelta(weeks=week)
+        days = []
+        for day_offset in range(7):
+            meals = {}
+            used_ids = set()
+            for meal_type in MEAL_TYPES:
+                available = [
+                    recipe
+                    for recipe in by_meal.get(meal_type, [])
+                    if usage_counts[recipe["name"]] < max_repeat
+                    and recipe.get("recipe_id") not in used_ids
+                ]
+                random.shuffle(available)
+                recipe = available[0] if available else None
+                meals[meal_type] = recipe and {"recipe_id": recipe["recipe_id"]}
+                if recipe:
+                    usage_counts[recipe["name"]] += 1
+                    used_ids.add(recipe["recipe_id"])
+            days.append(
+                {"date": (week_start + timedelta(days=day_offset)).isoformat(), "meals": meals}
+            )
+        plans.append({"start_date": week_start.isoformat(), "days": days})
+    return plans
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the indexed plan engine with the legacy planner."
+    )
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--weeks", default="1,4,12")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = {"max_repeat_per_week": 2}
+    first_week = date(2025, 1, 6)
+    print(f"{'recipes':>8} {'weeks':>6} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        recipes = _synthetic_recipes(size)
+        for weeks in [int(value) for value in args.weeks.split(",")]:
+            legacy = _time(
+                lambda: _legacy_plans(recipes, config["max_repeat_per_week"], weeks, first_week),
+                args.repeat,
+            )
+            engine = _time(
+                lambda: generate_meal_plans(first_week, weeks, config=config, recipes=recipes),
+                args.repeat,
+            )
+            print(
+                f"{size:>8} {weeks:>6} {legacy * 1000:>10.2f} {engine * 1000:>10.2f} "
+                f"{legacy / engine:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import MEAL_TYPES
+from recipe_model import Recipe
+
+INGREDIENTS = [f"ingredient {idx}" for idx in range(400)]
+UNITS = ["g", "ml", "tbsp", "tsp", "count", ""]
+
+
+def _synthetic_corpus(count, seed=0):
+    # Serialized and parsed again so every string is a separate object, the
+    # way json.load hands recipes to the catalog cache.
+    rng = random.Random(seed)
+    recipes = []
+    for idx in range(count):
+        ingredients = [
+            {
+                "name": rng.choice(INGREDIENTS),
+                "quantity": rng.randint(1, 500),
+                "unit": rng.choice(UNITS),
+            }
+            for _ in range(rng.randint(5, 15))
+        ]
+        recipes.append(
+            {
+                "recipe_id": f"recipe-{idx}",
+                "name": f"Recipe {idx}",
+                "meal_types": rng.sample(MEAL_TYPES, k=rng.randint(1, 3)),
+                "servings": rng.choice([2, 4]),
+                "ingredients": ingredients,
+                "ingredients_original": [dict(item) for item in ingredients],
+                "instructions": [f"Step {step}" for step in range(rng.randint(3, 8))],
+                "instructions_original": [],
+            }
+        )
+    return json.dumps(recipes)
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare catalog memory for plain dicts and compact Recipe records."
+    )
+    parser.add_argument("--recipes", type=int, default=50000)
+    args = parser.parse_args()
+
+    payload = _synthetic_corpus(args.recipes)
+    dicts, dict_size = _measure(lambda: json.loads(payload))
+    records, record_size = _measure(lambda: [Recipe(item) for item in json.loads(payload)])
+    assert all(record.to_dict() == item for record, item in zip(records, dicts))
+
+    mb = 1024 * 1024
+    print(f"recipes        {args.recipes}")
+    print(f"dicts          {dict_size / mb:8.1f} MB")
+    print(f"Recipe records {record_size / mb:8.1f} MB")
+    print(f"saving         {(1 - record_size / dict_size) * 100:7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,22 @@
-import json
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from planner import _normalize_recipe
-
-RECIPES_DIR = Path(__file__).resolve().parents[1] / "data" / "recipes"
+from planner import clean_recipe_files, get_storage
 
 
 def main():
-    if not RECIPES_DIR.exists():
-        print("No recipes directory found.")
+    # Recipes are normalized as they load, so only the JSON files on disk can
+    # lag behind. Changed ones are written through planner, which keeps the
+    # indexes and the "recipes" version current.
+    if get_storage().name != "json":
+        print("Nothing to clean: this backend stores recipes normalized.")
         return
-    for path in RECIPES_DIR.glob("*.json"):
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, dict):
-            cleaned = _normalize_recipe(data)
-            with path.open("w", encoding="utf-8") as f:
-                json.dump(cleaned, f, indent=2, sort_keys=True, ensure_ascii=False)
-            print(f"Cleaned: {path}")
+    cleaned = clean_recipe_files()
+    for recipe_id in cleaned:
+        print(f"Cleaned: {recipe_id}")
+    print(f"{len(cleaned)} recipe files rewritten.")
 
 
 if __name__ == "__main__":
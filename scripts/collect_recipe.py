@@ -1,25 +1,34 @@
 
 import argparse
 import json
+import os
+import random
+import sys
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
 
-import yt_dlp
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "recipe_sources"
+from planner import (
+    DATA_DIR,
+    find_recipe_source,
+    locked,
+    save_recipe_prompt,
+    save_recipe_source,
+    youtube_cache_key,
+)
 
+# Kept out of recipe_sources/: a new file there moves the directory stamp that
+# the sources index and the recipe pages' ETags are checked against.
+JOURNAL_FILE = DATA_DIR / "collect_journal.jsonl"
 
-def _unique_path(base_path):
-    if not base_path.exists():
-        return base_path
-    stem = base_path.stem
-    suffix = base_path.suffix
-    for idx in range(2, 100):
-        candidate = base_path.with_name(f"{stem}-{idx}{suffix}")
-        if not candidate.exists():
-            return candidate
-    raise RuntimeError("Too many duplicate filenames.")
+_local = threading.local()
+_write_lock = threading.Lock()
 
 
 def _clean_text(text):
@@ -53,16 +62,27 @@ def _build_prompt(title, comment_text, description):
     )
 
 
+def _youtube_dl():
+    # One YoutubeDL per thread: it is not thread-safe, and building it is the
+    # expensive part of a cold start.
+    ydl = getattr(_local, "ydl", None)
+    if ydl is None:
+        import yt_dlp
+
+        ydl = _local.ydl = yt_dlp.YoutubeDL(
+            {
+                "quiet": True,
+                "skip_download": True,
+                "extractor_args": {"youtube": {"comment_sort": "top"}},
+                "getcomments": True,
+                "max_comments": 1,
+            }
+        )
+    return ydl
+
+
 def collect_youtube(url):
-    ydl_opts = {
-        "quiet": True,
-        "skip_download": True,
-        "extractor_args": {"youtube": {"comment_sort": "top"}},
-        "getcomments": True,
-        "max_comments": 1,
-    }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=False)
+    info = _youtube_dl().extract_info(url, download=False)
 
     title = _clean_text(info.get("title") or "YouTube recipe")
     description = _clean_text(info.get("description") or "")
@@ -73,22 +93,191 @@ def collect_youtube(url):
 
 
 def _existing_source(url):
-    if not DATA_DIR.exists():
-        return None
-    for path in DATA_DIR.glob("*_source.json"):
+    source = find_recipe_source(url)
+    return source.get("recipe_id") if source else None
+
+
+def save_source(url, source, collected):
+    title, description, comment_text, thumbnail = collected
+    recipe_id = uuid.uuid4().hex
+    payload = {
+        "recipe_id": recipe_id,
+        "source": source,
+        "source_url": url,
+        "title": title,
+        "description": description,
+        "top_comment": comment_text,
+        "thumbnail_url": thumbnail,
+        "collected_at": datetime.now().isoformat(timespec="seconds"),
+        "prompt": _build_prompt(title, comment_text, description),
+    }
+
+    # The prompt is a file to paste from on either backend; the source itself
+    # goes through the storage backend. Prompt first, so the JSON backend's
+    # source index covers both files.
+    with locked("recipe_sources"):
+        prompt_path = save_recipe_prompt(recipe_id, payload["prompt"])
+        save_recipe_source(payload)
+    return recipe_id, prompt_path
+
+
+class HostRateLimiter:
+    # Spaces out requests to the same host by at least `interval` seconds,
+    # across all worker threads.
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        if self.interval <= 0:
+            return
+        host = urlparse(url).netloc.lower().removeprefix("www.")
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _fetch_with_retries(url, extractor, limiter, retries, backoff):
+    for attempt in range(retries + 1):
+        limiter.wait(url)
         try:
-            with path.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
-            if payload.get("source_url") == url:
-                return path
-        except (json.JSONDecodeError, OSError):
+            return extractor(url)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2**attempt) * random.uniform(0.5, 1.5))
+
+
+def _read_urls(path):
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        urls = []
+        seen = set()
+        for line in handle:
+            url = line.strip()
+            if url and not url.startswith("#") and url not in seen:
+                seen.add(url)
+                urls.append(url)
+        return urls
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _load_journal(path):
+    # Last status per URL; failed URLs are retried on the next run.
+    finished = {}
+    if not path.exists():
+        return finished
+    with path.open("r", encoding="utf-8") as f:
+        text = f.read()
+    for line in text.splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn last line from an interrupted run
+        finished[entry.get("url")] = entry.get("status")
+    if text and not text.endswith("\n"):
+        with path.open("a", encoding="utf-8") as f:
+            f.write("\n")
+    return {url: status for url, status in finished.items() if status != "failed"}
+
+
+def _journal(path, entry):
+    entry["at"] = datetime.now().isoformat(timespec="seconds")
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def collect_batch(
+    urls,
+    source="youtube",
+    extractor=collect_youtube,
+    workers=4,
+    rate=1.0,
+    retries=3,
+    backoff=2.0,
+    force=False,
+    journal_path=None,
+):
+    # `extractor(url)` returns (title, description, comment_text, thumbnail);
+    # pass a fake one to run without network access.
+    journal_path = journal_path or JOURNAL_FILE
+    done = {} if force else _load_journal(journal_path)
+    limiter = HostRateLimiter(rate)
+    counts = {"saved": 0, "skipped": 0, "failed": 0}
+
+    pending = []
+    pending_keys = {}
+    for url in urls:
+        if url in done:
+            counts["skipped"] += 1
             continue
-    return None
+        key = youtube_cache_key(url)
+        if key in pending_keys:
+            counts["skipped"] += 1
+            entry = {"url": url, "status": "skipped", "duplicate_of": pending_keys[key]}
+            _journal(journal_path, entry)
+            continue
+        existing = None if force else _existing_source(url)
+        if existing:
+            counts["skipped"] += 1
+            _journal(journal_path, {"url": url, "status": "skipped", "recipe_id": existing})
+        else:
+            pending.append(url)
+            pending_keys[key] = url
+
+    def run(url):
+        collected = _fetch_with_retries(url, extractor, limiter, retries, backoff)
+        return save_source(url, source, collected)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, url): url for url in pending}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                recipe_id, _ = future.result()
+            except Exception as exc:
+                counts["failed"] += 1
+                _journal(journal_path, {"url": url, "status": "failed", "error": str(exc)})
+                print(f"Failed: {url} ({exc})")
+                continue
+            counts["saved"] += 1
+            _journal(journal_path, {"url": url, "status": "done", "recipe_id": recipe_id})
+            print(f"Saved: {url} ({recipe_id})")
+    return counts
 
 
 def main():
     parser = argparse.ArgumentParser(description="Collect recipe source text.")
-    parser.add_argument("url", help="YouTube URL")
+    parser.add_argument("url", nargs="?", help="YouTube URL")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Collect every URL in FILE (one per line, '-' for stdin).",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent fetches.")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="Minimum seconds between requests to the same host.",
+    )
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        default=JOURNAL_FILE,
+        help="Progress journal; a rerun skips URLs it lists as done.",
+    )
     parser.add_argument(
         "--source", default="youtube", choices=["youtube"], help="Source type"
     )
@@ -101,37 +290,32 @@ def main():
 
     if args.source != "youtube":
         raise SystemExit("Only youtube is supported for now.")
+    if not args.url and not args.batch:
+        parser.error("give a URL or --batch FILE")
+
+    if args.batch:
+        counts = collect_batch(
+            _read_urls(args.batch),
+            source=args.source,
+            workers=args.workers,
+            rate=args.rate,
+            retries=args.retries,
+            force=args.force,
+            journal_path=args.journal,
+        )
+        print(
+            f"{counts['saved']} saved, {counts['skipped']} skipped, "
+            f"{counts['failed']} failed (journal: {args.journal})"
+        )
+        return
 
     existing = _existing_source(args.url)
     if existing and not args.force:
         print(f"Source already collected: {existing}")
         return
 
-    title, description, comment_text, thumbnail = collect_youtube(args.url)
-    recipe_id = uuid.uuid4().hex
-    payload = {
-        "recipe_id": recipe_id,
-        "source": args.source,
-        "source_url": args.url,
-        "title": title,
-        "description": description,
-        "top_comment": comment_text,
-        "thumbnail_url": thumbnail,
-        "collected_at": datetime.now().isoformat(timespec="seconds"),
-        "prompt": _build_prompt(title, comment_text, description),
-    }
-
-    base_name = recipe_id
-    target = _unique_path(DATA_DIR / f"{base_name}_source.json")
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with target.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, sort_keys=True, ensure_ascii=False)
-
-    prompt_path = _unique_path(DATA_DIR / f"{base_name}_prompt.txt")
-    with prompt_path.open("w", encoding="utf-8") as f:
-        f.write(payload["prompt"])
-
-    print(f"Saved: {target}")
+    recipe_id, prompt_path = save_source(args.url, args.source, collect_youtube(args.url))
+    print(f"Saved: {recipe_id}")
     print(f"Prompt: {prompt_path}")
 
 
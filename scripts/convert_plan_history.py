@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import HISTORY_FILE, HISTORY_LOG_FILE, HISTORY_MIGRATED_FILE, convert_plan_history
+
+if __name__ == "__main__":
+    count = convert_plan_history()
+    if count is not None:
+        print(f"Converted {count} history entries into {HISTORY_LOG_FILE}")
+        print(f"The old file was moved to {HISTORY_MIGRATED_FILE.name}.")
+    elif HISTORY_LOG_FILE.exists():
+        print(f"{HISTORY_LOG_FILE} already exists; nothing to convert.")
+    else:
+        print(f"No legacy history found at {HISTORY_FILE}")
@@ -0,0 +1,56 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import json_codec
+from planner import (
+    get_storage,
+    load_config,
+    load_plan_history,
+    load_recipes,
+    load_shopping_state,
+    load_weekly_plan,
+)
+
+# Machine-owned data files are stored compact; this dumps them (from either
+# storage backend) in a form people can read and diff.
+EXPORTS = {
+    "config": load_config,
+    "plan": load_weekly_plan,
+    "shopping": load_shopping_state,
+    "history": load_plan_history,
+    "recipes": load_recipes,
+    "versions": lambda: get_storage().load_versions(),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export planner data as JSON.")
+    parser.add_argument(
+        "stores", nargs="*", help=f"Any of {', '.join(EXPORTS)} (default: all)."
+    )
+    parser.add_argument("--out", help="Directory for one <store>.json per store (default: stdout).")
+    parser.add_argument("--pretty", action="store_true", help="Indent and sort keys.")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.stores if name not in EXPORTS]
+    if unknown:
+        parser.error(f"unknown store(s): {', '.join(unknown)}")
+    stores = args.stores or list(EXPORTS)
+    data = {name: EXPORTS[name]() for name in stores}
+    if not args.out:
+        payload = data[stores[0]] if len(stores) == 1 else data
+        sys.stdout.buffer.write(json_codec.dumps(payload, pretty=args.pretty) + b"\n")
+        return
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for name, payload in data.items():
+        path = out / f"{name}.json"
+        path.write_bytes(json_codec.dumps(payload, pretty=args.pretty) + b"\n")
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
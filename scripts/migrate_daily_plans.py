@@ -9,6 +9,7 @@ DATA_DIR = ROOT / "data"
 DAILY_DIR = DATA_DIR / "daily_plans"
 WEEKLY_FILE = DATA_DIR / "weekly_plan.json"
 HISTORY_FILE = DATA_DIR / "weekly_plans.json"
+HISTORY_LOG_FILE = DATA_DIR / "plan_history.jsonl"
 
 
 def _load_json(path: Path):
@@ -20,6 +21,19 @@ def _load_json(path: Path):
         return None
 
 
+def _load_history():
+    if not HISTORY_LOG_FILE.exists():
+        history = _load_json(HISTORY_FILE)
+        return history if isinstance(history, list) else []
+    entries = []
+    for line in HISTORY_LOG_FILE.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
 def _save_daily_plan(day):
     date = day.get("date")
     if not date:
@@ -47,9 +61,8 @@ def main():
     weekly = _load_json(WEEKLY_FILE)
     created += migrate_from_weekly(weekly)
 
-    history = _load_json(HISTORY_FILE)
-    if isinstance(history, list):
-        for entry in history:
+    for entry in _load_history():
+        if isinstance(entry, dict):
             created += migrate_from_weekly(entry.get("plan"))
 
     print(f"Created {created} daily plan files in {DAILY_DIR}")
@@ -0,0 +1,31 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import SQLITE_DB_FILE, JsonStorage, convert_youtube_cache
+from sqlite_storage import SqliteStorage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copy the JSON data/ tree into the SQLite storage backend."
+    )
+    parser.add_argument(
+        "--db", default=str(SQLITE_DB_FILE), help="Target SQLite database path"
+    )
+    args = parser.parse_args()
+
+    source = JsonStorage()
+    convert_youtube_cache(source)
+    counts = SqliteStorage(args.db).import_from(source)
+    print(
+        f"Migrated {counts['recipes']} recipes, {counts['recipe_sources']} sources "
+        f"and {counts['history']} history entries into {args.db}"
+    )
+    print("Set PLANNER_STORAGE=sqlite to use it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Local stand-in for the OpenAI chat-completions endpoint. Point the planner at
+# it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 to exercise parsing,
+# pooling and retries offline; --fail-rate and --latency inject 429/503s and
+# slow responses.
+
+CANNED_RECIPE = {
+    "name": "Stub Kimchi Fried Rice",
+    "meal_type": "dinner",
+    "ingredients": [
+        {"name": "cooked rice", "quantity": 400, "unit": "g"},
+        {"name": "kimchi", "quantity": 150, "unit": "g"},
+        {"name": "egg", "quantity": 2, "unit": "count"},
+        {"name": "soy sauce", "quantity": 1, "unit": "tbsp"},
+    ],
+    "ingredients_original": [
+        {"name": "밥", "quantity": 400, "unit": "g"},
+        {"name": "김치", "quantity": 150, "unit": "g"},
+        {"name": "달걀", "quantity": 2, "unit": "개"},
+        {"name": "간장", "quantity": 1, "unit": "큰술"},
+    ],
+    "instructions": ["Fry the kimchi.", "Add rice and soy sauce.", "Top with a fried egg."],
+    "instructions_original": ["김치를 볶는다.", "밥과 간장을 넣는다.", "달걀프라이를 올린다."],
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+            server.stats["connections"].add(self.client_address)
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send(401, {"error": {"message": "Missing bearer token."}})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        if server.rng.random() < server.fail_rate:
+            with server.stats_lock:
+                server.stats["failures"] += 1
+            status = server.rng.choice([429, 503])
+            headers = {"Retry-After": "0"} if status == 429 else None
+            self._send(status, {"error": {"message": "Injected failure."}}, headers)
+            return
+        self._send(
+            200,
+            {
+                "id": f"chatcmpl-stub-{server.stats['requests']}",
+                "object": "chat.completion",
+                "model": request.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps(server.recipe, ensure_ascii=False),
+                        },
+                    }
+                ],
+            },
+        )
+
+
+def make_server(host="127.0.0.1", port=0, fail_rate=0.0, latency=0.0, recipe=None, seed=0, verbose=False):
+    # Port 0 picks a free port; read it back from server.server_address.
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.fail_rate = fail_rate
+    server.latency = latency
+    server.recipe = recipe or CANNED_RECIPE
+    server.rng = random.Random(seed)
+    server.verbose = verbose
+    server.stats_lock = threading.Lock()
+    server.stats = {"requests": 0, "failures": 0, "connections": set()}
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve canned OpenAI chat-completions responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of 429/503 responses.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each request.")
+    parser.add_argument("--recipe", help="JSON file returned as the completion content.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    recipe = None
+    if args.recipe:
+        recipe = json.loads(Path(args.recipe).read_text(encoding="utf-8"))
+    server = make_server(
+        args.host, args.port, args.fail_rate, args.latency, recipe, verbose=args.verbose
+    )
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port}/v1 (OPENAI_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = server.stats
+        print(
+            f"{stats['requests']} requests, {stats['failures']} injected failures, "
+            f"{len(stats['connections'])} connections"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import MEAL_TYPES, recipes_from_pantry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List recipes you can cook from these ingredients.")
+    parser.add_argument("ingredients", nargs="+", help="Ingredient names (English or Korean).")
+    parser.add_argument("--max-missing", type=int, help="Hide recipes missing more than N.")
+    parser.add_argument("--meal", choices=MEAL_TYPES, help="Only this meal type.")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    results = recipes_from_pantry(
+        args.ingredients,
+        limit=args.limit,
+        max_missing=args.max_missing,
+        meal_types=[args.meal] if args.meal else None,
+    )
+    if not results:
+        print("No recipes use these ingredients.")
+        return
+    for result in results:
+        missing = ", ".join(result["missing"]) or "nothing"
+        print(f"- {result['recipe']['name']} ({result['coverage']:.0%}): missing {missing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,70 @@
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from planner import generate_weekly_plan
+import json_codec
+from planner import (
+    DEFAULT_PROFILE,
+    generate_plan_batch,
+    generate_weekly_plan,
+    parse_date,
+    save_plan_batch,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate weekly meal plans.")
+    parser.add_argument("--start", help="First week start date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--weeks", type=int, default=1, help="Number of consecutive weeks"
+    )
+    parser.add_argument(
+        "--profiles",
+        default="",
+        help=f"Comma-separated profiles from config.json (default: {DEFAULT_PROFILE})",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Worker processes for batch runs"
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for batch runs")
+    parser.add_argument(
+        "--output", help="Also write the generated batch to this JSON file"
+    )
+    args = parser.parse_args()
+    if args.weeks < 1:
+        parser.error("--weeks must be at least 1")
+
+    start_date = parse_date(args.start) if args.start else None
+    if args.start and not start_date:
+        raise SystemExit(f"Invalid --start date: {args.start}")
+    profiles = [name.strip() for name in args.profiles.split(",") if name.strip()]
+
+    if args.weeks == 1 and not profiles and not args.output:
+        plan = generate_weekly_plan(start_date)
+        print("Generated weekly plan starting", plan["start_date"])
+        return
+
+    batch = generate_plan_batch(
+        start_date,
+        weeks=args.weeks,
+        profiles=profiles,
+        processes=args.processes,
+        seed=args.seed,
+    )
+    count = save_plan_batch(batch)
+    if args.output:
+        Path(args.output).write_bytes(json_codec.dumps(batch, pretty=True) + b"\n")
+    for profile, plans in batch.items():
+        print(
+            f"{profile}: {len(plans)} weeks from {plans[0]['start_date']} "
+            f"to {plans[-1]['start_date']}"
+        )
+    first = next(iter(batch.values()))[0]
+    print("Current plan starts", first["start_date"])
+    print(f"Saved {count} plans to history")
+
 
 if __name__ == "__main__":
-    plan = generate_weekly_plan()
-    print("Generated weekly plan starting", plan["start_date"])
+    main()
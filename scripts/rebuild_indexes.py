@@ -0,0 +1,28 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from planner import get_storage, rebuild_recipe_index, rebuild_source_index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the recipe and recipe source lookup indexes from disk."
+    )
+    parser.parse_args()
+
+    recipes = rebuild_recipe_index()
+    print(f"Recipe index: {len(recipes.get('ids', {}))} recipes")
+    sources = rebuild_source_index()
+    print(
+        f"Source index: {len(sources.get('ids', {}))} ids, "
+        f"{len(sources.get('videos', {}))} videos"
+    )
+    # Hand edits bypass the storage writes, so cached pages are invalidated here.
+    get_storage().bump_version("recipes", "recipe_sources")
+
+
+if __name__ == "__main__":
+    main()
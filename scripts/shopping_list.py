@@ -1,15 +1,87 @@
+import argparse
+import importlib.util
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from planner import compute_shopping_list
+from planner import (
+    check_shopping_aggregate,
+    compute_shopping_list,
+    compute_shopping_list_range,
+    load_config,
+    load_plan_history,
+    profile_family_size,
+    reset_shopping_aggregate,
+)
 
-if __name__ == "__main__":
-    items = compute_shopping_list()
+
+def _history_plans():
+    # Regenerating a week appends a new entry; only the latest one per
+    # profile counts. Each plan is scaled to its own profile's family size.
+    plans = {}
+    for entry in load_plan_history():
+        plan = entry.get("plan") or {}
+        plans[(plan.get("profile"), plan.get("start_date"))] = plan
+    config = load_config()
+    family_sizes = [profile_family_size(profile, config) for profile, _ in plans]
+    return list(plans.values()), family_sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print this week's shopping list.")
+    parser.add_argument("--lang", default="en", help="en or original")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Verify the maintained aggregate against a full recompute; exits 1 on drift.",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="With --check, rebuild a drifted aggregate from the current plan.",
+    )
+    parser.add_argument("--from", dest="start", help="Aggregate history from YYYY-MM-DD.")
+    parser.add_argument("--to", dest="end", help="Aggregate history up to YYYY-MM-DD.")
+    args = parser.parse_args()
+    if args.repair and not args.check:
+        parser.error("--repair requires --check")
+
+    if args.check:
+        mismatches = check_shopping_aggregate(language=args.lang)
+        if not mismatches:
+            print("Shopping aggregate is consistent.")
+            return 0
+        for mismatch in mismatches:
+            print(f"- {mismatch['key']}: {mismatch['actual']} != {mismatch['expected']}")
+        if args.repair:
+            reset_shopping_aggregate()
+            print(f"{len(mismatches)} mismatches; aggregate rebuilt.")
+        else:
+            print(f"{len(mismatches)} mismatches; rerun with --repair to rebuild the aggregate.")
+        return 1
+
+    if args.start or args.end:
+        if importlib.util.find_spec("numpy") is None:
+            print("NumPy is not installed; using the slower pure-Python path.", file=sys.stderr)
+        plans, family_sizes = _history_plans()
+        items = compute_shopping_list_range(
+            plans,
+            language=args.lang,
+            start_date=args.start,
+            end_date=args.end,
+            family_sizes=family_sizes,
+        )
+    else:
+        items = compute_shopping_list(language=args.lang)
     if not items:
         print("No plan found. Generate a weekly plan first.")
     else:
         for item in items:
             unit = f" {item['unit']}" if item["unit"] else ""
             print(f"- {item['name']}: {item['quantity']}{unit}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
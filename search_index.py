@@ -0,0 +1,231 @@
+import heapq
+import re
+import sys
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+
+# Inverted index behind recipe search. Non-Hangul text is split into words;
+# Hangul runs become character bigrams so a compound dish name such as
+# 김치찌개 matches on any part of it. A term's weight depends on the fields it
+# appears in, and every query term also matches as a prefix (at a discount),
+# so results narrow while the user is still typing. Stopwords are not indexed,
+# but a trailing one in the query still matches as a prefix.
+
+FIELD_WEIGHTS = (
+    ("name", 10),
+    ("name_original", 10),
+    ("ingredients", 4),
+    ("ingredients_original", 4),
+    ("instructions", 1),
+    ("instructions_original", 1),
+)
+PREFIX_WEIGHT = 0.5
+# Bounds the work for one- or two-letter prefixes on a large vocabulary.
+MAX_PREFIX_TERMS = 64
+STOPWORDS = frozenset(
+    "a an and at by for from in into it of on or the then to until with".split()
+)
+
+_WORD_RE = re.compile(r"[^\W_가-힣]+")
+# Overlapping bigrams via lookahead, plus one-syllable runs on their own.
+_HANGUL_BIGRAM_RE = re.compile(r"(?=([가-힣]{2}))")
+_HANGUL_SINGLE_RE = re.compile(r"(?<![가-힣])[가-힣](?![가-힣])")
+
+
+def tokenize(text):
+    text = str(text).casefold()
+    terms = [word for word in _WORD_RE.findall(text) if word not in STOPWORDS]
+    terms.extend(_HANGUL_BIGRAM_RE.findall(text))
+    terms.extend(_HANGUL_SINGLE_RE.findall(text))
+    return terms
+
+
+def _trailing_stopword(query):
+    # The last word of a query is often still being typed, and a stopword may
+    # be the start of a longer word ("to" on the way to "toast").
+    words = _WORD_RE.findall(str(query).casefold())
+    if words and words[-1] in STOPWORDS:
+        return words[-1]
+    return None
+
+
+def _field_text(recipe, field):
+    value = recipe.get(field)
+    if not value:
+        return ""
+    if isinstance(value, str):
+        return value
+    texts = []
+    for item in value:
+        if type(item) is not str and isinstance(item, Mapping):
+            item = item.get("name")
+        if item:
+            texts.append(str(item))
+    return "\n".join(texts)
+
+
+def _searchable_text(recipe):
+    return tuple(_field_text(recipe, field) for field, _ in FIELD_WEIGHTS)
+
+
+def _document_terms(texts):
+    weights = {}
+    for (_, weight), text in zip(FIELD_WEIGHTS, texts):
+        if text:
+            for term in set(tokenize(text)):
+                weights[term] = weights.get(term, 0) + weight
+    return weights
+
+
+class RecipeSearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+        # recipe_id -> [record, text fingerprint, terms]
+        self.docs = {}
+
+    def rebuild(self, recipes):
+        self.postings = {}
+        self.docs = {}
+        for recipe in recipes:
+            recipe_id = recipe.get("recipe_id")
+            if recipe_id and recipe_id not in self.docs:
+                self._insert(recipe_id, recipe, _searchable_text(recipe))
+        self.vocabulary = sorted(self.postings)
+
+    def sync(self, recipes):
+        # Catalog reloads reuse unchanged records (JSON backend) or at least
+        # their text, so only recipes that really changed are re-tokenized.
+        seen = set()
+        for recipe in recipes:
+            recipe_id = recipe.get("recipe_id")
+            if not recipe_id or recipe_id in seen:
+                continue
+            seen.add(recipe_id)
+            doc = self.docs.get(recipe_id)
+            if doc is not None and doc[0] is recipe:
+                continue
+            self.add(recipe, doc=doc)
+        for recipe_id in [key for key in self.docs if key not in seen]:
+            self.remove(recipe_id)
+
+    def add(self, recipe, doc=None):
+        recipe_id = recipe.get("recipe_id")
+        if not recipe_id:
+            return
+        doc = doc or self.docs.get(recipe_id)
+        texts = _searchable_text(recipe)
+        if doc is not None and doc[1] == hash(texts):
+            doc[0] = recipe
+            return
+        if doc is not None:
+            self.remove(recipe_id)
+        for term in self._insert(recipe_id, recipe, texts):
+            if len(self.postings[term]) == 1:
+                insort(self.vocabulary, term)
+
+    def remove(self, recipe_id):
+        doc = self.docs.pop(recipe_id, None)
+        if doc is None:
+            return
+        for term in doc[2]:
+            posting = self.postings[term]
+            del posting[recipe_id]
+            if not posting:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+
+    def _insert(self, recipe_id, recipe, texts):
+        terms = []
+        postings = self.postings
+        for term, weight in _document_terms(texts).items():
+            posting = postings.get(term)
+            if posting is None:
+                term = sys.intern(term)
+                posting = postings[term] = {}
+            posting[recipe_id] = weight
+            terms.append(term)
+        self.docs[recipe_id] = [recipe, hash(texts), tuple(terms)]
+        return terms
+
+    def _expansions(self, term):
+        # (posting, factor) for the exact term and up to MAX_PREFIX_TERMS
+        # longer terms it is a prefix of.
+        expansions = []
+        if term in self.postings:
+            expansions.append((self.postings[term], 1))
+        start = bisect_left(self.vocabulary, term)
+        stop = min(start + MAX_PREFIX_TERMS + 1, len(self.vocabulary))
+        for pos in range(start, stop):
+            candidate = self.vocabulary[pos]
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                expansions.append((self.postings[candidate], PREFIX_WEIGHT))
+        return expansions
+
+    def _matches(self, expansions, candidates=None):
+        # A document scores its best expansion. With a small candidate set
+        # from earlier terms, probing each candidate beats walking postings.
+        scores = {}
+        if candidates is not None:
+            for recipe_id in candidates:
+                best = 0
+                for posting, factor in expansions:
+                    weight = posting.get(recipe_id)
+                    if weight is not None and weight * factor > best:
+                        best = weight * factor
+                if best:
+                    scores[recipe_id] = best
+            return scores
+        for posting, factor in expansions:
+            if not scores and factor == 1:
+                scores = dict(posting)
+                continue
+            for recipe_id, weight in posting.items():
+                weight *= factor
+                if scores.get(recipe_id, 0) < weight:
+                    scores[recipe_id] = weight
+        return scores
+
+    def search(self, query, limit=20, accept=None):
+        # Every query term has to match (exactly or as a prefix). Terms are
+        # scored cheapest first so later ones only look at survivors.
+        terms = list(dict.fromkeys(tokenize(query)))
+        plans = []
+        for term in terms:
+            expansions = self._expansions(term)
+            if not expansions:
+                return []
+            plans.append((sum(len(posting) for posting, _ in expansions), expansions))
+        # A trailing stopword only counts as a prefix, and only when some
+        # indexed word starts with it; otherwise it is dropped as usual.
+        partial = _trailing_stopword(query)
+        if partial:
+            expansions = self._expansions(partial)
+            if expansions:
+                plans.append((sum(len(posting) for posting, _ in expansions), expansions))
+        if not plans:
+            return []
+        plans.sort(key=lambda plan: plan[0])
+        scores = self._matches(plans[0][1])
+        for cost, expansions in plans[1:]:
+            if len(scores) * len(expansions) < cost:
+                other = self._matches(expansions, candidates=scores)
+            else:
+                other = self._matches(expansions)
+            scores = {key: value + other[key] for key, value in scores.items() if key in other}
+            if not scores:
+                return []
+        # Ties go to recipe_id order; plain tuples keep ranking in C.
+        ranked = [(-score, recipe_id) for recipe_id, score in scores.items()]
+        docs = self.docs
+        if accept is None:
+            return [docs[recipe_id][0] for _, recipe_id in heapq.nsmallest(limit, ranked)]
+        heapq.heapify(ranked)
+        results = []
+        while ranked and len(results) < limit:
+            recipe = docs[heapq.heappop(ranked)[1]][0]
+            if accept(recipe):
+                results.append(recipe)
+        return results
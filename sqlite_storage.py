@@ -0,0 +1,625 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import json_codec
+from recipe_model import Recipe, as_dict
+
+# Tables mirror supabase/schema.sql; plan_history, youtube_entries, llm_entries,
+# store_versions and documents (derived state such as aggregates) have no hosted
+# counterpart and only exist here. Columns that are jsonb upstream are stored as
+# JSON text, and recipe/source keys that have no column of their own are kept in
+# `extra` so records round-trip losslessly.
+SCHEMA = """
+create table if not exists recipes (
+  recipe_id text primary key,
+  name text not null,
+  name_original text,
+  meal_types text,
+  servings integer,
+  source_url text,
+  thumbnail_url text,
+  notes text,
+  family_feedback_score numeric,
+  family_feedback text,
+  ingredients text,
+  ingredients_original text,
+  instructions text,
+  instructions_original text,
+  extra text,
+  created_at text not null,
+  updated_at text not null
+);
+
+create table if not exists recipe_sources (
+  recipe_id text primary key,
+  source text not null,
+  source_url text,
+  thumbnail_url text,
+  title text,
+  top_comment text,
+  description text,
+  extra text,
+  created_at text not null,
+  updated_at text not null
+);
+
+create table if not exists daily_plans (
+  date text primary key,
+  meals text not null,
+  created_at text not null,
+  updated_at text not null
+);
+
+create table if not exists shopping_state (
+  key text primary key,
+  data text not null,
+  updated_at text not null
+);
+
+create table if not exists config (
+  key text primary key,
+  value text not null,
+  updated_at text not null
+);
+
+create table if not exists plan_history (
+  id integer primary key autoincrement,
+  generated_at text not null,
+  start_date text,
+  plan text not null
+);
+
+create table if not exists youtube_entries (
+  key text primary key,
+  data text not null,
+  accessed_at real not null
+);
+
+create table if not exists llm_entries (
+  key text primary key,
+  data text not null,
+  accessed_at real not null
+);
+
+create table if not exists store_versions (
+  name text primary key,
+  version integer not null
+);
+
+create table if not exists documents (
+  name text primary key,
+  data text not null,
+  updated_at text not null
+);
+
+create index if not exists recipes_updated_at_idx on recipes (updated_at);
+create index if not exists recipe_sources_source_url_idx on recipe_sources (source_url);
+create index if not exists plan_history_start_date_idx on plan_history (start_date);
+create index if not exists youtube_entries_accessed_at_idx on youtube_entries (accessed_at);
+create index if not exists llm_entries_accessed_at_idx on llm_entries (accessed_at);
+"""
+
+RECIPE_COLUMNS = {
+    "recipe_id": str,
+    "name": str,
+    "name_original": str,
+    "meal_types": None,
+    "servings": int,
+    "source_url": str,
+    "thumbnail_url": str,
+    "notes": str,
+    "family_feedback_score": (int, float),
+    "family_feedback": None,
+    "ingredients": None,
+    "ingredients_original": None,
+    "instructions": None,
+    "instructions_original": None,
+}
+
+SOURCE_COLUMNS = {
+    "recipe_id": str,
+    "source": str,
+    "source_url": str,
+    "thumbnail_url": str,
+    "title": str,
+    "top_comment": str,
+    "description": str,
+}
+
+CONFIG_KEY = "default"
+PLAN_KEY = "weekly_plan"
+# Hand-maintained documents copied by import_from; derived ones are rebuilt.
+IMPORTED_DOCUMENTS = ("ingredients",)
+
+
+def _now():
+    return datetime.now().isoformat(timespec="microseconds")
+
+
+def _dumps(value):
+    return json_codec.dumps(value).decode("utf-8")
+
+
+def _to_row(record, columns):
+    # A None entry in `columns` marks a jsonb column. Scalar columns only take
+    # values of their declared type so SQLite affinity never coerces them.
+    row = {}
+    extra = {}
+    for key, value in record.items():
+        if key not in columns:
+            extra[key] = value
+        elif columns[key] is None:
+            row[key] = _dumps(value)
+        elif isinstance(value, columns[key]) and not isinstance(value, bool):
+            row[key] = value
+        else:
+            extra[key] = value
+    row["extra"] = _dumps(extra) if extra else None
+    return row
+
+
+def _from_row(row, columns):
+    record = {}
+    for key, kind in columns.items():
+        value = row[key]
+        if value is None:
+            continue
+        record[key] = json_codec.loads(value) if kind is None else value
+    if row["extra"]:
+        record.update(json_codec.loads(row["extra"]))
+    return record
+
+
+class SqliteStorage:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._recipes_cache = (None, [])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("begin immediate")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("rollback")
+            raise
+        conn.execute("commit")
+
+    def _get_config_value(self, key):
+        row = self._connect().execute(
+            "select value from config where key = ?", (key,)
+        ).fetchone()
+        return json_codec.loads(row["value"]) if row else None
+
+    def _put_config_value(self, conn, key, value):
+        conn.execute(
+            "insert into config (key, value, updated_at) values (?, ?, ?) "
+            "on conflict(key) do update set value = excluded.value, "
+            "updated_at = excluded.updated_at",
+            (key, _dumps(value), _now()),
+        )
+
+    def load_config(self, default):
+        config = self._get_config_value(CONFIG_KEY)
+        return default if config is None else config
+
+    def save_config(self, config):
+        with self._transaction() as conn:
+            self._put_config_value(conn, CONFIG_KEY, config)
+            self._bump(conn, "config")
+
+    def load_recipes(self):
+        # Cheap aggregate over an indexed column tells us whether any recipe
+        # changed since the last full decode.
+        stamp = tuple(
+            self._connect()
+            .execute("select count(*), max(updated_at) from recipes")
+            .fetchone()
+        )
+        with self._lock:
+            if self._recipes_cache[0] == stamp:
+                return self._recipes_cache[1]
+        rows = self._connect().execute("select * from recipes order by rowid")
+        recipes = [Recipe(_from_row(row, RECIPE_COLUMNS)) for row in rows]
+        with self._lock:
+            self._recipes_cache = (stamp, recipes)
+        return recipes
+
+    def recipe_catalog_stamp(self):
+        count, updated_at = (
+            self._connect()
+            .execute("select count(*), max(updated_at) from recipes")
+            .fetchone()
+        )
+        return f"{count}-{updated_at}"
+
+    def get_recipe(self, recipe_id):
+        row = self._connect().execute(
+            "select * from recipes where recipe_id = ?", (recipe_id,)
+        ).fetchone()
+        return _from_row(row, RECIPE_COLUMNS) if row else None
+
+    def has_recipe(self, recipe_id):
+        row = self._connect().execute(
+            "select 1 from recipes where recipe_id = ?", (recipe_id,)
+        ).fetchone()
+        return row is not None
+
+    def _upsert_recipe(self, conn, recipe):
+        row = _to_row(recipe, RECIPE_COLUMNS)
+        row.setdefault("name", "")
+        now = _now()
+        columns = list(row)
+        conn.execute(
+            f"insert into recipes ({', '.join(columns)}, created_at, updated_at) "
+            f"values ({', '.join('?' for _ in columns)}, ?, ?) "
+            "on conflict(recipe_id) do update set "
+            + ", ".join(f"{col} = excluded.{col}" for col in RECIPE_COLUMNS)
+            + ", extra = excluded.extra, updated_at = excluded.updated_at",
+            [row.get(col) for col in columns] + [now, now],
+        )
+
+    def add_recipe(self, recipe):
+        with self._transaction() as conn:
+            self._upsert_recipe(conn, recipe)
+            self._bump(conn, "recipes")
+
+    def update_recipe(self, recipe_id, recipe):
+        with self._transaction() as conn:
+            exists = conn.execute(
+                "select 1 from recipes where recipe_id = ?", (recipe_id,)
+            ).fetchone()
+            if not exists:
+                return False
+            if recipe.get("recipe_id") != recipe_id:
+                conn.execute("delete from recipes where recipe_id = ?", (recipe_id,))
+            self._upsert_recipe(conn, recipe)
+            self._bump(conn, "recipes")
+        return True
+
+    def load_recipe_source(self, recipe_id):
+        row = self._connect().execute(
+            "select * from recipe_sources where recipe_id = ?", (recipe_id,)
+        ).fetchone()
+        return _from_row(row, SOURCE_COLUMNS) if row else None
+
+    def load_recipe_sources(self):
+        rows = self._connect().execute("select * from recipe_sources order by rowid")
+        return [_from_row(row, SOURCE_COLUMNS) for row in rows]
+
+    def _upsert_recipe_source(self, conn, source):
+        row = _to_row(source, SOURCE_COLUMNS)
+        row.setdefault("source", "")
+        now = _now()
+        columns = list(row)
+        conn.execute(
+            f"insert into recipe_sources ({', '.join(columns)}, created_at, updated_at) "
+            f"values ({', '.join('?' for _ in columns)}, ?, ?) "
+            "on conflict(recipe_id) do update set "
+            + ", ".join(f"{col} = excluded.{col}" for col in SOURCE_COLUMNS)
+            + ", extra = excluded.extra, updated_at = excluded.updated_at",
+            [row.get(col) for col in columns] + [now, now],
+        )
+
+    def save_recipe_source(self, source):
+        with self._transaction() as conn:
+            self._upsert_recipe_source(conn, source)
+            self._bump(conn, "recipe_sources")
+
+    def find_recipe_source(self, key, key_of):
+        # Only the URL is stored, so the caller's key function decides which
+        # links point at the same video.
+        rows = self._connect().execute(
+            "select recipe_id, source_url from recipe_sources where source_url is not null"
+        )
+        for row in rows.fetchall():
+            if key_of(row["source_url"]) == key:
+                return self.load_recipe_source(row["recipe_id"])
+        return None
+
+    def load_plan(self):
+        meta = self._get_config_value(PLAN_KEY)
+        if meta is None:
+            return None
+        dates = meta.pop("dates", [])
+        rows = self._connect().execute(
+            f"select date, meals from daily_plans where date in "
+            f"({', '.join('?' for _ in dates)})",
+            dates,
+        )
+        meals_by_date = {row["date"]: json_codec.loads(row["meals"]) for row in rows}
+        meta["days"] = [
+            {"date": day, "meals": meals_by_date.get(day, {})} for day in dates
+        ]
+        return meta
+
+    def _save_plan(self, conn, plan):
+        meta = {key: value for key, value in plan.items() if key != "days"}
+        days = plan.get("days", [])
+        meta["dates"] = [day.get("date") for day in days]
+        self._put_config_value(conn, PLAN_KEY, meta)
+        existing = {
+            row["date"]: row["meals"]
+            for row in conn.execute(
+                f"select date, meals from daily_plans where date in "
+                f"({', '.join('?' for _ in days)})",
+                meta["dates"],
+            )
+        }
+        now = _now()
+        for day in days:
+            meals = _dumps(day.get("meals", {}))
+            if existing.get(day.get("date")) == meals:
+                continue
+            conn.execute(
+                "insert into daily_plans (date, meals, created_at, updated_at) "
+                "values (?, ?, ?, ?) on conflict(date) do update set "
+                "meals = excluded.meals, updated_at = excluded.updated_at",
+                (day.get("date"), meals, now, now),
+            )
+
+    def save_plan(self, plan):
+        with self._transaction() as conn:
+            self._save_plan(conn, plan)
+            self._bump(conn, "plan")
+
+    def load_history(self, limit=None, start_date=None):
+        query = "select generated_at, plan from plan_history"
+        params = []
+        if start_date:
+            query += " where start_date = ?"
+            params.append(start_date)
+        query += " order by id desc"
+        if limit is not None:
+            query += " limit ?"
+            params.append(max(limit, 0))
+        rows = self._connect().execute(query, params).fetchall()
+        return [
+            {"generated_at": row["generated_at"], "plan": json_codec.loads(row["plan"])}
+            for row in reversed(rows)
+        ]
+
+    def _append_history(self, conn, entry):
+        plan = entry.get("plan") or {}
+        conn.execute(
+            "insert into plan_history (generated_at, start_date, plan) values (?, ?, ?)",
+            (entry.get("generated_at"), plan.get("start_date"), _dumps(plan)),
+        )
+
+    def append_history(self, entry):
+        self.append_history_entries([entry])
+
+    def append_history_entries(self, entries):
+        with self._transaction() as conn:
+            for entry in entries:
+                self._append_history(conn, entry)
+            self._bump(conn, "history")
+
+    def _load_keyed(self, table, key_column):
+        rows = self._connect().execute(f"select {key_column}, data from {table}")
+        return {row[key_column]: json_codec.loads(row["data"]) for row in rows}
+
+    def _save_keyed(self, conn, table, key_column, payload):
+        # Only rows whose JSON actually changed are written; keys that vanished
+        # from the payload are deleted.
+        existing = {
+            row[key_column]: row["data"]
+            for row in conn.execute(f"select {key_column}, data from {table}")
+        }
+        now = _now()
+        for key, value in payload.items():
+            data = _dumps(value)
+            if existing.get(key) == data:
+                continue
+            conn.execute(
+                f"insert into {table} ({key_column}, data, updated_at) values (?, ?, ?) "
+                f"on conflict({key_column}) do update set data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                (key, data, now),
+            )
+        removed = [key for key in existing if key not in payload]
+        conn.executemany(
+            f"delete from {table} where {key_column} = ?", [(key,) for key in removed]
+        )
+
+    def load_shopping_state(self):
+        return self._load_keyed("shopping_state", "key")
+
+    def save_shopping_state(self, state):
+        with self._transaction() as conn:
+            self._save_keyed(conn, "shopping_state", "key", state)
+            self._bump(conn, "shopping")
+
+    def _bump(self, conn, *names):
+        # Same rule as planner._next_version, inside the writing transaction.
+        floor = time.time_ns() // 1_000_000
+        conn.executemany(
+            "insert into store_versions (name, version) values (?, ?) "
+            "on conflict(name) do update set version = max(version + 1, excluded.version)",
+            [(name, floor) for name in names],
+        )
+
+    def load_versions(self):
+        rows = self._connect().execute("select name, version from store_versions")
+        return {row["name"]: row["version"] for row in rows}
+
+    def bump_version(self, *names):
+        with self._transaction() as conn:
+            self._bump(conn, *names)
+
+    def get_youtube_entry(self, key):
+        row = self._connect().execute(
+            "select data from youtube_entries where key = ?", (key,)
+        ).fetchone()
+        return json_codec.loads(row["data"]) if row else None
+
+    def put_youtube_entry(self, key, entry):
+        with self._transaction() as conn:
+            conn.execute(
+                "insert into youtube_entries (key, data, accessed_at) values (?, ?, ?) "
+                "on conflict(key) do update set data = excluded.data, "
+                "accessed_at = excluded.accessed_at",
+                (key, _dumps(entry), time.time()),
+            )
+
+    def touch_youtube_entry(self, key):
+        with self._transaction() as conn:
+            conn.execute(
+                "update youtube_entries set accessed_at = ? where key = ?",
+                (time.time(), key),
+            )
+
+    def delete_youtube_entries(self, keys):
+        with self._transaction() as conn:
+            conn.executemany(
+                "delete from youtube_entries where key = ?", [(key,) for key in keys]
+            )
+
+    def list_youtube_entries(self):
+        rows = self._connect().execute("select key, accessed_at from youtube_entries")
+        return [(row["key"], row["accessed_at"]) for row in rows]
+
+    def _has_legacy_youtube_cache(self):
+        row = self._connect().execute(
+            "select 1 from sqlite_master where type = 'table' and name = 'youtube_cache'"
+        ).fetchone()
+        return row is not None
+
+    def load_legacy_youtube_cache(self):
+        # Databases created before keyed entries kept one url -> recipe table.
+        if not self._has_legacy_youtube_cache():
+            return None
+        return self._load_keyed("youtube_cache", "url")
+
+    def drop_legacy_youtube_cache(self):
+        with self._transaction() as conn:
+            conn.execute("drop table if exists youtube_cache")
+
+    def get_llm_entry(self, key):
+        row = self._connect().execute(
+            "select data from llm_entries where key = ?", (key,)
+        ).fetchone()
+        return json_codec.loads(row["data"]) if row else None
+
+    def put_llm_entry(self, key, entry):
+        with self._transaction() as conn:
+            conn.execute(
+                "insert into llm_entries (key, data, accessed_at) values (?, ?, ?) "
+                "on conflict(key) do update set data = excluded.data, "
+                "accessed_at = excluded.accessed_at",
+                (key, _dumps(entry), time.time()),
+            )
+
+    def touch_llm_entry(self, key):
+        with self._transaction() as conn:
+            conn.execute(
+                "update llm_entries set accessed_at = ? where key = ?", (time.time(), key)
+            )
+
+    def delete_llm_entries(self, keys):
+        with self._transaction() as conn:
+            conn.executemany("delete from llm_entries where key = ?", [(key,) for key in keys])
+
+    def list_llm_entries(self):
+        rows = self._connect().execute("select key, accessed_at from llm_entries")
+        return [(row["key"], row["accessed_at"]) for row in rows]
+
+    def load_document(self, name, default=None):
+        row = self._connect().execute(
+            "select data from documents where name = ?", (name,)
+        ).fetchone()
+        return json_codec.loads(row["data"]) if row else default
+
+    def save_document(self, name, payload):
+        with self._transaction() as conn:
+            conn.execute(
+                "insert into documents (name, data, updated_at) values (?, ?, ?) "
+                "on conflict(name) do update set data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                (name, _dumps(payload), _now()),
+            )
+            if name in IMPORTED_DOCUMENTS:
+                self._bump(conn, name)
+
+    def delete_document(self, name):
+        with self._transaction() as conn:
+            conn.execute("delete from documents where name = ?", (name,))
+            if name in IMPORTED_DOCUMENTS:
+                self._bump(conn, name)
+
+    def import_from(self, source):
+        config = source.load_config(None)
+        recipes = []
+        seen = set()
+        for recipe in source.load_recipes():
+            if recipe.get("recipe_id") in seen:
+                continue
+            seen.add(recipe.get("recipe_id"))
+            recipes.append(as_dict(recipe))
+        sources = [item for item in source.load_recipe_sources() if item.get("recipe_id")]
+        plan = source.load_plan()
+        history = source.load_history() or []
+        counts = {
+            "recipes": len(recipes),
+            "recipe_sources": len(sources),
+            "history": len(history),
+        }
+        with self._transaction() as conn:
+            if config is not None:
+                self._put_config_value(conn, CONFIG_KEY, config)
+            for recipe in recipes:
+                self._upsert_recipe(conn, recipe)
+            for item in sources:
+                self._upsert_recipe_source(conn, item)
+            if plan:
+                self._save_plan(conn, plan)
+            conn.execute("delete from plan_history")
+            for entry in history:
+                self._append_history(conn, entry)
+            self._save_keyed(
+                conn, "shopping_state", "key", source.load_shopping_state() or {}
+            )
+            for key, accessed_at in source.list_youtube_entries():
+                entry = source.get_youtube_entry(key)
+                if entry is not None:
+                    conn.execute(
+                        "insert or replace into youtube_entries (key, data, accessed_at) "
+                        "values (?, ?, ?)",
+                        (key, _dumps(entry), accessed_at),
+                    )
+            for key, accessed_at in source.list_llm_entries():
+                entry = source.get_llm_entry(key)
+                if entry is not None:
+                    conn.execute(
+                        "insert or replace into llm_entries (key, data, accessed_at) "
+                        "values (?, ?, ?)",
+                        (key, _dumps(entry), accessed_at),
+                    )
+            self._bump(conn, "config", "recipes", "recipe_sources", "plan", "history", "shopping")
+        for name in IMPORTED_DOCUMENTS:
+            payload = source.load_document(name, None)
+            if payload is not None:
+                self.save_document(name, payload)
+        return counts
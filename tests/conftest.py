@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(REPO_DIR / "scripts"))
+
+import planner  # noqa: E402
+
+STEW = {"recipe_id": "stew", "name": "Stew", "servings": 2, "meal_types": ["dinner"]}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    # Every planner data path points into an empty tree, on the JSON backend,
+    # with the process-wide caches dropped before and after.
+    original = planner.DATA_DIR
+    for name, value in list(vars(planner).items()):
+        if name.isupper() and isinstance(value, Path):
+            if value == original or original in value.parents:
+                monkeypatch.setattr(planner, name, tmp_path / value.relative_to(original))
+    monkeypatch.setenv("PLANNER_STORAGE", "json")
+    planner.set_storage(None)
+    planner.reload_ingredient_dictionary()
+    yield tmp_path
+    planner.set_storage(None)
+    planner.reload_ingredient_dictionary()
+
+
+@pytest.fixture
+def client(data_dir):
+    # The Flask test client over a catalog holding only STEW, with an empty
+    # fragment cache.
+    from app import app, fragments
+
+    write_json(data_dir / "recipes" / "stew.json", STEW)
+    fragments.clear()
+    return app.test_client()
+
+
+def write_json(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def age(directory):
+    # As if the tree was last touched a minute ago, so a change made now moves
+    # the directory mtime even where timestamps are coarse.
+    past = time.time_ns() - 60 * 10**9
+    os.utime(directory, ns=(past, past))
+
+
+def replace_json(path, payload):
+    # How editors (and planner) save: a temp file renamed over the original,
+    # which moves the directory mtime. Age the directory before the reads being
+    # compared so the move shows.
+    tmp = path.with_name(f".{path.name}.tmp")
+    write_json(tmp, payload)
+    os.replace(tmp, path)
+
+
+def edit_in_place(path, payload):
+    # Overwrite the file itself: its own stamp changes, the directory's does not.
+    directory = os.stat(path.parent)
+    write_json(path, payload)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    os.utime(path.parent, ns=(directory.st_atime_ns, directory.st_mtime_ns))
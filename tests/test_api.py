@@ -0,0 +1,64 @@
+import json
+
+import planner
+from conftest import STEW, write_json
+
+
+def _json(response):
+    assert response.mimetype == "application/json"
+    return json.loads(response.data)
+
+
+def test_recipe_lists_are_paged_summaries(client, data_dir):
+    write_json(data_dir / "recipes" / "oats.json", dict(STEW, recipe_id="oats", name="Oats"))
+
+    first = _json(client.get("/api/recipes?limit=1"))
+    second = _json(client.get(f"/api/recipes?limit=1&after={first['next']}"))
+
+    assert first == {
+        "recipes": [
+            {"recipe_id": "oats", "name": "Oats", "meal_types": ["dinner"], "thumbnail_url": None}
+        ],
+        "next": "oats",
+    }
+    assert [recipe["recipe_id"] for recipe in second["recipes"]] == ["stew"]
+    assert second["next"] is None
+
+
+def test_search_returns_summaries(client):
+    body = _json(client.get("/api/recipes?q=ste"))
+
+    assert [recipe["recipe_id"] for recipe in body["recipes"]] == ["stew"]
+    assert set(body["recipes"][0]) == {"recipe_id", "name", "meal_types", "thumbnail_url"}
+
+
+def test_detail_returns_the_full_record(client):
+    body = _json(client.get("/api/recipes/stew"))
+
+    assert body["servings"] == 2
+    assert body["ingredients"] == []
+    assert _json(client.get("/api/recipes/missing")) == {"error": "Recipe not found."}
+    assert client.get("/api/recipes/missing").status_code == 404
+
+
+def test_plan_shopping_list_and_history(client):
+    assert client.get("/api/plan").status_code == 404
+    plan = planner.initialize_weekly_plan("2025-01-06")
+    planner.assign_meal(plan, "2025-01-06", "dinner", planner.get_recipe_by_id("stew"))
+    planner.save_weekly_plan(plan)
+    planner.append_plan_history(plan)
+
+    assert _json(client.get("/api/plan")) == planner.load_weekly_plan()
+    shopping = _json(client.get("/api/shopping-list?lang=en"))
+    assert shopping["lang"] == "en"
+    assert set(shopping) == {"lang", "weekly", "shopping"}
+    history = _json(client.get("/api/history?start_date=2025-01-06"))["history"]
+    assert [entry["plan"]["start_date"] for entry in history] == ["2025-01-06"]
+
+
+def test_api_responses_revalidate(client):
+    first = client.get("/api/recipes")
+
+    again = client.get("/api/recipes", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304
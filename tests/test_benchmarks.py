@@ -0,0 +1,40 @@
+import planner
+from benchmarks import compare, synthetic
+
+
+def test_datasets_are_deterministic_per_seed():
+    first = synthetic.make_dataset(recipes=30, weeks=4, shopping_items=20, seed=3)
+
+    assert first == synthetic.make_dataset(recipes=30, weeks=4, shopping_items=20, seed=3)
+    assert first != synthetic.make_dataset(recipes=30, weeks=4, shopping_items=20, seed=4)
+    assert len(first["recipes"]) == 30
+    assert len(first["history"]) == 4
+
+
+def test_written_tree_loads_through_planner(data_dir):
+    dataset = synthetic.make_dataset(recipes=30, weeks=4, shopping_items=20, seed=1)
+
+    synthetic.write_json_tree(data_dir, dataset)
+
+    assert len(planner.load_recipes()) == 30
+    assert planner.load_weekly_plan() == dataset["plan"]
+    assert len(planner.get_storage().load_history()) == 4
+    assert planner.compute_shopping_list(dataset["plan"])
+
+
+def _results(**medians):
+    return {"results": {"small": {name: {"median_ms": ms} for name, ms in medians.items()}}}
+
+
+def test_regressions_need_both_the_relative_and_the_absolute_slowdown():
+    baseline = _results(fast=0.2, slow=10.0, steady=10.0)
+    current = _results(fast=0.6, slow=20.0, steady=11.0, new=5.0)
+
+    rows = {row["scenario"]: row for row in compare.compare(baseline, current)}
+
+    assert set(rows) == {"fast", "slow", "steady"}
+    # Three times slower, but by less than the 1 ms floor.
+    assert not rows["fast"]["regressed"]
+    assert rows["slow"]["regressed"]
+    assert not rows["steady"]["regressed"]
+    assert "REGRESSED" in compare.format_rows([rows["slow"]])
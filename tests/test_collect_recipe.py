@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+
+import pytest
+
+import collect_recipe
+import planner
+from sqlite_storage import SqliteStorage
+
+
+class FakeExtractor:
+    # Stands in for collect_youtube: records every call and fails a URL the
+    # number of times listed in `failures` (or always, for -1).
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        with self.lock:
+            self.calls.append((url, time.monotonic()))
+            remaining = self.failures.get(url, 0)
+            if remaining:
+                self.failures[url] = remaining - 1
+                raise RuntimeError(f"fetch failed: {url}")
+        return (f"Title {url}", "description", "top comment", "")
+
+    def urls(self):
+        return [url for url, _ in self.calls]
+
+
+@pytest.fixture
+def sources(data_dir):
+    return data_dir / "journal.jsonl"
+
+
+def _collect(urls, extractor, journal, **kwargs):
+    options = {"workers": 2, "rate": 0, "retries": 0, "backoff": 0, "journal_path": journal}
+    options.update(kwargs)
+    return collect_recipe.collect_batch(urls, extractor=extractor, **options)
+
+
+def _journal(path):
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def test_skips_videos_already_in_the_sources_index(sources):
+    collect_recipe.save_source(
+        "https://www.youtube.com/watch?v=known1", "youtube", ("Known", "", "", "")
+    )
+    extractor = FakeExtractor()
+
+    counts = _collect(
+        [
+            "https://youtu.be/known1",
+            "https://www.youtube.com/watch?v=fresh1",
+            "https://www.youtube.com/shorts/fresh1",
+        ],
+        extractor,
+        sources,
+    )
+
+    assert extractor.urls() == ["https://www.youtube.com/watch?v=fresh1"]
+    assert counts == {"saved": 1, "skipped": 2, "failed": 0}
+    assert planner.find_recipe_source("https://youtu.be/fresh1") is not None
+    statuses = {entry["url"]: entry["status"] for entry in _journal(sources)}
+    assert statuses == {
+        "https://youtu.be/known1": "skipped",
+        "https://www.youtube.com/watch?v=fresh1": "done",
+        "https://www.youtube.com/shorts/fresh1": "skipped",
+    }
+
+
+def test_the_journal_leaves_the_sources_version_alone(sources, data_dir):
+    assert "recipe_sources" not in collect_recipe.JOURNAL_FILE.parts
+    url = "https://www.youtube.com/watch?v=stamp1"
+    _collect([url], FakeExtractor(), sources)
+    version = planner.store_versions("recipe_sources")["recipe_sources"]
+
+    journal = data_dir / collect_recipe.JOURNAL_FILE.name
+    counts = _collect([url, "https://youtu.be/stamp1"], FakeExtractor(), journal)
+
+    assert counts == {"saved": 0, "skipped": 2, "failed": 0}
+    assert journal.exists()
+    assert planner.store_versions("recipe_sources")["recipe_sources"] == version
+
+
+def test_prompt_files_are_written_atomically(sources, monkeypatch):
+    writes = []
+    write_atomic = planner._write_atomic
+    monkeypatch.setattr(
+        planner, "_write_atomic", lambda path, data: writes.append(path) or write_atomic(path, data)
+    )
+
+    _, prompt_path = collect_recipe.save_source(
+        "https://www.youtube.com/watch?v=prompt1", "youtube", ("Prompt", "", "", "")
+    )
+
+    assert prompt_path in writes
+    assert "Title:\nPrompt" in prompt_path.read_text(encoding="utf-8")
+    assert not list(planner.RECIPE_SOURCES_DIR.glob(".*.tmp"))
+
+
+def test_spaces_requests_to_the_same_host(sources):
+    interval = 0.05
+    extractor = FakeExtractor()
+    same_host = [f"https://www.youtube.com/watch?v=host{idx}" for idx in range(3)]
+
+    counts = _collect(
+        same_host + ["https://vimeo.com/12345"], extractor, sources, workers=4, rate=interval
+    )
+
+    assert counts["saved"] == 4
+    youtube_calls = sorted(at for url, at in extractor.calls if "youtube" in url)
+    gaps = [later - earlier for earlier, later in zip(youtube_calls, youtube_calls[1:])]
+    assert len(gaps) == 2
+    assert min(gaps) >= interval * 0.9
+    # Another host does not queue behind youtube.com.
+    vimeo_at = next(at for url, at in extractor.calls if "vimeo" in url)
+    assert vimeo_at - youtube_calls[0] < interval
+
+
+def test_retries_then_gives_up(sources):
+    flaky = "https://www.youtube.com/watch?v=flaky1"
+    broken = "https://www.youtube.com/watch?v=broken1"
+    extractor = FakeExtractor({flaky: 1, broken: -1})
+
+    counts = _collect([flaky, broken], extractor, sources, retries=2)
+
+    assert counts == {"saved": 1, "skipped": 0, "failed": 1}
+    assert extractor.urls().count(flaky) == 2
+    assert extractor.urls().count(broken) == 3
+    entries = {entry["url"]: entry for entry in _journal(sources)}
+    assert entries[flaky]["status"] == "done"
+    assert entries[broken]["status"] == "failed"
+    assert "fetch failed" in entries[broken]["error"]
+    assert planner.find_recipe_source(broken) is None
+
+
+def test_resumes_from_the_journal(sources):
+    done = "https://www.youtube.com/watch?v=done1"
+    failed = "https://www.youtube.com/watch?v=failed1"
+    _collect([done, failed], FakeExtractor({failed: -1}), sources)
+    # An interrupted run can leave a torn last line behind.
+    with sources.open("a", encoding="utf-8") as f:
+        f.write('{"url": "https://www.youtube.com/watch?v=torn')
+
+    extractor = FakeExtractor()
+    counts = _collect([done, failed], extractor, sources)
+
+    assert extractor.urls() == [failed]
+    assert counts == {"saved": 1, "skipped": 1, "failed": 0}
+    statuses = [entry["status"] for entry in _journal(sources) if entry["url"] == failed]
+    assert statuses == ["failed", "done"]
+
+
+def test_force_ignores_the_journal_and_the_index(sources):
+    url = "https://www.youtube.com/watch?v=again1"
+    _collect([url], FakeExtractor(), sources)
+    extractor = FakeExtractor()
+
+    counts = _collect([url], extractor, sources, force=True)
+
+    assert extractor.urls() == [url]
+    assert counts == {"saved": 1, "skipped": 0, "failed": 0}
+
+
+def test_sources_go_through_the_sqlite_backend(sources, data_dir):
+    planner.set_storage(SqliteStorage(data_dir / "planner.db"))
+    recipe_id, _ = collect_recipe.save_source(
+        "https://www.youtube.com/watch?v=db1", "youtube", ("In the db", "", "", "")
+    )
+    extractor = FakeExtractor()
+
+    counts = _collect(["https://youtu.be/db1"], extractor, sources)
+
+    assert planner.load_recipe_source(recipe_id)["title"] == "In the db"
+    assert not list(planner.RECIPE_SOURCES_DIR.glob("*_source.json"))
+    assert extractor.urls() == []
+    assert counts == {"saved": 0, "skipped": 1, "failed": 0}
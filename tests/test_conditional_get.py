@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+
+import pytest
+
+import add_parsed_recipe
+import clean_recipes
+import planner
+from conftest import STEW, age, replace_json, write_json
+
+
+def _revalidate(client, url="/recipes"):
+    first = client.get(url)
+    assert first.status_code == 200
+    return lambda: client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+
+def test_unchanged_recipes_answer_304(client):
+    assert _revalidate(client)().status_code == 304
+
+
+def test_recipe_file_added_outside_planner_changes_the_etag(client, data_dir):
+    again = _revalidate(client)
+    write_json(data_dir / "recipes" / "soup.json", {"recipe_id": "soup", "name": "Soup"})
+
+    response = again()
+
+    assert response.status_code == 200
+    assert b"Soup" in response.data
+
+
+def test_recipe_file_replaced_outside_planner_changes_the_etag(client, data_dir):
+    age(data_dir / "recipes")
+    again = _revalidate(client)
+    replace_json(data_dir / "recipes" / "stew.json", dict(STEW, name="Beef stew"))
+
+    response = again()
+
+    assert response.status_code == 200
+    assert b"Beef stew" in response.data
+
+
+def test_source_file_added_outside_planner_changes_the_etag(client, data_dir):
+    sources_dir = data_dir / "recipe_sources"
+    sources_dir.mkdir()
+    age(sources_dir)
+    again = _revalidate(client, "/recipes/stew")
+    write_json(sources_dir / "stew_source.json", {"recipe_id": "stew", "source": "youtube"})
+
+    assert again().status_code == 200
+
+
+def test_add_parsed_recipe_writes_through_planner(client, data_dir, monkeypatch):
+    again = _revalidate(client)
+    source = data_dir / "parsed.json"
+    write_json(source, {"name": "Kimchi fried rice", "meal_types": ["lunch"], "ingredients": []})
+    monkeypatch.setattr(sys, "argv", ["add_parsed_recipe.py", str(source)])
+
+    add_parsed_recipe.main()
+
+    assert again().status_code == 200
+    assert planner.get_recipe_by_id("kimchi-fried-rice")["name"] == "Kimchi fried rice"
+
+
+def test_clean_recipes_writes_through_planner(client, data_dir):
+    write_json(
+        data_dir / "recipes" / "stew.json",
+        {"recipe_id": "stew", "name": "Stew", "meal_type": "dinner", "ingredients": [{"name": "Garlic"}]},
+    )
+    before = planner.store_versions("recipes")["recipes"]
+
+    clean_recipes.main()
+
+    stored = json.loads((data_dir / "recipes" / "stew.json").read_text(encoding="utf-8"))
+    assert stored["meal_types"] == ["dinner"]
+    assert stored["ingredients"] == [{"name": "Garlic", "quantity": 0, "unit": ""}]
+    assert planner.store_versions("recipes")["recipes"] != before
+
+
+def test_clean_recipes_leaves_clean_files_alone(client, data_dir, monkeypatch):
+    clean_recipes.main()
+    refreshes = []
+    monkeypatch.setattr(planner, "_update_shopping_aggregate", lambda: refreshes.append(1))
+    for recipe_id in ("soup", "rice"):
+        write_json(
+            data_dir / "recipes" / f"{recipe_id}.json",
+            {"recipe_id": recipe_id, "name": recipe_id.title(), "meal_type": "lunch"},
+        )
+    stew = data_dir / "recipes" / "stew.json"
+    stamp = os.stat(stew).st_mtime_ns
+
+    assert sorted(planner.clean_recipe_files()) == ["rice", "soup"]
+    assert os.stat(stew).st_mtime_ns == stamp
+    assert refreshes == [1]
+    assert planner.clean_recipe_files() == []
+
+
+def test_catalog_records_are_read_only(client):
+    recipe = planner.load_recipes()[0]
+
+    with pytest.raises(TypeError, match="as_dict"):
+        recipe["name"] = "Changed"
@@ -0,0 +1,47 @@
+import json
+
+import planner
+
+
+def _entry(start_date):
+    return {"generated_at": f"{start_date}T08:00:00", "plan": {"start_date": start_date, "days": []}}
+
+
+def _start_dates(entries):
+    return [entry["plan"]["start_date"] for entry in entries]
+
+
+def _write_legacy(data_dir, *start_dates):
+    history = [_entry(start_date) for start_date in start_dates]
+    (data_dir / "weekly_plans.json").write_text(json.dumps(history), encoding="utf-8")
+
+
+def test_first_append_converts_and_moves_legacy_history_aside(data_dir):
+    _write_legacy(data_dir, "2024-01-01")
+
+    planner.get_storage().append_history_entries([_entry("2025-01-06")])
+
+    assert _start_dates(planner.get_storage().load_history()) == ["2024-01-01", "2025-01-06"]
+    assert not (data_dir / "weekly_plans.json").exists()
+    assert (data_dir / "weekly_plans.json.migrated").exists()
+
+
+def test_convert_after_appends_keeps_the_log(data_dir):
+    _write_legacy(data_dir, "2024-01-01")
+    storage = planner.get_storage()
+    storage.append_history_entries([_entry("2025-01-06")])
+    storage.append_history_entries([_entry("2025-01-13")])
+    # A legacy file reappearing (restored from a backup, an older checkout)
+    # must not replace the log.
+    _write_legacy(data_dir, "2024-01-01")
+
+    assert planner.convert_plan_history() is None
+    assert _start_dates(storage.load_history()) == ["2024-01-01", "2025-01-06", "2025-01-13"]
+
+
+def test_convert_plan_history(data_dir):
+    _write_legacy(data_dir, "2024-01-01", "2024-01-08")
+
+    assert planner.convert_plan_history() == 2
+    assert planner.convert_plan_history() is None
+    assert _start_dates(planner.get_storage().load_history()) == ["2024-01-01", "2024-01-08"]
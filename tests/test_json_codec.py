@@ -0,0 +1,70 @@
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+import json_codec
+from recipe_model import Recipe
+
+CODECS = json_codec.available_codecs()
+PAYLOAD = {
+    "name": "김치찌개",
+    "servings": 4,
+    "quantity": 0.25,
+    "locked": False,
+    "notes": None,
+    "ingredients": [{"name": "Kimchi", "quantity": 1, "unit": "cup"}],
+}
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("name", CODECS)
+def test_round_trip_through_every_codec(name, pretty):
+    dumps, _ = json_codec.get_codec(name)
+    data = dumps(PAYLOAD, pretty=pretty)
+
+    assert "김치찌개".encode("utf-8") in data
+    for other in CODECS:
+        assert json_codec.get_codec(other)[1](data) == PAYLOAD
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_pretty_output_matches_the_stdlib_layout(name):
+    dumps, _ = json_codec.get_codec(name)
+
+    assert dumps(PAYLOAD, pretty=True) == json_codec.get_codec("json")[0](PAYLOAD, pretty=True)
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_supported_extra_types(name):
+    dumps, loads = json_codec.get_codec(name)
+    value = {
+        "recipe": Recipe({"recipe_id": "stew", "name": "Stew"}),
+        "day": date(2025, 1, 6),
+        "at": datetime(2025, 1, 6, 8, 30),
+        "tags": frozenset(["b", "a"]),
+        "pair": (1, 2),
+    }
+
+    decoded = loads(dumps(value))
+
+    assert decoded["recipe"]["name"] == "Stew"
+    assert decoded["day"] == "2025-01-06"
+    assert decoded["at"] == "2025-01-06T08:30:00"
+    assert sorted(decoded["tags"]) == ["a", "b"]
+    assert decoded["pair"] == [1, 2]
+
+
+@pytest.mark.parametrize("value", [Path("recipes"), 1j, object()])
+@pytest.mark.parametrize("name", CODECS)
+def test_unsupported_types_raise(name, value):
+    dumps, _ = json_codec.get_codec(name)
+
+    with pytest.raises(TypeError):
+        dumps({"value": value})
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_malformed_input_is_a_value_error(name):
+    with pytest.raises(ValueError):
+        json_codec.get_codec(name)[1](b'{"name": ')
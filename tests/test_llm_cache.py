@@ -0,0 +1,52 @@
+import pytest
+
+import planner
+from sqlite_storage import SqliteStorage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def requests_made(request, data_dir, monkeypatch):
+    if request.param == "sqlite":
+        planner.set_storage(SqliteStorage(data_dir / "planner.db"))
+    monkeypatch.delenv("OPENAI_MODEL", raising=False)
+    calls = []
+
+    def parse(model, text, title):
+        calls.append(text)
+        return {"name": title, "ingredients": []}
+
+    monkeypatch.setattr(planner, "_request_recipe_parse", parse)
+    return calls
+
+
+def test_same_text_is_parsed_once(requests_made):
+    first = planner._parse_recipe_with_openai("Kimchi, rice", "Fried rice")
+    # Another upload of the same video text: the cached recipe comes back.
+    again = planner._parse_recipe_with_openai("Kimchi, rice", "Fried rice (short)")
+
+    assert requests_made == ["Kimchi, rice"]
+    assert again == first
+
+
+def test_different_text_or_model_misses(requests_made, monkeypatch):
+    planner._parse_recipe_with_openai("Kimchi, rice", "Fried rice")
+    planner._parse_recipe_with_openai("Tofu, rice", "Tofu bowl")
+    monkeypatch.setenv("OPENAI_MODEL", "another-model")
+    planner._parse_recipe_with_openai("Kimchi, rice", "Fried rice")
+
+    assert requests_made == ["Kimchi, rice", "Tofu, rice", "Kimchi, rice"]
+
+
+def test_oldest_entries_are_evicted(requests_made, monkeypatch):
+    monkeypatch.setattr(planner, "LLM_CACHE_MAX_ENTRIES", 2)
+    for text in ("one", "two", "three"):
+        planner._parse_recipe_with_openai(text, text)
+
+    assert len(planner.get_storage().list_llm_entries()) == 2
+    planner._parse_recipe_with_openai("three", "three")
+    assert requests_made == ["one", "two", "three"]
+
+
+def test_empty_text_is_not_sent(requests_made):
+    assert planner._parse_recipe_with_openai("", "Nothing") is None
+    assert requests_made == []
@@ -0,0 +1,68 @@
+import pytest
+
+import app as app_module
+import instrumentation
+from instrumentation import Metrics, RequestStats, instrument
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = []
+    monkeypatch.setattr(instrumentation.time, "perf_counter", lambda: ticks.pop(0))
+    return ticks
+
+
+def test_sections_are_charged_self_time(clock):
+    inner = instrument("inner")(lambda: None)
+    outer = instrument("outer")(lambda: inner())
+    # begin, outer enter, inner enter, inner leave, outer leave, finish
+    clock.extend([0.0, 1.0, 2.0, 5.0, 6.0, 10.0])
+
+    instrumentation.begin_request()
+    outer()
+    stats = instrumentation.end_request()
+
+    assert stats.sections == {"inner": [1, 3.0], "outer": [1, 2.0]}
+    assert stats.duration == 10.0
+    assert stats.breakdown().endswith("other 5000.0 ms")
+
+
+def test_hooks_are_no_ops_outside_a_request():
+    instrumentation.record_read(100)
+
+    assert instrument("idle")(lambda: 42)() == 42
+    assert instrumentation.end_request() is None
+
+
+def test_render_is_cumulative_and_escapes_labels(clock):
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for duration in (0.05, 0.5, 5.0):
+        clock.append(0.0)
+        stats = RequestStats()
+        stats.duration = duration
+        stats.files_read = 1
+        metrics.observe('/a"b', "GET", 200, stats)
+
+    text = metrics.render()
+
+    labels = 'route="/a\\"b",method="GET"'
+    assert f'planner_requests_total{{{labels},status="200"}} 3' in text
+    assert f'planner_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'planner_request_duration_seconds_bucket{{{labels},le="1"}} 2' in text
+    assert f'planner_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"planner_request_files_read_total{{{labels}}} 3" in text
+
+
+def test_metrics_route_reports_url_rules(client, monkeypatch):
+    monkeypatch.setattr(app_module, "request_metrics", Metrics())
+    client.get("/recipes/stew")
+    client.get("/recipes/missing")
+    client.get("/metrics")
+
+    text = client.get("/metrics").data.decode()
+
+    route = 'route="/recipes/<recipe_id>",method="GET"'
+    assert f'planner_requests_total{{{route},status="200"}} 1' in text
+    assert "/recipes/stew" not in text
+    assert 'route="/metrics"' not in text
+    assert f'planner_request_section_calls_total{{{route},section="render_template"}}' in text
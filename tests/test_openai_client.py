@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+import openai_client
+
+requests = pytest.importorskip("requests")
+from requests.adapters import BaseAdapter  # noqa: E402
+
+COMPLETION = {"choices": [{"message": {"content": "{}"}}]}
+
+
+class ScriptedAdapter(BaseAdapter):
+    # Answers each request with the next (status, headers) in `script`; a
+    # ConnectionError in the script is raised instead.
+    def __init__(self, *script):
+        super().__init__()
+        self.script = list(script)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = json.dumps(COMPLETION if status == 200 else {"error": status}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(openai_client.time, "sleep", delays.append)
+    return delays
+
+
+def _client(adapter, max_retries=3):
+    client = openai_client.OpenAIClient("key", base_url="http://stub/v1", max_retries=max_retries)
+    client.session.mount("http://", adapter)
+    return client
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_rate_limits_and_server_errors(sleeps, status):
+    adapter = ScriptedAdapter((status, {}), (status, {}), (200, {}))
+    client = _client(adapter)
+
+    assert client.chat_completion({"model": "m"}) == COMPLETION
+    assert adapter.calls == 3
+    assert client.stats == {"requests": 3, "retries": 2}
+    assert len(sleeps) == 2
+    # Full jitter: never more than backoff * 2**attempt.
+    assert all(0 <= delay <= client.backoff * 2**attempt for attempt, delay in enumerate(sleeps))
+
+
+def test_connection_errors_are_retried(sleeps):
+    adapter = ScriptedAdapter(requests.ConnectionError("reset"), (200, {}))
+
+    assert _client(adapter).chat_completion({}) == COMPLETION
+    assert adapter.calls == 2
+
+
+def test_retry_after_sets_the_delay(sleeps):
+    adapter = ScriptedAdapter((429, {"Retry-After": "7"}), (503, {"Retry-After": "600"}), (200, {}))
+    client = _client(adapter)
+
+    client.chat_completion({})
+
+    # Capped at max_backoff.
+    assert sleeps == [7.0, client.max_backoff]
+
+
+def test_unparseable_retry_after_falls_back_to_backoff(sleeps):
+    adapter = ScriptedAdapter((429, {"Retry-After": "soon"}), (200, {}))
+    client = _client(adapter)
+
+    client.chat_completion({})
+
+    assert 0 <= sleeps[0] <= client.backoff
+
+
+@pytest.mark.parametrize("status", [400, 401, 409])
+def test_client_errors_are_not_retried(sleeps, status):
+    adapter = ScriptedAdapter((status, {}))
+    client = _client(adapter)
+
+    with pytest.raises(RuntimeError, match=str(status)):
+        client.chat_completion({})
+    assert adapter.calls == 1
+    assert sleeps == []
+    assert client.stats == {"requests": 1, "retries": 0}
+
+
+def test_gives_up_after_max_retries(sleeps):
+    adapter = ScriptedAdapter(*[(503, {})] * 3)
+
+    with pytest.raises(RuntimeError, match="503"):
+        _client(adapter, max_retries=2).chat_completion({})
+    assert adapter.calls == 3
+    assert len(sleeps) == 2
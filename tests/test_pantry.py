@@ -0,0 +1,69 @@
+import pytest
+
+import planner
+from conftest import write_json
+
+
+def _recipe(recipe_id, meal_type, *names):
+    return {
+        "recipe_id": recipe_id,
+        "name": recipe_id.title(),
+        "meal_types": [meal_type],
+        "ingredients": [{"name": name, "quantity": 1, "unit": ""} for name in names],
+    }
+
+
+RECIPES = [
+    _recipe("omelette", "breakfast", "Egg", "Butter"),
+    _recipe("fried-rice", "dinner", "Rice", "Egg", "Kimchi"),
+    _recipe("kimchi-stew", "dinner", "Kimchi", "Tofu", "Pork", "Onion"),
+    _recipe("rice", "lunch", "Rice"),
+]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def catalog(request, data_dir, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(planner, "np", None)
+    planner.save_ingredient_dictionary(
+        {"ingredients": [{"id": "egg", "en": "Egg", "ko": "달걀", "aliases": ["eggs", "계란"]}]}
+    )
+    for recipe in RECIPES:
+        write_json(data_dir / "recipes" / f"{recipe['recipe_id']}.json", recipe)
+
+
+def _ranked(results):
+    return [(result["recipe"]["recipe_id"], result["missing"]) for result in results]
+
+
+def test_fewest_missing_first_then_coverage(catalog):
+    results = planner.recipes_from_pantry(["eggs", "rice", "kimchi"])
+
+    assert _ranked(results) == [
+        ("fried-rice", []),
+        ("rice", []),
+        ("omelette", ["Butter"]),
+        ("kimchi-stew", ["Tofu", "Pork", "Onion"]),
+    ]
+    assert [result["coverage"] for result in results] == [1.0, 1.0, 0.5, 0.25]
+
+
+def test_aliases_in_either_language_match(catalog):
+    assert _ranked(planner.recipes_from_pantry(["계란", "버터"]))[0] == ("omelette", ["Butter"])
+
+
+def test_max_missing_and_meal_type_filters(catalog):
+    pantry = ["egg", "kimchi"]
+
+    # Both miss one; fried rice has the larger share covered.
+    assert _ranked(planner.recipes_from_pantry(pantry, max_missing=1)) == [
+        ("fried-rice", ["Rice"]),
+        ("omelette", ["Butter"]),
+    ]
+    assert _ranked(planner.recipes_from_pantry(pantry, meal_types=["dinner"], limit=1)) == [
+        ("fried-rice", ["Rice"]),
+    ]
+
+
+def test_unknown_ingredients_match_nothing(catalog):
+    assert planner.recipes_from_pantry(["saffron", " "]) == []
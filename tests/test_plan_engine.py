@@ -0,0 +1,78 @@
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+import planner
+
+
+def _recipe(recipe_id, *meal_types):
+    return {"recipe_id": recipe_id, "name": recipe_id.title(), "meal_types": list(meal_types)}
+
+
+def _plan(recipes, weeks=1, max_repeat=2, seed=1):
+    config = {"max_repeat_per_week": max_repeat}
+    return planner.generate_meal_plans(
+        date(2025, 1, 6), weeks, config=config, recipes=recipes, rng=random.Random(seed)
+    )
+
+
+def _names(plan, meal_type=None):
+    return [
+        meal["name"] if meal else None
+        for day in plan["days"]
+        for slot, meal in day["meals"].items()
+        if meal_type in (None, slot)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_recipe_exceeds_max_repeat_in_a_week(seed):
+    recipes = [_recipe(f"dinner{n}", "dinner") for n in range(3)]
+
+    (plan,) = _plan(recipes, seed=seed)
+
+    dinners = _names(plan, "dinner")
+    assert Counter(dinners) == {"Dinner0": 2, "Dinner1": 2, "Dinner2": 2, None: 1}
+
+
+def test_the_limit_spans_meal_types():
+    recipes = [_recipe("eggs", "breakfast", "lunch"), _recipe("toast", "breakfast")]
+
+    (plan,) = _plan(recipes, max_repeat=3)
+
+    names = Counter(name for name in _names(plan) if name)
+    assert names["Eggs"] == 3
+    assert names["Toast"] == 3
+
+
+def test_each_week_starts_with_a_fresh_budget():
+    recipes = [_recipe(f"dinner{n}", "dinner") for n in range(4)]
+
+    plans = _plan(recipes, weeks=3)
+
+    assert [plan["start_date"] for plan in plans] == ["2025-01-06", "2025-01-13", "2025-01-20"]
+    for plan in plans:
+        dinners = Counter(_names(plan, "dinner"))
+        assert None not in dinners
+        assert max(dinners.values()) <= 2
+
+
+def test_a_recipe_is_used_once_per_day():
+    (plan,) = _plan([_recipe("bowl", "breakfast", "lunch", "dinner")], max_repeat=21)
+
+    for day in plan["days"]:
+        assert [meal for meal in day["meals"].values() if meal] == [day["meals"]["breakfast"]]
+
+
+def test_zero_max_repeat_leaves_the_week_empty():
+    (plan,) = _plan([_recipe("stew", "dinner")], max_repeat=0)
+
+    assert set(_names(plan)) == {None}
+
+
+def test_a_seeded_rng_repeats_the_plan():
+    recipes = [_recipe(f"dish{n}", "lunch", "dinner") for n in range(6)]
+
+    assert _plan(recipes, weeks=2, seed=7) == _plan(recipes, weeks=2, seed=7)
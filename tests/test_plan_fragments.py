@@ -0,0 +1,36 @@
+import pytest
+
+import planner
+from app import fragments
+from conftest import STEW, age, replace_json, write_json
+
+
+@pytest.fixture
+def planned(client, data_dir):
+    write_json(data_dir / "recipes" / "oats.json", dict(STEW, recipe_id="oats", name="Oats"))
+    plan = planner.initialize_weekly_plan("2025-01-06")
+    planner.assign_meal(plan, "2025-01-06", "dinner", planner.get_recipe_by_id("stew"))
+    planner.assign_meal(plan, "2025-01-07", "dinner", planner.get_recipe_by_id("oats"))
+    planner.save_weekly_plan(plan)
+    return client
+
+
+def test_recipe_replaced_on_disk_rerenders_the_day_cards(planned, data_dir):
+    age(data_dir / "recipes")
+    assert b'data-servings="2"' in planned.get("/plan").data
+    replace_json(data_dir / "recipes" / "stew.json", dict(STEW, servings=6))
+
+    response = planned.get("/plan")
+
+    assert b'data-servings="6"' in response.data
+    assert b'data-servings="2"' in response.data
+
+
+def test_lock_toggle_rerenders_only_that_day(planned):
+    planned.get("/plan")
+    misses = fragments.stats["misses"]
+    planned.post("/plan/toggle-lock", data={"date": "2025-01-07", "meal_type": "dinner"})
+
+    planned.get("/plan")
+
+    assert fragments.stats["misses"] == misses + 1
@@ -0,0 +1,36 @@
+import contextlib
+
+import pytest
+
+import app as app_module
+import planner
+
+
+@pytest.fixture
+def locks(client, monkeypatch):
+    taken = []
+    real = app_module.locked
+
+    @contextlib.contextmanager
+    def recording(name):
+        taken.append(name)
+        with real(name):
+            yield
+
+    monkeypatch.setattr(app_module, "locked", recording)
+    return taken
+
+
+@pytest.mark.parametrize("url", ["/plan", "/plan/select?date=2025-01-06&meal=dinner"])
+def test_reading_an_existing_plan_takes_no_plan_lock(locks, url, client):
+    planner.save_weekly_plan(planner.initialize_weekly_plan("2025-01-06"))
+
+    assert client.get(url).status_code == 200
+    assert "plan" not in locks
+
+
+@pytest.mark.parametrize("url", ["/plan", "/plan/select?date=2025-01-06&meal=dinner"])
+def test_first_plan_is_written_under_the_lock(locks, url, client):
+    assert client.get(url).status_code == 200
+    assert locks == ["plan"]
+    assert planner.load_weekly_plan() is not None
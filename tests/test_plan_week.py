@@ -0,0 +1,48 @@
+import sys
+
+import pytest
+
+import json_codec
+import plan_week
+import planner
+from conftest import write_json
+
+
+@pytest.fixture
+def catalog(data_dir):
+    for meal_type in planner.MEAL_TYPES:
+        for n in range(4):
+            recipe_id = f"{meal_type}-{n}"
+            write_json(
+                data_dir / "recipes" / f"{recipe_id}.json",
+                {"recipe_id": recipe_id, "name": recipe_id, "meal_types": [meal_type]},
+            )
+    return data_dir
+
+
+def _run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["plan_week.py", *args])
+    plan_week.main()
+
+
+def test_batch_saves_the_first_week_as_the_current_plan(catalog, monkeypatch):
+    output = catalog / "batch.json"
+
+    _run(monkeypatch, "--start", "2025-01-06", "--weeks", "3", "--seed", "1", "--output", str(output))
+
+    batch = json_codec.loads(output.read_bytes())
+    assert [plan["start_date"] for plan in batch["default"]] == [
+        "2025-01-06",
+        "2025-01-13",
+        "2025-01-20",
+    ]
+    assert planner.load_weekly_plan() == batch["default"][0]
+    assert len(planner.get_storage().load_history()) == 3
+
+
+@pytest.mark.parametrize("weeks", ["0", "-1"])
+def test_weeks_must_be_positive(catalog, monkeypatch, weeks):
+    with pytest.raises(SystemExit):
+        _run(monkeypatch, "--weeks", weeks)
+
+    assert planner.load_weekly_plan() is None
@@ -0,0 +1,76 @@
+import pytest
+
+import planner
+from conftest import write_json
+
+MEALS = {
+    "apple-pie": ["dinner"],
+    "bibimbap": ["lunch", "dinner"],
+    "congee": ["breakfast"],
+    "dumplings": ["lunch"],
+    "eggs": ["breakfast", "lunch"],
+    "fried-rice": ["dinner"],
+}
+
+
+@pytest.fixture
+def catalog(data_dir):
+    for recipe_id, meal_types in MEALS.items():
+        write_json(
+            data_dir / "recipes" / f"{recipe_id}.json",
+            {"recipe_id": recipe_id, "name": recipe_id.title(), "meal_types": meal_types},
+        )
+    return data_dir
+
+
+def _walk(limit, **options):
+    pages = []
+    after = None
+    while True:
+        page = planner.recipe_page(after=after, limit=limit, **options)
+        pages.append([recipe["recipe_id"] for recipe in page["recipes"]])
+        after = page["next"]
+        if after is None:
+            return pages
+
+
+def test_cursor_walks_the_catalog_in_id_order(catalog):
+    assert _walk(4) == [list(MEALS)[:4], list(MEALS)[4:]]
+    assert _walk(3) == [list(MEALS)[:3], list(MEALS)[3:]]
+
+
+def test_meal_type_pages_list_each_recipe_once(catalog):
+    pages = _walk(2, meal_types=["lunch", "dinner"])
+
+    assert pages == [["apple-pie", "bibimbap"], ["dumplings", "eggs"], ["fried-rice"]]
+
+
+def test_excluded_ids_do_not_count_towards_the_page(catalog):
+    page = planner.recipe_page(meal_types=["lunch"], exclude={"bibimbap"}, limit=2)
+
+    assert [recipe["recipe_id"] for recipe in page["recipes"]] == ["dumplings", "eggs"]
+    assert page["next"] is None
+
+
+def test_recipes_added_between_pages_keep_their_place(catalog):
+    first = planner.recipe_page(limit=2)
+    planner.add_recipe({"recipe_id": "aaa", "name": "Early", "meal_types": ["lunch"]})
+    planner.add_recipe({"recipe_id": "zzz", "name": "Late", "meal_types": ["lunch"]})
+
+    rest = planner.recipe_page(after=first["next"], limit=10)
+
+    ids = [recipe["recipe_id"] for recipe in rest["recipes"]]
+    assert ids == list(MEALS)[2:] + ["zzz"]
+
+
+def test_summary_pages_carry_only_the_list_fields(catalog):
+    page = planner.recipe_page(limit=1, summary=True)
+
+    assert page["recipes"] == [
+        {
+            "recipe_id": "apple-pie",
+            "name": "Apple-Pie",
+            "meal_types": ["dinner"],
+            "thumbnail_url": None,
+        }
+    ]
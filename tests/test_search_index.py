@@ -0,0 +1,88 @@
+import pytest
+
+from search_index import RecipeSearchIndex, tokenize
+
+RECIPES = [
+    {
+        "recipe_id": "toast",
+        "name": "The Toast",
+        "ingredients": [{"name": "Bread"}, {"name": "Butter"}],
+        "instructions": ["Toast the bread."],
+    },
+    {
+        "recipe_id": "soup",
+        "name": "Tomato soup",
+        "ingredients": [{"name": "Tomato"}, {"name": "Onion"}],
+        "instructions": ["Simmer, then blend with butter."],
+    },
+    {
+        "recipe_id": "jjigae",
+        "name": "Kimchi stew",
+        "name_original": "김치찌개",
+        "ingredients": [{"name": "Kimchi"}, {"name": "Tofu"}],
+        "ingredients_original": [{"name": "김치"}, {"name": "두부"}],
+    },
+    {
+        "recipe_id": "bread",
+        "name": "Garlic bread",
+        "ingredients": [{"name": "Bread"}, {"name": "Garlic"}],
+    },
+]
+
+
+@pytest.fixture
+def index():
+    index = RecipeSearchIndex()
+    index.rebuild(RECIPES)
+    return index
+
+
+def _ids(results):
+    return [recipe["recipe_id"] for recipe in results]
+
+
+def test_tokenize_drops_stopwords_and_splits_hangul_into_bigrams():
+    assert tokenize("Toast the bread") == ["toast", "bread"]
+    assert tokenize("김치찌개") == ["김치", "치찌", "찌개"]
+
+
+def test_name_matches_outrank_ingredient_and_instruction_matches(index):
+    # "bread" is the name of one recipe and only an ingredient of the other.
+    assert _ids(index.search("bread")) == ["bread", "toast"]
+    # "butter": an ingredient of the toast, only an instruction in the soup.
+    assert _ids(index.search("butter")) == ["toast", "soup"]
+
+
+def test_every_term_must_match(index):
+    assert _ids(index.search("garlic bread")) == ["bread"]
+    assert index.search("garlic tofu") == []
+
+
+def test_prefixes_match_at_a_discount(index):
+    assert _ids(index.search("tom")) == ["soup"]
+    # The exact term beats a longer word it is a prefix of.
+    index.add({"recipe_id": "tomatoes", "name": "Tomatoes"})
+    index.add({"recipe_id": "tom", "name": "Tom yum"})
+    assert _ids(index.search("tom"))[0] == "tom"
+
+
+def test_hangul_matches_on_any_part_of_a_compound(index):
+    assert _ids(index.search("찌개")) == ["jjigae"]
+    assert _ids(index.search("두부")) == ["jjigae"]
+
+
+@pytest.mark.parametrize("query", ["t", "to", "toa", "toas", "toast"])
+def test_results_narrow_while_typing_through_a_stopword(index, query):
+    assert "toast" in _ids(index.search(query))
+
+
+def test_trailing_stopword_without_a_completion_is_ignored(index):
+    assert _ids(index.search("toast the")) == ["toast"]
+    assert index.search("the") == []
+
+
+def test_sync_picks_up_edits_and_removals(index):
+    index.sync([dict(RECIPES[0], name="French toast"), *RECIPES[2:]])
+
+    assert _ids(index.search("french")) == ["toast"]
+    assert index.search("tomato") == []
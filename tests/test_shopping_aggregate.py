@@ -0,0 +1,44 @@
+import pytest
+
+import planner
+from conftest import STEW, edit_in_place, write_json
+
+
+def _stew(quantity):
+    return dict(STEW, servings=4, ingredients=[{"name": "Garlic", "quantity": quantity, "unit": "tbsp"}])
+
+
+@pytest.fixture
+def plan(data_dir):
+    write_json(data_dir / "recipes" / "stew.json", _stew(1))
+    plan = planner.initialize_weekly_plan("2025-01-06")
+    planner.assign_meal(plan, "2025-01-06", "dinner", planner.get_recipe_by_id("stew"))
+    planner.save_weekly_plan(plan)
+    return plan
+
+
+def _garlic(items):
+    return [item["quantity"] for item in items if item["name"] == "Garlic"]
+
+
+def test_plan_saves_store_the_aggregate(plan):
+    stored = planner.get_storage().load_document(planner.SHOPPING_AGGREGATE_DOC, None)
+
+    assert set(stored["languages"]) == set(planner.SHOPPING_LANGUAGES)
+    assert stored["catalog"] == planner.get_storage().recipe_catalog_stamp()
+
+
+def test_reads_do_not_write_the_aggregate(plan):
+    storage = planner.get_storage()
+    storage.delete_document(planner.SHOPPING_AGGREGATE_DOC)
+
+    assert _garlic(planner.get_shopping_list(plan)) == [1]
+    assert storage.load_document(planner.SHOPPING_AGGREGATE_DOC, None) is None
+
+
+def test_recipe_edited_on_disk_is_not_served_stale(plan, data_dir):
+    assert _garlic(planner.get_shopping_list(plan)) == [1]
+    edit_in_place(data_dir / "recipes" / "stew.json", _stew(3))
+
+    assert _garlic(planner.get_shopping_list(plan)) == [3]
+    assert planner.check_shopping_aggregate(plan) == []
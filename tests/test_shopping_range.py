@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import planner
+
+
+def _recipe(recipe_id, servings, *ingredients):
+    return {
+        "recipe_id": recipe_id,
+        "name": recipe_id.title(),
+        "servings": servings,
+        "meal_types": ["dinner"],
+        "ingredients": [
+            {"name": name, "quantity": quantity, "unit": unit} for name, quantity, unit in ingredients
+        ],
+    }
+
+
+RECIPES = [
+    _recipe("stew", 4, ("Garlic", 1, "tbsp"), ("Tofu", 0.3, "kg"), ("Salt", 1, "tsp")),
+    _recipe("soup", 2, ("garlic", 2, "tbsp"), ("Tofu", 150, "g"), ("Onion", "1/2", "")),
+    _recipe("rice", 3, ("Rice", 1, "cup"), ("Salt", 0.5, "tbsp")),
+]
+# Not in the catalog: its lines come from the meal itself.
+TAKEAWAY = {
+    "name": "Takeaway",
+    "ingredients": [
+        {"name": "Dumplings", "quantity": 12, "unit": ""},
+        {"name": "Garlic", "quantity": 1, "unit": "tbsp"},
+    ],
+}
+
+
+@pytest.fixture
+def plans(data_dir):
+    recipes_dir = data_dir / "recipes"
+    recipes_dir.mkdir()
+    for recipe in RECIPES:
+        (recipes_dir / f"{recipe['recipe_id']}.json").write_text(json.dumps(recipe), encoding="utf-8")
+    weeks = []
+    for week, start in enumerate(["2025-01-06", "2025-01-13"]):
+        days = []
+        for offset in range(7):
+            recipe = RECIPES[(week + offset) % len(RECIPES)]
+            meals = {
+                "lunch": dict(TAKEAWAY) if offset == 3 else None,
+                "dinner": {"recipe_id": recipe["recipe_id"], "name": recipe["name"]},
+            }
+            days.append({"date": f"2025-01-{6 + week * 7 + offset:02d}", "meals": meals})
+        weeks.append({"start_date": start, "days": days})
+    return weeks
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_range_matches_compute_shopping_list(plans, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(planner, "np", None)
+    merged = {"days": [day for plan in plans for day in plan["days"]]}
+
+    assert planner.compute_shopping_list_range(plans) == planner.compute_shopping_list(merged)
+
+
+def test_numpy_and_python_paths_agree(plans, monkeypatch):
+    if planner.np is None:
+        pytest.skip("NumPy is not installed")
+    options = {"start_date": "2025-01-08", "end_date": "2025-01-16", "family_sizes": [2, 6]}
+    vectorized = planner.compute_shopping_list_range(plans, **options)
+    monkeypatch.setattr(planner, "np", None)
+    planner._aggregator_cache["recipes"] = None
+
+    assert planner.compute_shopping_list_range(plans, **options) == vectorized
+
+
+def _takeaway_week(ingredient):
+    meal = {"name": "Takeaway", "ingredients": [{"name": ingredient, "quantity": 1, "unit": ""}]}
+    return {"days": [{"date": "2025-01-06", "meals": {"lunch": meal}}]}
+
+
+def test_off_catalog_meals_leave_the_shared_store_alone(plans):
+    planner.compute_shopping_list_range(plans)
+    aggregator = planner._shopping_aggregator("en")
+    sizes = {name: len(table) for name, table in aggregator.tables.items()}
+    lines = aggregator.size
+
+    for n in range(5):
+        items = planner.compute_shopping_list_range([_takeaway_week(f"Extra{n}")])
+        assert [item["name"] for item in items] == [f"Extra{n}"]
+
+    assert planner._shopping_aggregator("en") is aggregator
+    assert {name: len(table) for name, table in aggregator.tables.items()} == sizes
+    assert aggregator.size == lines == len(aggregator.columns["key"])
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+import planner
+
+
+def _write_recipe(data_dir, recipe):
+    recipes_dir = data_dir / "recipes"
+    recipes_dir.mkdir(exist_ok=True)
+    (recipes_dir / f"{recipe['recipe_id']}.json").write_text(json.dumps(recipe), encoding="utf-8")
+
+
+def _plan(*recipes):
+    days = []
+    for offset, recipe in enumerate(recipes):
+        meal = {
+            "recipe_id": recipe["recipe_id"],
+            "name": recipe["name"],
+            "ingredients": recipe["ingredients"],
+        }
+        days.append({"date": f"2025-01-{6 + offset:02d}", "meals": {"dinner": meal}})
+    return {"start_date": "2025-01-06", "days": days}
+
+
+def _recipe(recipe_id, *ingredients):
+    return {
+        "recipe_id": recipe_id,
+        "name": recipe_id.title(),
+        "servings": 4,
+        "meal_types": ["dinner"],
+        "ingredients": [
+            {"name": name, "quantity": quantity, "unit": unit} for name, quantity, unit in ingredients
+        ],
+    }
+
+
+@pytest.fixture
+def garlic_plan(data_dir):
+    recipe = _recipe("stew", ("Garlic", 1, "tbsp"), ("Tofu", 300, "g"))
+    _write_recipe(data_dir, recipe)
+    return _plan(recipe)
+
+
+@pytest.mark.parametrize("old_key", ["en|Garlic|tbsp", "Garlic|tbsp"])
+def test_sync_migrates_display_name_keys(garlic_plan, old_key):
+    stored = {"name": "Garlic", "unit": "tbsp", "quantity": "2", "manual": False, "lang": "en"}
+    planner.save_shopping_state({old_key: stored})
+    items = planner.get_shopping_list(garlic_plan)
+    garlic_key = next(item["key"] for item in items if item["name"] == "Garlic")
+
+    state = planner.sync_shopping_state(items, language="en")
+
+    assert state == {garlic_key: stored}
+    assert planner.load_shopping_state() == state
+
+
+def test_sync_prefers_rows_already_on_the_current_key(garlic_plan):
+    items = planner.get_shopping_list(garlic_plan)
+    garlic_key = next(item["key"] for item in items if item["name"] == "Garlic")
+    current = {"name": "Garlic", "unit": "tbsp", "quantity": "5", "manual": False, "lang": "en"}
+    old = dict(current, quantity="1")
+    planner.save_shopping_state({"en|Garlic|tbsp": old, garlic_key: current})
+
+    assert planner.sync_shopping_state(items, language="en") == {garlic_key: current}
+
+
+def test_sync_still_prunes_rows_not_in_the_plan(garlic_plan):
+    manual = {"name": "Milk", "unit": "", "quantity": "1", "manual": True, "lang": "en"}
+    other_lang = {"name": "마늘", "unit": "큰술", "quantity": "1", "manual": False, "lang": "original"}
+    planner.save_shopping_state(
+        {
+            "en|Basil|g": {"name": "Basil", "unit": "g", "quantity": "5", "lang": "en"},
+            "manual:1": manual,
+            "original|마늘|tbsp": other_lang,
+        }
+    )
+    items = planner.get_shopping_list(garlic_plan)
+
+    state = planner.sync_shopping_state(items, language="en")
+
+    assert state == {"manual:1": manual, "original|마늘|tbsp": other_lang}
+
+
+def test_shopping_list_page_keeps_old_rows(garlic_plan):
+    from app import app
+
+    planner.save_weekly_plan(garlic_plan)
+    stored = {"name": "Garlic", "unit": "tbsp", "quantity": "2", "manual": False, "lang": "en"}
+    planner.save_shopping_state({"en|Garlic|tbsp": stored})
+
+    response = app.test_client().get("/shopping-list")
+
+    assert response.status_code == 200
+    assert list(planner.load_shopping_state().values()) == [stored]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_folded_rows_show_the_first_name_seen(data_dir, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(planner, "np", None)
+    first = _recipe("first", ("zzberry", 100, "g"))
+    second = _recipe("second", ("Zzberry", 50, "g"))
+    _write_recipe(data_dir, first)
+    _write_recipe(data_dir, second)
+    plan = _plan(first, second)
+
+    for items in (
+        planner.compute_shopping_list(plan),
+        planner.get_shopping_list(plan),
+        planner.compute_shopping_list_range([plan]),
+    ):
+        assert [(item["name"], item["quantity"]) for item in items] == [("zzberry", 150)]
+
+
+@pytest.fixture
+def dictionary(data_dir):
+    planner.save_ingredient_dictionary(
+        {
+            "ingredients": [
+                {"id": "garlic", "en": "Garlic", "ko": "마늘"},
+                {"id": "onion", "en": "Onion", "ko": "양파", "aliases": ["onions"]},
+            ]
+        }
+    )
+
+
+def test_renamed_line_merges_under_its_new_name(data_dir, dictionary):
+    # Written before ids stopped being stored: the name was since edited.
+    renamed = _recipe("stew", ("Onions", 1, "tbsp"))
+    renamed["ingredients"][0]["ingredient_id"] = "garlic"
+    soup = _recipe("soup", ("Onion", 2, "tbsp"), ("Garlic", 1, "tbsp"))
+    _write_recipe(data_dir, renamed)
+    _write_recipe(data_dir, soup)
+
+    items = planner.compute_shopping_list(_plan(renamed, soup))
+
+    assert sorted((item["name"], item["quantity"]) for item in items) == [
+        ("Garlic", 1),
+        ("Onion", 3),
+    ]
+
+
+def test_recipe_files_do_not_store_ingredient_ids(data_dir, dictionary):
+    stale = _recipe("stew", ("Onion", 1, "tbsp"))
+    stale["ingredients"][0]["ingredient_id"] = "garlic"
+    _write_recipe(data_dir, stale)
+
+    assert planner.clean_recipe_files() == ["stew"]
+
+    stored = json.loads((data_dir / "recipes" / "stew.json").read_text(encoding="utf-8"))
+    assert stored["ingredients"] == [{"name": "Onion", "quantity": 1, "unit": "tbsp"}]
+    planner.add_recipe(_recipe("soup", ("Garlic", 1, "tbsp")))
+    stored = json.loads((data_dir / "recipes" / "soup.json").read_text(encoding="utf-8"))
+    assert "ingredient_id" not in stored["ingredients"][0]
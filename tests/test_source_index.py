@@ -0,0 +1,50 @@
+import pytest
+
+import planner
+from conftest import age, edit_in_place, write_json
+
+
+def _source(recipe_id, url):
+    return {"recipe_id": recipe_id, "source": "youtube", "source_url": url, "title": recipe_id}
+
+
+@pytest.fixture
+def sources_dir(data_dir):
+    planner.save_recipe_source(_source("stew", "https://www.youtube.com/watch?v=stew1"))
+    return planner.RECIPE_SOURCES_DIR
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/watch?v=stew1",
+        "https://youtu.be/stew1",
+        "https://www.youtube.com/shorts/stew1",
+        "https://m.youtube.com/watch?v=stew1&t=30s",
+    ],
+)
+def test_every_link_form_finds_the_video(sources_dir, url):
+    assert planner.youtube_cache_key(url) == "stew1"
+    assert planner.find_recipe_source(url)["recipe_id"] == "stew"
+
+
+def test_files_named_after_something_else_are_found_by_recipe_id(sources_dir):
+    age(sources_dir)
+    write_json(sources_dir / "legacy-export_source.json", _source("soup", "https://youtu.be/soup1"))
+
+    assert planner.load_recipe_source("soup")["title"] == "soup"
+    assert planner.find_source_file("https://youtu.be/soup1").name == "legacy-export_source.json"
+
+
+def test_a_stale_hit_rebuilds_the_index(sources_dir):
+    planner.load_source_index()
+    # Edited in place, so the directory stamp does not move.
+    edit_in_place(sources_dir / "stew_source.json", _source("stew", "https://youtu.be/other1"))
+
+    assert planner.find_recipe_source("https://youtu.be/stew1") is None
+    assert planner.find_recipe_source("https://youtu.be/other1")["recipe_id"] == "stew"
+
+
+def test_unknown_videos_and_ids_miss(sources_dir):
+    assert planner.find_recipe_source("https://youtu.be/missing1") is None
+    assert planner.load_recipe_source("missing") is None
@@ -0,0 +1,93 @@
+import sys
+
+import pytest
+
+import migrate_to_sqlite
+import planner
+from recipe_model import as_dict
+from sqlite_storage import SqliteStorage
+
+STEW = {
+    "recipe_id": "stew",
+    "name": "Kimchi stew",
+    "name_original": "김치찌개",
+    "meal_types": ["dinner"],
+    "servings": 2,
+    "ingredients": [{"name": "Kimchi", "quantity": 1, "unit": "cup"}],
+    "ingredients_original": [{"name": "김치", "quantity": 1, "unit": "컵"}],
+    "instructions": ["Simmer."],
+    "spice_level": 3,
+}
+OATS = {"recipe_id": "oats", "name": "Oats", "meal_types": ["breakfast"], "ingredients": []}
+
+
+@pytest.fixture
+def json_tree(data_dir):
+    storage = planner.get_storage()
+    storage.save_config(dict(planner.load_config(), family_size=3))
+    planner.add_recipe(STEW)
+    planner.add_recipe(OATS)
+    planner.save_recipe_source(
+        {
+            "recipe_id": "stew",
+            "source": "youtube",
+            "source_url": "https://youtu.be/stew1",
+            "title": "Stew video",
+            "prompt": "Extract a recipe.",
+        }
+    )
+    plan = planner.initialize_weekly_plan("2025-01-06")
+    planner.assign_meal(plan, "2025-01-07", "dinner", planner.get_recipe_by_id("stew"))
+    planner.save_weekly_plan(plan)
+    planner.append_plan_history(plan)
+    planner.save_shopping_state(
+        {"manual:1": {"name": "Milk", "unit": "", "quantity": "1", "manual": True, "lang": "en"}}
+    )
+    planner.save_ingredient_dictionary({"ingredients": [{"id": "kimchi", "en": "Kimchi"}]})
+    storage.put_llm_entry("abc", {"recipe": {"name": "Cached"}})
+    storage.put_youtube_entry("vid1", {"url": "https://youtu.be/vid1", "recipe": None})
+    return storage
+
+
+def _migrate(monkeypatch, db):
+    monkeypatch.setattr(sys, "argv", ["migrate_to_sqlite.py", "--db", str(db)])
+    migrate_to_sqlite.main()
+    return SqliteStorage(db)
+
+
+def _catalog(storage):
+    recipes = [as_dict(recipe) for recipe in storage.load_recipes()]
+    return sorted(recipes, key=lambda recipe: recipe["recipe_id"])
+
+
+def test_migration_round_trips_every_store(json_tree, data_dir, monkeypatch):
+    target = _migrate(monkeypatch, data_dir / "planner.db")
+
+    assert target.load_config(None) == json_tree.load_config(None)
+    assert _catalog(target) == _catalog(json_tree)
+    assert as_dict(target.get_recipe("stew"))["spice_level"] == 3
+    assert target.load_recipe_source("stew") == json_tree.load_recipe_source("stew")
+    assert target.load_plan() == json_tree.load_plan()
+    assert target.load_history() == json_tree.load_history()
+    assert target.load_shopping_state() == json_tree.load_shopping_state()
+    assert target.get_llm_entry("abc") == json_tree.get_llm_entry("abc")
+    assert target.get_youtube_entry("vid1") == json_tree.get_youtube_entry("vid1")
+    assert target.load_document("ingredients") == json_tree.load_document("ingredients")
+
+
+def test_migrating_twice_does_not_duplicate(json_tree, data_dir, monkeypatch):
+    db = data_dir / "planner.db"
+    _migrate(monkeypatch, db)
+
+    target = _migrate(monkeypatch, db)
+
+    assert len(target.load_recipes()) == 2
+    assert len(target.load_history()) == len(json_tree.load_history())
+
+
+def test_planner_runs_on_the_migrated_database(json_tree, data_dir, monkeypatch):
+    expected = planner.compute_shopping_list(planner.load_weekly_plan())
+    planner.set_storage(_migrate(monkeypatch, data_dir / "planner.db"))
+
+    assert planner.get_recipe_by_id("stew")["name"] == "Kimchi stew"
+    assert planner.compute_shopping_list(planner.load_weekly_plan()) == expected
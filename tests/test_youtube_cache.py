@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import planner
+
+RECIPE = {"name": "Kimchi stew", "ingredients": [], "instructions": ["Simmer."]}
+
+
+class FakeFetch:
+    # Stands in for fetch_recipe_from_youtube; `outcomes` maps a video key to
+    # the recipe (or exception) it produces.
+    def __init__(self):
+        self.calls = []
+        self.outcomes = {}
+
+    def __call__(self, url):
+        self.calls.append(url)
+        outcome = self.outcomes.get(planner.youtube_cache_key(url), RECIPE)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def fetch(data_dir, monkeypatch):
+    fake = FakeFetch()
+    monkeypatch.setattr(planner, "fetch_recipe_from_youtube", fake)
+    return fake
+
+
+def test_link_forms_of_one_video_share_an_entry(fetch):
+    planner.extract_recipe_from_youtube("https://www.youtube.com/watch?v=stew1")
+
+    assert planner.extract_recipe_from_youtube("https://youtu.be/stew1") == RECIPE
+    assert planner.extract_recipe_from_youtube("https://www.youtube.com/shorts/stew1") == RECIPE
+    assert fetch.calls == ["https://www.youtube.com/watch?v=stew1"]
+
+
+def test_expired_entries_are_fetched_again(fetch, monkeypatch):
+    planner.extract_recipe_from_youtube("https://youtu.be/stew1")
+    monkeypatch.setattr(planner, "YOUTUBE_CACHE_TTL", 0)
+
+    planner.extract_recipe_from_youtube("https://youtu.be/stew1")
+
+    assert len(fetch.calls) == 2
+
+
+def test_unavailable_videos_are_remembered_briefly(fetch, monkeypatch):
+    fetch.outcomes["gone1"] = planner.YoutubeUnavailable("Video unavailable")
+    for _ in range(2):
+        with pytest.raises(planner.YoutubeUnavailable, match="unavailable"):
+            planner.extract_recipe_from_youtube("https://youtu.be/gone1")
+    assert len(fetch.calls) == 1
+
+    monkeypatch.setattr(planner, "YOUTUBE_CACHE_NEGATIVE_TTL", 0)
+    fetch.outcomes["gone1"] = RECIPE
+    assert planner.extract_recipe_from_youtube("https://youtu.be/gone1") == RECIPE
+
+
+def test_configuration_errors_are_not_cached(fetch):
+    fetch.outcomes["stew1"] = RuntimeError("OPENAI_API_KEY is not set.")
+    with pytest.raises(RuntimeError):
+        planner.extract_recipe_from_youtube("https://youtu.be/stew1")
+    del fetch.outcomes["stew1"]
+
+    assert planner.extract_recipe_from_youtube("https://youtu.be/stew1") == RECIPE
+
+
+def test_least_recently_used_entries_are_evicted(fetch, monkeypatch):
+    monkeypatch.setattr(planner, "YOUTUBE_CACHE_MAX_ENTRIES", 2)
+    for video in ("one", "two", "three"):
+        planner.extract_recipe_from_youtube(f"https://youtu.be/{video}")
+
+    keys = {key for key, _ in planner.get_storage().list_youtube_entries()}
+    assert len(keys) == 2
+    assert "three" in keys
+
+
+def test_legacy_cache_file_is_converted_once(fetch, data_dir):
+    legacy = {"https://www.youtube.com/watch?v=old1": RECIPE, "https://youtu.be/none1": None}
+    (data_dir / "youtube_cache.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    assert planner.extract_recipe_from_youtube("https://youtu.be/old1") == RECIPE
+    assert fetch.calls == []
+    assert not (data_dir / "youtube_cache.json").exists()
+    assert (data_dir / "youtube_cache.json.bak").exists()
+    assert planner.convert_youtube_cache() == 0